@@ -1,13 +1,17 @@
 import re
 import json
+import heapq
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-from sentence_transformers import SentenceTransformer
+from typing import Callable, Dict, Iterable, List, Tuple, Optional
 from sklearn.metrics.pairwise import cosine_similarity
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
-import spacy
+from embedding_store import EmbeddingStore
+from embedding_cache import QueryEmbeddingCache
+from onnx_encoder import DEFAULT_MODEL, encoder_identity, load_encoder
+from staged_pipeline import Budget
+from tariff_snapshot import TariffSnapshot, tariff_fingerprint
 
 # Télécharger les ressources NLTK nécessaires
 try:
@@ -21,12 +25,35 @@ except LookupError:
     nltk.download('stopwords')
 
 class AdvancedCEDEAOClassifier:
-    def __init__(self):
-        self.model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-        self.nlp = spacy.load("fr_core_news_sm")
-        self.stop_words = set(stopwords.words('french'))
+    def __init__(self, embedding_precision: str = 'float32', rerank_k: int = 50,
+                 embedding_cache_dir: Optional[str] = None, query_cache_size: int = 1024,
+                 query_cache_dir: Optional[str] = None, encoder_backend: Optional[str] = None,
+                 tariff_snapshot_dir: Optional[str] = None, encoder=None,
+                 stop_words: Optional[Iterable[str]] = None,
+                 tokenizer: Optional[Callable[[str], List[str]]] = None):
+        # Dépendances injectables (encodeur, mots vides, tokeniseur), chargées si absentes
+        # Backend 'torch' (défaut) ou 'onnx', aussi configurable par CEDEAO_ENCODER_BACKEND
+        self.model = encoder if encoder is not None else load_encoder(DEFAULT_MODEL, backend=encoder_backend)
+        # Modèle et backend: les embeddings de l'un ne sont jamais relus par l'autre
+        self.encoder_id = encoder_identity(self.model)
+        self.stop_words = set(stopwords.words('french') if stop_words is None else stop_words)
+        self.tokenize = tokenizer or word_tokenize
         self.product_embeddings = {}
         self.classification_rules = self.load_classification_rules()
+        # Index des embeddings du tarif (float32, float16 ou int8)
+        self.embedding_precision = embedding_precision
+        self.rerank_k = rerank_k
+        self.embedding_cache_dir = embedding_cache_dir
+        self.tariff_index = None
+        self.tariff_index_key = None
+        # Textes du tarif prétraités une fois par version du tarif (persistés si tariff_snapshot_dir)
+        self.tariff_snapshot_dir = tariff_snapshot_dir
+        self.tariff_snapshot = None
+        # Dernière base sans 'fingerprint' et son empreinte calculée
+        self.fingerprinted_database = None
+        # Cache des embeddings de requêtes (clé: sortie de preprocess_text, un répertoire par encodeur)
+        self.query_cache = QueryEmbeddingCache(max_entries=query_cache_size, cache_dir=query_cache_dir,
+                                               encoder=self.encoder_id)
         
     def load_classification_rules(self) -> Dict:
         """Charge les règles de classification avancées"""
@@ -62,7 +89,7 @@ class AdvancedCEDEAOClassifier:
         text = re.sub(r'[^\w\s]', ' ', text)
         
         # Tokenisation
-        tokens = word_tokenize(text)
+        tokens = self.tokenize(text)
         
         # Suppression des stop words
         tokens = [token for token in tokens if token not in self.stop_words and len(token) > 2]
@@ -71,8 +98,6 @@ class AdvancedCEDEAOClassifier:
     
     def extract_features(self, text: str) -> Dict:
         """Extrait les caractéristiques importantes du texte"""
-        doc = self.nlp(text.lower())
-        
         features = {
             'materials': [],
             'functions': [],
@@ -130,111 +155,247 @@ class AdvancedCEDEAOClassifier:
             print(f"Erreur lors du calcul de similarité: {e}")
             return 0.0
     
-    def apply_rgi_rules(self, product_description: str, candidates: List[Dict]) -> List[Dict]:
-        """Applique les Règles Générales d'Interprétation"""
-        features = self.extract_features(product_description)
-        
-        for candidate in candidates:
-            score = 0.0
-            
-            # RGI 1: Titres indicatifs - pas d'impact sur le score
-            
-            # RGI 2: Marchandises incomplètes
-            incomplete_keywords = ['partie', 'composant', 'pièce', 'élément']
-            if any(keyword in product_description.lower() for keyword in incomplete_keywords):
-                # Chercher la version complète
-                score += 0.1
-            
-            # RGI 3: Mélange ou assemblage
-            if len(features['materials']) > 1:
-                # Déterminer le matériau prépondérant
-                material_counts = {}
-                for material in features['materials']:
-                    material_counts[material] = product_description.lower().count(material)
-                
-                if material_counts:
-                    predominant_material = max(material_counts, key=material_counts.get)
-                    if predominant_material.lower() in candidate['description'].lower():
-                        score += 0.3
-            
-            # RGI 4: Analogie
-            semantic_sim = self.calculate_semantic_similarity(
-                product_description, candidate['description']
-            )
-            score += semantic_sim * 0.4
-            
-            # RGI 5: Emballages
-            packaging_keywords = ['emballage', 'carton', 'boîte', 'sac']
-            if any(keyword in product_description.lower() for keyword in packaging_keywords):
-                # L'emballage suit la marchandise
-                score += 0.2
-            
-            # RGI 6: Sous-positions spécifiques
-            if candidate['type'] == 'subheading':
-                score += 0.2
-            
-            candidate['rgi_score'] = score
-        
-        # Trier par score RGI
-        candidates.sort(key=lambda x: x.get('rgi_score', 0), reverse=True)
-        return candidates
+    def apply_rgi_rules(self, product_description: str, candidates: List[Dict],
+                        features: Optional[Dict] = None) -> List[Dict]:
+        """
+        Applique les Règles Générales d'Interprétation à tous les candidats en une passe vectorisée
+
+        Args:
+            product_description: Description du produit
+            candidates: Candidats portant déjà leur 'similarity' (réutilisée pour la RGI 4)
+            features: Caractéristiques déjà extraites de la description (recalculées si absentes)
+        """
+        if not candidates:
+            return candidates
+        if features is None:
+            features = self.extract_features(product_description)
+        description_lower = product_description.lower()
+        
+        # RGI 1: Titres indicatifs - pas d'impact sur le score
+        
+        # Termes indépendants du candidat
+        base_score = 0.0
+        
+        # RGI 2: Marchandises incomplètes
+        incomplete_keywords = ['partie', 'composant', 'pièce', 'élément']
+        if any(keyword in description_lower for keyword in incomplete_keywords):
+            base_score += 0.1
+        
+        # RGI 5: Emballages (l'emballage suit la marchandise)
+        packaging_keywords = ['emballage', 'carton', 'boîte', 'sac']
+        if any(keyword in description_lower for keyword in packaging_keywords):
+            base_score += 0.2
+        
+        # RGI 3: Mélange ou assemblage - matériau prépondérant
+        predominant_material = None
+        if len(features['materials']) > 1:
+            material_counts = {material: description_lower.count(material) for material in features['materials']}
+            predominant_material = max(material_counts, key=material_counts.get).lower()
+        
+        similarities = np.array([candidate['similarity'] for candidate in candidates], dtype=np.float64)
+        is_subheading = np.array([candidate['type'] == 'subheading' for candidate in candidates])
+        if predominant_material is not None:
+            material_match = np.array([predominant_material in candidate['description'].lower()
+                                       for candidate in candidates])
+        else:
+            material_match = np.zeros(len(candidates), dtype=bool)
+        
+        scores = (
+            base_score
+            + 0.3 * material_match
+            + 0.4 * similarities   # RGI 4: Analogie (similarité déjà calculée)
+            + 0.2 * is_subheading  # RGI 6: Sous-positions spécifiques
+        )
+        
+        for candidate, score in zip(candidates, scores):
+            candidate['rgi_score'] = float(score)
+        
+        # Trier par score RGI (tri stable, comme list.sort)
+        order = np.argsort(-scores, kind='stable')
+        return [candidates[i] for i in order]
+    
+    def database_fingerprint(self, database: Dict) -> str:
+        """
+        Empreinte de la base: sa clé 'fingerprint', sinon calculée une seule fois par objet base
+
+        Une base modifiée sur place entre deux requêtes doit porter sa propre 'fingerprint'.
+        """
+        fingerprint = database.get('fingerprint')
+        if fingerprint:
+            return fingerprint
+        if self.fingerprinted_database is None or self.fingerprinted_database[0] is not database:
+            # La base est gardée avec son empreinte: son identité ne peut pas être réattribuée
+            self.fingerprinted_database = (database, tariff_fingerprint(database))
+        return self.fingerprinted_database[1]
+    
+    def get_tariff_snapshot(self, database: Dict) -> TariffSnapshot:
+        """Retourne l'instantané prétraité du tarif, reconstruit seulement si son contenu a changé"""
+        fingerprint = self.database_fingerprint(database)
+        if self.tariff_snapshot is None or self.tariff_snapshot.fingerprint != fingerprint:
+            self.tariff_snapshot = TariffSnapshot.load_or_build(
+                {**database, 'fingerprint': fingerprint}, self.preprocess_text, self.tariff_snapshot_dir)
+        return self.tariff_snapshot
+    
+    def build_tariff_index(self, snapshot: TariffSnapshot) -> Dict:
+        """Encode une seule fois toutes les sous-positions et tous les chapitres du tarif"""
+        texts = snapshot.preprocessed
+        embeddings = self.model.encode(texts, batch_size=64) if texts else np.zeros((0, 384), dtype=np.float32)
+        store = EmbeddingStore(embeddings, precision=self.embedding_precision,
+                               cache_dir=self.embedding_cache_dir, cache_key=f"{snapshot.fingerprint[:16]}_{self.encoder_id}")
+        # Ligne de chaque entrée dans la matrice, pour relire l'embedding d'un candidat venu d'ailleurs
+        rows = {(entry['type'], entry['code']): row for row, entry in enumerate(snapshot.entries)}
+        return {'entries': snapshot.entries, 'store': store, 'rows': rows}
+    
+    def get_tariff_index(self, database: Dict) -> Dict:
+        """Retourne l'index du tarif, reconstruit seulement si le contenu du tarif a changé"""
+        snapshot = self.get_tariff_snapshot(database)
+        if self.tariff_index is None or self.tariff_index_key != snapshot.fingerprint:
+            self.tariff_index = self.build_tariff_index(snapshot)
+            self.tariff_index_key = snapshot.fingerprint
+        return self.tariff_index
+    
+    def encode_query(self, preprocessed_desc: str, budget: Optional[Budget] = None) -> Optional[np.ndarray]:
+        """Encode une requête prétraitée en passant par le cache (None si absente du cache, budget épuisé)"""
+        embedding = self.query_cache.get(preprocessed_desc)
+        if embedding is None:
+            if budget is not None and budget.expired():
+                budget.skip('encode_query')
+                return None
+            embedding = self.model.encode([preprocessed_desc])[0]
+            self.query_cache.put(preprocessed_desc, embedding)
+        return embedding
+    
+    def get_instrumentation(self) -> Dict:
+        """Statistiques d'exécution exposées pour le suivi des performances"""
+        return {
+            'query_cache': self.query_cache.stats(),
+            'tariff_index_size': len(self.tariff_index['entries']) if self.tariff_index else 0
+        }
     
-    def classify_product(self, description: str, database: Dict) -> List[Dict]:
-        """Classification avancée d'un produit"""
+    def classify_product(self, description: str, database: Dict, features: Optional[Dict] = None,
+                         budget: Optional[Budget] = None) -> List[Dict]:
+        """
+        Classification avancée d'un produit (features: caractéristiques déjà extraites, le cas échéant)
+
+        Une fois le budget épuisé, une requête absente du cache n'est pas encodée (aucun résultat:
+        à l'appelant de se replier sur la recherche lexicale) et les règles RGI sont sautées.
+        """
         results = []
         preprocessed_desc = self.preprocess_text(description)
         
-        # Recherche dans les sous-positions
-        for code, data in database.get('subheadings', {}).items():
-            preprocessed_target = self.preprocess_text(data['description'])
-            
-            # Calcul de la similarité
-            similarity = self.calculate_semantic_similarity(preprocessed_desc, preprocessed_target)
-            
-            if similarity > 0.1:  # Seuil minimal de similarité
-                results.append({
-                    'type': 'subheading',
-                    'code': code,
-                    'description': data['description'],
-                    'rate': data.get('rate', 'À déterminer'),
-                    'similarity': similarity,
-                    'rgi_score': 0.0
-                })
+        # Similarités avec tout le tarif en un seul produit matriciel
+        index = self.get_tariff_index(database)
+        query_embedding = self.encode_query(preprocessed_desc, budget)
+        if query_embedding is None:
+            return results
+        similarities = index['store'].scores(query_embedding, rerank_k=self.rerank_k)
         
-        # Recherche dans les chapitres
-        for chapter_num, chapter_content in database.get('chapters', {}).items():
-            preprocessed_chapter = self.preprocess_text(chapter_content)
-            similarity = self.calculate_semantic_similarity(preprocessed_desc, preprocessed_chapter)
-            
-            if similarity > 0.15:
+        for entry, similarity in zip(index['entries'], similarities):
+            if similarity > entry['threshold']:  # Seuil minimal de similarité
                 results.append({
-                    'type': 'chapter',
-                    'code': chapter_num,
-                    'description': chapter_content[:300] + "...",
-                    'rate': 'À déterminer selon sous-position',
-                    'similarity': similarity,
+                    'type': entry['type'],
+                    'code': entry['code'],
+                    'description': entry['description'],
+                    'rate': entry['rate'],
+                    'similarity': float(similarity),
                     'rgi_score': 0.0
                 })
         
+        return self.rescore_candidates(description, results, features, budget=budget)
+    
+    def rescore_candidates(self, description: str, candidates: List[Dict], features: Optional[Dict] = None,
+                           score_key: str = 'similarity', limit: int = 10,
+                           budget: Optional[Budget] = None) -> List[Dict]:
+        """
+        Règles RGI puis score final combiné (score_key à 60 %, RGI à 40 %) des candidats retenus;
+        budget épuisé: sans règles RGI, le score final est score_key
+
+        Returns:
+            Les limit meilleurs candidats par score final
+        """
+        if budget is not None and budget.expired():
+            budget.skip('rgi_rules')
+            for candidate in candidates:
+                candidate['final_score'] = candidate[score_key]
+            return heapq.nlargest(limit, candidates, key=lambda x: x['final_score'])
+        
         # Application des règles RGI
-        results = self.apply_rgi_rules(description, results)
+        results = self.apply_rgi_rules(description, candidates, features)
         
         # Score final combiné
         for result in results:
             result['final_score'] = (
-                result['similarity'] * 0.6 + 
+                result[score_key] * 0.6 + 
                 result.get('rgi_score', 0) * 0.4
             )
         
-        # Tri par score final
-        results.sort(key=lambda x: x['final_score'], reverse=True)
-        
-        return results[:10]
+        # Les meilleurs par score final (tas borné, même ordre qu'un tri stable)
+        return heapq.nlargest(limit, results, key=lambda x: x['final_score'])
+    
+    def semantic_top_k(self, description: str, database: Dict, k: int,
+                       budget: Optional[Budget] = None) -> List[Dict]:
+        """
+        Les k entrées du tarif les plus proches de la description (au-dessus de leur seuil); aucune
+        si la requête n'est pas encodée, faute de temps
+        """
+        index = self.get_tariff_index(database)
+        query_embedding = self.encode_query(self.preprocess_text(description), budget)
+        candidates = []
+        if query_embedding is None:
+            return candidates
+        for entry_id, similarity in index['store'].top_k(query_embedding, k, rerank_k=self.rerank_k):
+            entry = index['entries'][entry_id]
+            if similarity > entry['threshold']:
+                candidates.append({
+                    'type': entry['type'],
+                    'code': entry['code'],
+                    'description': entry['description'],
+                    'rate': entry['rate'],
+                    'similarity': similarity,
+                    'rgi_score': 0.0
+                })
+        return candidates
+    
+    def fill_similarities(self, description: str, candidates: List[Dict], database: Dict,
+                          budget: Optional[Budget] = None) -> List[Dict]:
+        """
+        Similarité des candidats qui n'en ont pas (venus d'une autre recherche): lue dans l'index du
+        tarif par leur entrée; seuls les codes absents de l'index sont encodés (en un lot). Budget
+        épuisé: similarité nulle pour les codes absents de l'index, ou pour tous si la requête
+        n'est pas encodée
+        """
+        missing = [candidate for candidate in candidates if 'similarity' not in candidate]
+        if not missing:
+            return candidates
+        index = self.get_tariff_index(database)
+        query_embedding = self.encode_query(self.preprocess_text(description), budget)
+        if query_embedding is None:
+            for candidate in missing:
+                candidate['similarity'] = 0.0
+                candidate.setdefault('rgi_score', 0.0)
+            return candidates
+        rows = [index['rows'].get((candidate['type'], candidate['code'])) for candidate in missing]
+        indexed = [(candidate, row) for candidate, row in zip(missing, rows) if row is not None]
+        unknown = [candidate for candidate, row in zip(missing, rows) if row is None]
+        similarities = []
+        if indexed:
+            scores = index['store'].row_scores(query_embedding, [row for _, row in indexed])
+            similarities.extend(zip((candidate for candidate, _ in indexed), scores))
+        if unknown and budget is not None and budget.expired():
+            budget.skip('candidate_encoding')
+            similarities.extend((candidate, 0.0) for candidate in unknown)
+        elif unknown:
+            embeddings = self.model.encode([self.preprocess_text(candidate['description']) for candidate in unknown])
+            similarities.extend(zip(unknown, cosine_similarity([query_embedding], embeddings)[0]))
+        for candidate, similarity in similarities:
+            candidate['similarity'] = float(similarity)
+            candidate.setdefault('rgi_score', 0.0)
+        return candidates
     
     def get_detailed_classification(self, description: str, database: Dict) -> Dict:
         """Retourne une classification détaillée avec explications"""
         features = self.extract_features(description)
-        results = self.classify_product(description, database)
+        results = self.classify_product(description, database, features)
         
         if not results:
             return {
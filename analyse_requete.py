@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analyse d'une requête faite une seule fois et partagée par toutes les étapes de classification:
+texte en minuscules, mots, positions, clés normalisées, n-grammes, mesures et mots reconnus par un
+dictionnaire
+"""
+
+import re
+from functools import cached_property
+from typing import Dict, List, Tuple, Union
+
+from intervalles import Mesure, extraire_mesures
+from normalisation import mots_normalises, normaliser_texte
+
+MOT_PATTERN = re.compile(r'\w+')
+PONCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+class AnalyseRequete:
+    """Découpages d'une description, calculés au premier accès puis mémorisés"""
+
+    def __init__(self, texte: str):
+        self.texte = texte
+        self.ngrammes_calcules: Dict[int, Tuple[Tuple[str, ...], ...]] = {}
+        # Mots reconnus, par dictionnaire consulté (id -> (dictionnaire, mots))
+        self.reconnus: Dict[int, Tuple[object, Tuple[str, ...]]] = {}
+
+    def __str__(self) -> str:
+        return self.texte
+
+    @cached_property
+    def minuscule(self) -> str:
+        return self.texte.lower()
+
+    @cached_property
+    def plie(self) -> str:
+        """Texte normalisé (sans accents ni ligatures)"""
+        return normaliser_texte(self.texte)
+
+    @cached_property
+    def mots_bruts(self) -> List[str]:
+        """Mots séparés par les espaces, en minuscules et ponctuation comprise"""
+        return self.minuscule.split()
+
+    @cached_property
+    def nombre_mots(self) -> int:
+        return len(self.mots_bruts)
+
+    @cached_property
+    def mots_nettoyes(self) -> List[str]:
+        """Mots bruts sans leur ponctuation (vides compris)"""
+        return [PONCTUATION_PATTERN.sub('', mot) for mot in self.mots_bruts]
+
+    @cached_property
+    def positions(self) -> List[Tuple[int, int]]:
+        """Positions (début, fin) de chaque mot \\w+ dans le texte d'origine"""
+        return [correspondance.span() for correspondance in MOT_PATTERN.finditer(self.texte)]
+
+    @cached_property
+    def mots(self) -> List[str]:
+        """Mots \\w+ en minuscules, dans l'ordre"""
+        return [self.minuscule[debut:fin] for debut, fin in self.positions]
+
+    @cached_property
+    def mots_plies(self) -> Tuple[str, ...]:
+        return mots_normalises(self.texte)
+
+    @cached_property
+    def mesures(self) -> List[Mesure]:
+        """Mesures avec unité ("1.8kg", "250 g/m²"), dans l'unité de référence de leur grandeur"""
+        return extraire_mesures(self.texte)
+
+    def ngrammes(self, n: int) -> Tuple[Tuple[str, ...], ...]:
+        """N-grammes consécutifs des mots normalisés"""
+        if n not in self.ngrammes_calcules:
+            mots = self.mots_plies
+            self.ngrammes_calcules[n] = tuple(tuple(mots[i:i + n]) for i in range(len(mots) - n + 1))
+        return self.ngrammes_calcules[n]
+
+    def mots_reconnus(self, dictionnaire) -> Tuple[str, ...]:
+        """Mots (\\w+, minuscules) reconnus par dictionnaire.est_mot_francais, dans l'ordre"""
+        cle = id(dictionnaire)
+        if cle not in self.reconnus or self.reconnus[cle][0] is not dictionnaire:
+            verdicts = {}
+            for mot in self.mots:
+                if mot not in verdicts:
+                    verdicts[mot] = dictionnaire.est_mot_francais(mot)
+            self.reconnus[cle] = (dictionnaire, tuple(mot for mot in self.mots if verdicts[mot]))
+        return self.reconnus[cle][1]
+
+def analyser_requete(texte: Union[str, AnalyseRequete]) -> AnalyseRequete:
+    """Retourne l'analyse d'un texte (l'analyse elle-même si elle est déjà faite)"""
+    if isinstance(texte, AnalyseRequete):
+        return texte
+    return AnalyseRequete(texte)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Table des analyses des mots du vocabulaire enrichi (forme du vocabulaire, mots similaires,
+synonymes, catégories sémantiques), calculée hors ligne et enregistrée à côté du lexique compilé.
+Les mots absents de la table (formes sans accents, mots du lexique complet, mots inconnus) passent
+par un mémo borné: l'analyse d'un texte n'est plus qu'une suite de consultations.
+"""
+
+import os
+import json
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from normalisation import TAILLE_MEMO, normaliser_texte
+
+FORMAT = "analyses-mots"
+VERSION = 1
+
+@dataclass(frozen=True, slots=True)
+class AnalyseMot:
+    """Analyse d'un mot reconnu comme français"""
+
+    mot: str                        # forme du vocabulaire ("vélo" pour "velo")
+    enrichi: bool                   # mot du vocabulaire enrichi, sinon du seul lexique complet
+    similaires: Tuple[str, ...] = ()
+    synonymes: Tuple[str, ...] = ()
+    categories: Tuple[str, ...] = ()
+
+def fichier_analyses(fichier_dictionnaire: str = "dictionnaire_francais.txt") -> str:
+    """Fichier de la table, à côté des lexiques compilés du dictionnaire"""
+    return os.path.splitext(fichier_dictionnaire)[0] + '.analyses.json'
+
+def empreinte_sources(*sources) -> str:
+    """Empreinte des données dont dépendent les analyses (vocabulaire, synonymes, catégories...)"""
+    texte = json.dumps(sources, sort_keys=True, ensure_ascii=False, default=sorted)
+    return hashlib.sha256(texte.encode('utf-8')).hexdigest()
+
+def ecrire_analyses(analyses: Mapping[str, AnalyseMot], fichier: str, empreinte: str) -> None:
+    fichier_temporaire = fichier + '.tmp'
+    with open(fichier_temporaire, 'w', encoding='utf-8') as f:
+        json.dump({
+            'format': FORMAT,
+            'version': VERSION,
+            'empreinte': empreinte,
+            'analyses': {mot: [list(a.similaires), list(a.synonymes), list(a.categories)]
+                         for mot, a in analyses.items()}
+        }, f, ensure_ascii=False)
+    os.replace(fichier_temporaire, fichier)
+
+def lire_analyses(fichier: str, empreinte: str) -> Optional[Dict[str, AnalyseMot]]:
+    """Table enregistrée, ou None si elle est absente, illisible ou calculée sur d'autres données"""
+    try:
+        with open(fichier, 'r', encoding='utf-8') as f:
+            contenu = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (contenu.get('format'), contenu.get('version'), contenu.get('empreinte')) != (FORMAT, VERSION, empreinte):
+        return None
+    return {mot: AnalyseMot(mot, True, tuple(similaires), tuple(synonymes), tuple(categories))
+            for mot, (similaires, synonymes, categories) in contenu['analyses'].items()}
+
+def charger_analyses(vocabulaire: Iterable[str], analyser: Callable[[str], AnalyseMot], fichier: str,
+                     empreinte: str) -> Dict[str, AnalyseMot]:
+    """Table enregistrée si elle est à jour, sinon recalculée (analyser sur chaque mot) et réécrite"""
+    analyses = lire_analyses(fichier, empreinte)
+    if analyses is None:
+        analyses = {mot: analyser(mot) for mot in sorted(vocabulaire)}
+        try:
+            ecrire_analyses(analyses, fichier, empreinte)
+        except OSError:
+            pass
+    return analyses
+
+class TableAnalyses:
+    """Consultation des analyses: table précalculée, puis mémo borné pour les autres mots"""
+
+    def __init__(self, analyses: Mapping[str, AnalyseMot], cles_pliees: Mapping[str, str], lexique,
+                 taille_memo: int = TAILLE_MEMO):
+        """
+        Args:
+            analyses: Mot du vocabulaire enrichi -> analyse
+            cles_pliees: Clé pliée -> mot du vocabulaire enrichi ("velo" -> "vélo")
+            lexique: Clés pliées du lexique complet (mots reconnus sans enrichissement)
+        """
+        self.analyses = analyses
+        self.cles_pliees = cles_pliees
+        self.lexique = lexique
+        self.hors_table = lru_cache(maxsize=taille_memo)(self._analyser_hors_table)
+
+    def analyse(self, mot: str) -> Optional[AnalyseMot]:
+        """Analyse d'un mot en minuscules, None s'il n'est pas français"""
+        analyse = self.analyses.get(mot)
+        return analyse if analyse is not None else self.hors_table(mot)
+
+    def _analyser_hors_table(self, mot: str) -> Optional[AnalyseMot]:
+        plie = normaliser_texte(mot)
+        mot_vocabulaire = self.cles_pliees.get(plie)
+        if mot_vocabulaire in self.analyses:
+            return self.analyses[mot_vocabulaire]
+        if plie in self.lexique:
+            return AnalyseMot(mot, False)
+        return None
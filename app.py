@@ -4,26 +4,60 @@ import re
 from typing import Dict, List, Tuple, Optional
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from ai_classifier import AdvancedCEDEAOClassifier
+from tariff_snapshot import tariff_fingerprint
+from tarif_structure import Tarif, analyser_tarif
+from lexical_index import FieldedLexicalIndex, tokenize
+from intervalles import extraire_mesures, verifier_mesures
+from rank_fusion import reciprocal_rank_fusion
+from staged_pipeline import Budget
 from dictionnaire_utils import DictionnaireFrancais, analyser_description_douane, suggerer_améliorations_description
 
 class CEDEAOClassifier:
-    def __init__(self):
-        self.data_file = "MON-TEC-CEDEAO-SH-2022-FREN-09-04-2024.txt"
+    # Candidats pris dans chaque recherche (lexicale, sémantique) puis gardés après fusion
+    HYBRID_K = 20
+    # Malus de pertinence d'une ligne dont les seuils excluent les mesures de la description
+    MEASURE_PENALTY = 0.3
+    
+    def __init__(self, data_file: Optional[str] = "MON-TEC-CEDEAO-SH-2022-FREN-09-04-2024.txt",
+                 advanced_classifier: Optional[AdvancedCEDEAOClassifier] = None,
+                 dictionnaire_francais: Optional[DictionnaireFrancais] = None, load_models: bool = True):
+        """
+        Args:
+            data_file: Fichier du tarif (None: aucun tarif chargé)
+            advanced_classifier: Classificateur sémantique (initialisé si absent et load_models)
+            dictionnaire_francais: Dictionnaire français (chargé si absent et load_models)
+            load_models: Charge l'IA avancée et le dictionnaire qui n'ont pas été fournis
+        """
+        self.data_file = data_file
         self.sections = {}
         self.chapters = {}
+        # Radicaux des titres de chapitres, calculés au chargement
+        self.chapter_terms = {}
         self.subheadings = {}
-        self.advanced_classifier = None
-        self.dictionnaire_francais = None
-        self.load_data()
-        self.initialize_advanced_classifier()
-        self.initialize_dictionnaire_francais()
+        self.tariff = None
+        self.lexical_index = None
+        self.fingerprint = None
+        self.advanced_classifier = advanced_classifier
+        self.dictionnaire_francais = dictionnaire_francais
+        # Recherche sémantique de la recherche hybride, propre au classificateur (un par session):
+        # thread créé à la première recherche, arrêté avec le classificateur
+        self.retrieval_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='recherche-semantique')
+        if data_file:
+            self.load_data()
+        if load_models and advanced_classifier is None:
+            self.initialize_advanced_classifier()
+        if load_models and dictionnaire_francais is None:
+            self.initialize_dictionnaire_francais()
     
     def initialize_advanced_classifier(self):
         """Initialise le classificateur avancé"""
         try:
             with st.spinner("Initialisation de l'IA avancée..."):
                 self.advanced_classifier = AdvancedCEDEAOClassifier()
+                # Prétraitement et encodage du tarif dès le chargement plutôt qu'à la première requête
+                self.advanced_classifier.get_tariff_index(self.get_database())
         except Exception as e:
             st.warning(f"L'IA avancée n'est pas disponible: {e}")
             self.advanced_classifier = None
@@ -44,35 +78,31 @@ class CEDEAOClassifier:
             with open(self.data_file, 'r', encoding='utf-8') as file:
                 content = file.read()
             
-            # Parse les sections
-            self.parse_sections(content)
-            # Parse les chapitres
-            self.parse_chapters(content)
+            # Structure du tarif lue en une passe: sections, chapitres, Notes, positions et lignes N.T.S.
+            # (lignes et libellés hérités servent aussi à la recherche BM25F)
+            self.tariff = analyser_tarif(content)
+            for anomaly in self.tariff.anomalies():
+                st.warning(f"Structure du tarif: {anomaly}")
+            # Sections et chapitres
+            self.parse_sections(self.tariff)
+            self.parse_chapters(self.tariff)
             # Parse les sous-positions
             self.parse_subheadings(content)
             
+            # Empreinte du contenu, pour ne reconstruire l'index du tarif que s'il change
+            self.fingerprint = tariff_fingerprint(self.get_database())
+            
         except Exception as e:
             st.error(f"Erreur lors du chargement des données: {e}")
     
-    def parse_sections(self, content: str):
-        """Parse les sections du système harmonisé"""
-        section_pattern = r'SECTION ([IVX]+)\s*\n([^\n]+(?:\n[^\n]+)*?)(?=SECTION|\Z)'
-        matches = re.finditer(section_pattern, content, re.MULTILINE | re.DOTALL)
-        
-        for match in matches:
-            section_num = match.group(1)
-            section_title = match.group(2).strip()
-            self.sections[section_num] = section_title
+    def parse_sections(self, tariff: Tarif):
+        """Sections du système harmonisé, lues dans la table des matières par analyser_tarif"""
+        self.sections.update(tariff.sections)
     
-    def parse_chapters(self, content: str):
-        """Parse les chapitres du système harmonisé"""
-        chapter_pattern = r'Chapitre (\d+)\s*\n([^\n]+(?:\n[^\n]+)*?)(?=Chapitre|\Z)'
-        matches = re.finditer(chapter_pattern, content, re.MULTILINE | re.DOTALL)
-        
-        for match in matches:
-            chapter_num = match.group(1)
-            chapter_content = match.group(2).strip()
-            self.chapters[chapter_num] = chapter_content
+    def parse_chapters(self, tariff: Tarif):
+        """Chapitres du système harmonisé (titres de la table des matières, clés "01" à "99")"""
+        self.chapters.update(tariff.chapitres)
+        self.chapter_terms.update((num, frozenset(tokenize(title))) for num, title in tariff.chapitres.items())
     
     def parse_subheadings(self, content: str):
         """Parse les sous-positions avec leurs taux"""
@@ -91,46 +121,128 @@ class CEDEAOClassifier:
                 'unit': unit
             }
     
-    def search_product(self, description: str, use_advanced: bool = True) -> List[Dict]:
-        """Recherche un produit dans la base de données"""
+    def get_database(self) -> Dict:
+        """Base tarifaire transmise au classificateur avancé"""
+        return {
+            'subheadings': self.subheadings,
+            'chapters': self.chapters,
+            'sections': self.sections,
+            'fingerprint': self.fingerprint
+        }
+    
+    def search_product(self, description: str, use_advanced: bool = True, hybrid: bool = False,
+                       budget=None) -> List[Dict]:
+        """
+        Recherche un produit dans la base de données (hybrid: fusion lexicale et sémantique)
+
+        budget: temps alloué, en secondes ou Budget (None: illimité). Une fois épuisé, la requête
+        n'est plus encodée ni les règles RGI appliquées; faute d'embedding, la recherche avancée se
+        replie sur la méthode de base.
+        """
+        if budget is not None and not isinstance(budget, Budget):
+            budget = Budget(budget)
+        if hybrid and self.advanced_classifier:
+            return self.hybrid_search(description, budget=budget)
         if use_advanced and self.advanced_classifier:
             # Utiliser le classificateur avancé
-            database = {
-                'subheadings': self.subheadings,
-                'chapters': self.chapters,
-                'sections': self.sections
-            }
-            return self.advanced_classifier.classify_product(description, database)
-        else:
-            # Méthode de base
-            results = []
-            description_lower = description.lower()
-            
-            # Recherche dans les sous-positions
-            for code, data in self.subheadings.items():
-                if any(word in data['description'].lower() for word in description_lower.split()):
-                    results.append({
-                        'type': 'subheading',
-                        'code': code,
-                        'description': data['description'],
-                        'rate': data['rate'],
-                        'relevance': self.calculate_relevance(description_lower, data['description'].lower())
-                    })
-            
-            # Recherche dans les chapitres
-            for chapter_num, chapter_content in self.chapters.items():
-                if any(word in chapter_content.lower() for word in description_lower.split()):
-                    results.append({
-                        'type': 'chapter',
-                        'code': chapter_num,
-                        'description': chapter_content[:200] + "...",
-                        'rate': 'À déterminer selon sous-position',
-                        'relevance': self.calculate_relevance(description_lower, chapter_content.lower())
-                    })
-            
-            # Trier par pertinence
-            results.sort(key=lambda x: x['relevance'], reverse=True)
-            return results[:10]  # Retourner les 10 meilleurs résultats
+            results = self.advanced_classifier.classify_product(description, self.get_database(), budget=budget)
+            if results or budget is None or 'encode_query' not in budget.skipped:
+                return results
+        # Méthode de base
+        results = []
+        description_lower = description.lower()
+        
+        # Recherche dans les lignes N.T.S. (BM25F: désignation, libellés hérités, titres)
+        results.extend(self.lexical_top_k(description, 10, budget))
+        
+        # Recherche dans les chapitres: radical commun avec le titre (pas de recherche de sous-chaîne)
+        description_terms = set(tokenize(description))
+        for chapter_num, chapter_content in self.chapters.items():
+            if description_terms & self.chapter_terms.get(chapter_num, frozenset()):
+                results.append({
+                    'type': 'chapter',
+                    'code': chapter_num,
+                    'description': chapter_content[:200] + "...",
+                    'rate': 'À déterminer selon sous-position',
+                    'relevance': self.calculate_relevance(description_lower, chapter_content.lower())
+                })
+        
+        # Trier par pertinence
+        results.sort(key=lambda x: x['relevance'], reverse=True)
+        return results[:10]  # Retourner les 10 meilleurs résultats
+    
+    def lexical_top_k(self, description: str, k: int, budget: Optional[Budget] = None) -> List[Dict]:
+        """
+        Les k meilleures lignes N.T.S. pour l'index BM25F, pénalisées si leurs seuils excluent les
+        mesures (budget épuisé: les meilleures parmi les lignes déjà évaluées)
+        """
+        index = self.get_lexical_index()
+        if index is None:
+            return []
+        results = []
+        ranked, _, interrupted = index.search(description, k,
+                                              should_stop=budget.expired if budget is not None else None)
+        if interrupted:
+            budget.skip('subheading_ranking')
+        # Pertinence rapportée au meilleur score atteignable par la requête: une ligne ne contenant
+        # qu'une partie des termes indexés de la description reste en deçà de 1
+        ceiling = index.max_score(description)
+        measures = extraire_mesures(description)
+        for doc_id, score in ranked:
+            line = self.tariff.lignes[doc_id]
+            relevance = min(score / ceiling, 1.0)
+            # Ligne dont les seuils excluent les mesures de la description (« n'excédant pas 10 kg »):
+            # rétrogradée plutôt qu'écartée, la mesure pouvant être mal lue
+            if verifier_mesures(line.intervalles, measures) is False:
+                relevance = max(relevance - self.MEASURE_PENALTY, 0.0)
+            results.append({
+                'type': 'subheading',
+                'code': line.code,
+                'description': line.designation,
+                'rate': f"{line.droit}%",
+                'relevance': relevance
+            })
+        results.sort(key=lambda x: x['relevance'], reverse=True)
+        return results
+    
+    def hybrid_search(self, description: str, k: int = HYBRID_K, budget: Optional[Budget] = None) -> List[Dict]:
+        """
+        Recherche hybride: les plus proches voisins des embeddings sont cherchés dans le pool du
+        classificateur pendant que l'index BM25F est interrogé (k candidats chacun) et fusionnés par rangs réciproques; seuls les k premiers
+        candidats fusionnés reçoivent leur similarité manquante et passent les règles RGI (le budget
+        épuisé, la recherche sémantique n'encode plus la requête et les règles RGI sont sautées)
+        """
+        classifier = self.advanced_classifier
+        database = self.get_database()
+        semantic = self.retrieval_pool.submit(classifier.semantic_top_k, description, database, k, budget)
+        lexical = self.lexical_top_k(description, k, budget)
+        semantic = semantic.result()
+        
+        # Données d'un code: celles de la recherche sémantique (similarité déjà calculée) en priorité
+        candidates = {candidate['code']: candidate for candidate in lexical}
+        candidates.update((candidate['code'], candidate) for candidate in semantic)
+        fused = reciprocal_rank_fusion([[candidate['code'] for candidate in lexical],
+                                        [candidate['code'] for candidate in semantic]], limit=k)
+        if not fused:
+            return []
+        best_fusion = fused[0][1]
+        shortlist = []
+        for code, fusion_score in fused:
+            candidate = dict(candidates[code])
+            candidate.pop('relevance', None)
+            candidate['fusion_score'] = fusion_score / best_fusion
+            shortlist.append(candidate)
+        classifier.fill_similarities(description, shortlist, database, budget=budget)
+        results = classifier.rescore_candidates(description, shortlist, score_key='fusion_score', budget=budget)
+        for result in results:
+            result['relevance'] = min(result['final_score'], 1.0)
+        return results
+    
+    def get_lexical_index(self) -> Optional[FieldedLexicalIndex]:
+        """Index BM25F des lignes N.T.S., construit à la première recherche de base"""
+        if self.lexical_index is None and self.tariff is not None:
+            self.lexical_index = FieldedLexicalIndex(self.tariff.champs(line) for line in self.tariff.lignes)
+        return self.lexical_index
     
     def calculate_relevance(self, query: str, text: str) -> float:
         """Calcule la pertinence d'une correspondance"""
@@ -286,19 +398,16 @@ def main():
         col1, col2 = st.columns(2)
         with col1:
             use_advanced_ai = st.checkbox("🤖 Utiliser l'IA avancée", value=True, help="Active l'analyse sémantique et les règles RGI")
+            hybrid_retrieval = st.checkbox("🔀 Recherche hybride", value=False, help="Fusionne la recherche lexicale et la recherche sémantique avant les règles RGI")
         with col2:
             show_details = st.checkbox("📊 Afficher les détails", value=False, help="Affiche l'analyse détaillée et les explications")
         
         if st.button("🚀 Classifier le Produit", type="primary", use_container_width=True):
             if product_description.strip():
                 with st.spinner("Analyse en cours..."):
-                    if use_advanced_ai and st.session_state.classifier.advanced_classifier:
+                    if use_advanced_ai and st.session_state.classifier.advanced_classifier and not hybrid_retrieval:
                         # Classification avancée
-                        database = {
-                            'subheadings': st.session_state.classifier.subheadings,
-                            'chapters': st.session_state.classifier.chapters,
-                            'sections': st.session_state.classifier.sections
-                        }
+                        database = st.session_state.classifier.get_database()
                         classification = st.session_state.classifier.advanced_classifier.get_detailed_classification(
                             product_description, database
                         )
@@ -356,8 +465,9 @@ def main():
                                 for suggestion in classification['suggestions']:
                                     st.write(f"• {suggestion}")
                     else:
-                        # Classification de base
-                        results = st.session_state.classifier.search_product(product_description, use_advanced=False)
+                        # Classification de base (ou hybride si l'IA avancée est disponible)
+                        results = st.session_state.classifier.search_product(product_description, use_advanced=False,
+                                                                             hybrid=hybrid_retrieval)
                         
                         if results:
                             st.success(f"✅ {len(results)} résultat(s) trouvé(s)")
@@ -462,7 +572,7 @@ def main():
             with col2:
                 st.metric("Longueur moyenne", f"{stats['longueur_moyenne']:.1f}")
             with col3:
-                st.metric("Mots uniques", len(set(st.session_state.classifier.dictionnaire_francais.mots_francais)))
+                st.metric("Mots uniques", len(st.session_state.classifier.dictionnaire_francais.mots_francais))
             
             # Test de mots
             st.subheader("🔍 Test de Mots")
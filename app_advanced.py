@@ -1,17 +1,30 @@
 import streamlit as st
 import re
+import heapq
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 import json
 import os
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
-import spacy
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 import requests
 from difflib import SequenceMatcher
+from lexique import charger_lexique
+from normalisation import mots_normalises, normaliser_texte, radical
+from analyse_requete import analyser_requete
+from lexical_index import FieldedLexicalIndex
+from tarif_structure import Tarif, analyser_tarif
+from intervalles import IndexIntervalles
+from exclusions import TableExclusions, construire_exclusions
+from synonymes import TableSynonymes
+from correction import IndexTrigrammes
+from analyses_mots import AnalyseMot, TableAnalyses, charger_analyses, empreinte_sources, fichier_analyses
+from classification_result import ClassificationResult, Match
+from staged_pipeline import Budget, StagedPipeline, detail_rank, DETAIL_ANALYSIS, DETAIL_FULL
+from nlp_pipeline import load_pipeline, parse, parse_batch, DEFAULT_BATCH_SIZE, DEFAULT_N_PROCESS
 
 # Télécharger les ressources NLTK si nécessaire
 try:
@@ -27,10 +40,27 @@ except LookupError:
 class FrenchLanguageProcessor:
     """Processeur linguistique français avancé"""
     
+    # Similarité minimale (SequenceMatcher) des mots similaires
+    SIMILARITY_THRESHOLD = 0.8
+    
     def __init__(self):
         self.french_dictionary = self.load_french_dictionary()
+        # Clés normalisées (sans accents) → mot du vocabulaire: "velo" retrouve "vélo"
+        self.french_keys = {}
+        for word in sorted(self.french_dictionary):
+            self.french_keys.setdefault(normaliser_texte(word), word)
+        # Lexique compilé du dictionnaire complet (partagé avec DictionnaireFrancais), en clés normalisées
+        self.lexicon = charger_lexique("dictionnaire_francais.txt", plier=True)
         self.synonyms_database = self.load_synonyms_database()
+        # Synonymes de chaque mot précalculés (pas de recherche inverse à chaque requête)
+        self.synonym_table = TableSynonymes(self.synonyms_database)
         self.semantic_categories = self.load_semantic_categories()
+        # Analyse de chaque mot du vocabulaire calculée une fois et enregistrée avec le lexique compilé
+        analyses = charger_analyses(
+            self.french_dictionary, self.compute_word_analysis, fichier_analyses("dictionnaire_francais.txt"),
+            empreinte_sources(self.french_dictionary, self.synonyms_database, self.semantic_categories,
+                              self.SIMILARITY_THRESHOLD))
+        self.word_table = TableAnalyses(analyses, self.french_keys, self.lexicon)
         
     def load_french_dictionary(self):
         """Charge un dictionnaire français complet"""
@@ -162,7 +192,7 @@ class FrenchLanguageProcessor:
             'fonctions': ['transport', 'traitement', 'protection', 'stockage', 'alimentation', 'médical', 'hygiène', 'beauté', 'décoration', 'confort']
         }
     
-    def find_similar_words(self, word: str, threshold: float = 0.8) -> List[str]:
+    def find_similar_words(self, word: str, threshold: float = SIMILARITY_THRESHOLD) -> List[str]:
         """Trouve des mots similaires dans le dictionnaire français"""
         similar_words = []
         word_lower = word.lower()
@@ -175,21 +205,8 @@ class FrenchLanguageProcessor:
         return similar_words
     
     def get_synonyms(self, word: str) -> List[str]:
-        """Récupère les synonymes d'un mot"""
-        word_lower = word.lower()
-        synonyms = []
-        
-        # Recherche directe
-        if word_lower in self.synonyms_database:
-            synonyms.extend(self.synonyms_database[word_lower])
-        
-        # Recherche inverse
-        for key, values in self.synonyms_database.items():
-            if word_lower in values:
-                synonyms.append(key)
-                synonyms.extend([v for v in values if v != word_lower])
-        
-        return list(set(synonyms))
+        """Récupère les synonymes d'un mot (tête et membres de ses groupes)"""
+        return self.synonym_table.synonymes_de(word)
     
     def get_semantic_category(self, word: str) -> List[str]:
         """Détermine la catégorie sémantique d'un mot"""
@@ -202,9 +219,15 @@ class FrenchLanguageProcessor:
         
         return categories
     
-    def analyze_text(self, text: str) -> Dict:
-        """Analyse complète d'un texte en français"""
-        words = text.lower().split()
+    def compute_word_analysis(self, word: str) -> AnalyseMot:
+        """Analyse d'un mot du vocabulaire (calculée hors ligne pour la table des analyses)"""
+        return AnalyseMot(word, True, tuple(self.find_similar_words(word)), tuple(self.get_synonyms(word)),
+                          tuple(self.get_semantic_category(word)))
+    
+    def analyze_text(self, text) -> Dict:
+        """Analyse complète d'un texte en français (texte ou AnalyseRequete), mot par mot dans la table"""
+        requete = analyser_requete(text)
+        words = requete.mots_bruts
         analysis = {
             'words': words,
             'similar_words': {},
@@ -214,59 +237,77 @@ class FrenchLanguageProcessor:
             'unknown_words': []
         }
         
-        for word in words:
-            # Nettoyer le mot
-            clean_word = re.sub(r'[^\w\s]', '', word)
+        for clean_word in requete.mots_nettoyes:
             if not clean_word:
                 continue
             
-            # Vérifier si c'est un mot français
-            if clean_word in self.french_dictionary:
-                analysis['french_words'].append(clean_word)
-                
-                # Trouver les mots similaires
-                similar = self.find_similar_words(clean_word)
-                if similar:
-                    analysis['similar_words'][clean_word] = similar
-                
-                # Trouver les synonymes
-                synonyms = self.get_synonyms(clean_word)
-                if synonyms:
-                    analysis['synonyms'][clean_word] = synonyms
-                
-                # Trouver les catégories sémantiques
-                categories = self.get_semantic_category(clean_word)
-                if categories:
-                    analysis['semantic_categories'][clean_word] = categories
-            else:
+            # Mot du vocabulaire (éventuellement par sa clé normalisée), du lexique complet ou inconnu
+            word = self.word_table.analyse(clean_word)
+            if word is None:
                 analysis['unknown_words'].append(clean_word)
+                continue
+            analysis['french_words'].append(word.mot)
+            if word.enrichi:
+                # Mots similaires, synonymes et catégories sémantiques précalculés
+                if word.similaires:
+                    analysis['similar_words'][word.mot] = list(word.similaires)
+                if word.synonymes:
+                    analysis['synonyms'][word.mot] = list(word.synonymes)
+                if word.categories:
+                    analysis['semantic_categories'][word.mot] = list(word.categories)
         
         return analysis
 
 class AdvancedCEDEAOClassifier:
-    def __init__(self):
-        self.data_file = "MON-TEC-CEDEAO-SH-2022-FREN-09-04-2024.txt"
+    # Correspondances retournées, et sous-positions présélectionnées par l'index lexical
+    MAX_MATCHES = 5
+    SUBHEADING_CANDIDATES = 20
+    # Bonus de confiance d'une sous-position dont les seuils contiennent les mesures de la description
+    MEASURE_BOOST = 0.1
+    # Malus d'une sous-position dont les seuils excluent les mesures (une mesure mal lue ne l'écarte pas)
+    MEASURE_PENALTY = 0.3
+    # Malus d'une correspondance dans un chapitre ou une position visés par une Note déclenchée
+    EXCLUSION_PENALTY = 0.3
+    
+    def __init__(self, data_file: Optional[str] = "MON-TEC-CEDEAO-SH-2022-FREN-09-04-2024.txt", nlp=None,
+                 language_processor=None, product_database: Optional[Dict] = None):
+        """
+        Args:
+            data_file: Fichier du tarif (None: aucun tarif chargé, sous-positions fournies ensuite)
+            nlp: Pipeline spaCy (chargé par load_nlp_models si absent)
+            language_processor: Processeur linguistique (FrenchLanguageProcessor si absent)
+            product_database: Base des produits courants (create_product_database si absente)
+        """
+        self.data_file = data_file
         self.sections = {}
         self.chapters = {}
         self.subheadings = {}
-        self.product_database = self.create_product_database()
+        self.tariff = None
+        self.exclusions = TableExclusions([])
+        # Index des sous-positions et table des synonymes, construits au premier usage
+        self.subheading_index = None
+        self.synonym_table = None
+        self.product_database = product_database if product_database is not None else self.create_product_database()
         self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
-        self.language_processor = FrenchLanguageProcessor()
-        self.load_data()
-        self.load_nlp_models()
+        self.language_processor = language_processor if language_processor is not None else FrenchLanguageProcessor()
+        if data_file:
+            self.load_data()
+        self.nlp = nlp
+        if nlp is None:
+            self.load_nlp_models()
         
     def load_nlp_models(self):
-        """Charge les modèles NLP"""
+        """Charge les modèles NLP (tokeniseur et entités nommées uniquement)"""
         try:
-            self.nlp = spacy.load("fr_core_news_sm")
+            self.nlp = load_pipeline("fr_core_news_sm")
         except OSError:
             st.warning("Modèle spaCy français non trouvé. Utilisation du modèle anglais par défaut.")
             try:
-                self.nlp = spacy.load("en_core_web_sm")
+                self.nlp = load_pipeline("en_core_web_sm")
             except OSError:
                 st.error("Aucun modèle spaCy disponible. Installation d'un modèle de base...")
                 os.system("python -m spacy download en_core_web_sm")
-                self.nlp = spacy.load("en_core_web_sm")
+                self.nlp = load_pipeline("en_core_web_sm")
     
     def create_product_database(self):
         """Crée une base de données de produits courants avec plus de détails et synonymes"""
@@ -279,7 +320,8 @@ class AdvancedCEDEAOClassifier:
                 'section': 'XVI',
                 'materials': ['métal', 'plastique', 'silicon'],
                 'functions': ['traitement', 'calcul', 'stockage'],
-                'brands': ['dell', 'hp', 'lenovo', 'apple', 'asus', 'acer', 'toshiba', 'samsung', 'msi', 'razer'],
+                'brands': ['dell', 'hp', 'lenovo', 'apple', 'asus', 'acer', 'toshiba', 'samsung', 'msi', 'razer',
+                           'intel', 'amd'],
                 'synonyms': ['pc', 'computer', 'machine', 'calculateur', 'processeur', 'cpu', 'tour', 'desktop']
             },
             'laptop': {
@@ -289,7 +331,8 @@ class AdvancedCEDEAOClassifier:
                 'section': 'XVI',
                 'materials': ['métal', 'plastique', 'lithium'],
                 'functions': ['traitement', 'portable', 'batterie'],
-                'brands': ['dell', 'hp', 'lenovo', 'apple', 'asus', 'acer', 'toshiba', 'samsung', 'msi', 'razer'],
+                'brands': ['dell', 'hp', 'lenovo', 'apple', 'asus', 'acer', 'toshiba', 'samsung', 'msi', 'razer',
+                           'intel', 'amd'],
                 'synonyms': ['portable', 'notebook', 'macbook', 'chromebook', 'ultrabook', 'ordinateur portable']
             },
             'smartphone': {
@@ -499,25 +542,22 @@ class AdvancedCEDEAOClassifier:
             with open(self.data_file, 'r', encoding='utf-8') as file:
                 content = file.read()
             
-            # Parse les sections
-            self.parse_sections(content)
-            # Parse les chapitres
-            self.parse_chapters(content)
-            # Parse les sous-positions
-            self.parse_subheadings(content)
+            # Structure du tarif lue en une passe: sections, chapitres, Notes, positions et lignes N.T.S.
+            self.tariff = analyser_tarif(content)
+            for anomaly in self.tariff.anomalies():
+                st.warning(f"Structure du tarif: {anomaly}")
+            # Sections et chapitres
+            self.parse_sections(self.tariff)
+            self.parse_chapters(self.tariff)
+            # Sous-positions et exclusions des Notes
+            self.parse_subheadings(self.tariff)
             
         except Exception as e:
             st.error(f"Erreur lors du chargement des données: {e}")
     
-    def parse_sections(self, content: str):
-        """Parse les sections du système harmonisé"""
-        section_pattern = r'SECTION ([IVX]+)\s*\n([^\n]+(?:\n[^\n]+)*?)(?=SECTION|\Z)'
-        matches = re.finditer(section_pattern, content, re.MULTILINE | re.DOTALL)
-        
-        for match in matches:
-            section_num = match.group(1)
-            section_title = match.group(2).strip()
-            self.sections[section_num] = section_title
+    def parse_sections(self, tariff: Tarif):
+        """Sections du système harmonisé, lues dans la table des matières par analyser_tarif"""
+        self.sections.update(tariff.sections)
         
         # Si aucune section n'est trouvée, créer des sections basées sur les chapitres
         if not self.sections:
@@ -552,47 +592,38 @@ class AdvancedCEDEAOClassifier:
         for section_num, title in section_mapping.items():
             self.sections[section_num] = title
     
-    def parse_chapters(self, content: str):
-        """Parse les chapitres du système harmonisé"""
-        # Pattern pour les chapitres numérotés
-        chapter_pattern = r'^(\d+)\s+([^\n]+(?:\n[^\n]+)*?)(?=^\d+\s|$)'
-        matches = re.finditer(chapter_pattern, content, re.MULTILINE | re.DOTALL)
-        
-        for match in matches:
-            chapter_num = match.group(1)
-            chapter_content = match.group(2).strip()
-            self.chapters[chapter_num] = chapter_content
-        
-        # Si aucun chapitre n'est trouvé, essayer un autre pattern
-        if not self.chapters:
-            chapter_pattern2 = r'(\d+)\s+([^\n]+)'
-            matches2 = re.finditer(chapter_pattern2, content, re.MULTILINE)
-            
-            for match in matches2:
-                chapter_num = match.group(1)
-                chapter_content = match.group(2).strip()
-                if chapter_num not in self.chapters:
-                    self.chapters[chapter_num] = chapter_content
+    def parse_chapters(self, tariff: Tarif):
+        """Chapitres du système harmonisé (titres de la table des matières, clés "01" à "99")"""
+        self.chapters.update(tariff.chapitres)
     
-    def parse_subheadings(self, content: str):
-        """Parse les sous-positions avec leurs taux"""
-        # Pattern pour les sous-positions avec codes et taux
-        subheading_pattern = r'(\d{2}\.\d{2}\.\d{2})\s+([^\n]+?)\s+(\d+(?:\.\d+)?%)'
-        matches = re.finditer(subheading_pattern, content)
-        
-        for match in matches:
-            code = match.group(1)
-            description = match.group(2).strip()
-            rate = match.group(3)
-            self.subheadings[code] = {
-                'description': description,
-                'rate': rate
+    def parse_subheadings(self, tariff: Tarif):
+        """Lignes N.T.S. avec leurs taux (contexte hérité dans self.tariff) et exclusions des Notes"""
+        self.tariff = tariff
+        self.exclusions = construire_exclusions(self.tariff)
+        for line in self.tariff.lignes:
+            self.subheadings[line.code] = {
+                'description': line.designation,
+                'rate': f"{line.droit}%",
+                'unit': line.unite
             }
     
-    def extract_features(self, text: str) -> Dict:
-        """Extrait les caractéristiques du texte avec spaCy"""
-        doc = self.nlp(text.lower())
-        
+    def extract_features(self, text) -> Dict:
+        """Extrait les caractéristiques du texte (ou d'une AnalyseRequete) avec spaCy"""
+        requete = analyser_requete(text)
+        # Les candidats aux entités sont détectés sur le texte d'origine (majuscules)
+        doc = parse(self.nlp, requete.minuscule, source=requete.texte)
+        return self.extract_features_from_doc(requete, doc)
+    
+    def extract_features_batch(self, texts: List[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                               n_process: int = DEFAULT_N_PROCESS) -> List[Dict]:
+        """Extrait les caractéristiques d'une liste de textes en un seul passage nlp.pipe"""
+        docs = parse_batch(self.nlp, [text.lower() for text in texts], sources=texts,
+                           batch_size=batch_size, n_process=n_process)
+        return [self.extract_features_from_doc(text, doc) for text, doc in zip(texts, docs)]
+    
+    def extract_features_from_doc(self, text, doc) -> Dict:
+        """Caractéristiques d'un texte à partir de son Doc spaCy"""
+        text_lower = analyser_requete(text).minuscule
         features = {
             'materials': [],
             'functions': [],
@@ -620,12 +651,12 @@ class AdvancedCEDEAOClassifier:
         
         # Extraction des dimensions
         dimension_pattern = r'(\d+(?:\.\d+)?)\s*(pouces|cm|mm|gb|tb|mhz|ghz)'
-        dimensions = re.findall(dimension_pattern, text.lower())
+        dimensions = re.findall(dimension_pattern, text_lower)
         features['dimensions'] = [f"{d[0]} {d[1]}" for d in dimensions]
         
         # Extraction des spécifications techniques
         tech_pattern = r'(intel|amd|nvidia|wifi|bluetooth|5g|4g|lte|ssd|hdd|ram)'
-        tech_specs = re.findall(tech_pattern, text.lower())
+        tech_specs = re.findall(tech_pattern, text_lower)
         features['technical_specs'] = tech_specs
         
         return features
@@ -652,32 +683,33 @@ class AdvancedCEDEAOClassifier:
         intersection = query_words.intersection(text_words)
         return len(intersection) / len(query_words)
     
-    def apply_rgi_rules(self, query: str, product_data: Dict) -> float:
+    def apply_rgi_rules(self, query, product_data: Dict) -> float:
         """Applique les règles RGI pour ajuster le score"""
         score_boost = 0.0
+        query_lower = analyser_requete(query).minuscule
         
         # RGI 2: Marchandises incomplètes classées comme complètes
         incomplete_keywords = ['partie', 'composant', 'pièce', 'accessoire']
-        if any(word in query.lower() for word in incomplete_keywords):
+        if any(word in query_lower for word in incomplete_keywords):
             score_boost += 0.1
         
         # RGI 3: Mélange selon la matière prépondérante
         materials = product_data.get('materials', [])
         if materials:
-            material_count = sum(1 for material in materials if material in query.lower())
+            material_count = sum(1 for material in materials if material in query_lower)
             if material_count > 0:
                 score_boost += 0.15
         
         # RGI 4: Classification par analogie
         functions = product_data.get('functions', [])
         if functions:
-            function_count = sum(1 for function in functions if function in query.lower())
+            function_count = sum(1 for function in functions if function in query_lower)
             if function_count > 0:
                 score_boost += 0.1
         
         # RGI 5: Emballages classés avec les marchandises
         packaging_keywords = ['emballage', 'boîte', 'carton', 'sachet']
-        if any(word in query.lower() for word in packaging_keywords):
+        if any(word in query_lower for word in packaging_keywords):
             score_boost += 0.05
         
         # RGI 6: Sous-positions spécifiques prioritaires
@@ -686,36 +718,161 @@ class AdvancedCEDEAOClassifier:
         
         return score_boost
     
-    def classify_product(self, description: str) -> Dict:
-        """Classification avancée d'un produit avec compréhension linguistique complète"""
-        results = []
-        description_lower = description.lower()
-        
-        # Détection d'ambiguïté
-        ambiguity_check = self.detect_ambiguous_description(description)
-        
-        # Analyse linguistique avancée
-        language_analysis = self.language_processor.analyze_text(description)
-        
-        # Extraction des caractéristiques
-        features = self.extract_features(description)
-        
-        # Si la description est ambiguë, retourner immédiatement
+    def classify_product(self, description, detail: str = DETAIL_FULL, budget=None) -> ClassificationResult:
+        """
+        Classification avancée d'un produit avec compréhension linguistique complète
+
+        Les étapes sont évaluées à la demande: la détection d'ambiguïté passe en premier, spaCy
+        n'est appelé qu'à partir du niveau 'analysis' et l'explication et les suggestions
+        qu'au niveau 'full' (par défaut). Une fois le budget épuisé, les étapes facultatives
+        (analyse linguistique, corrections, spaCy, similarité TF-IDF, explication, suggestions)
+        sont sautées et notées dans skipped_stages; seuls l'ambiguïté, les exclusions et le
+        classement lexical sont toujours calculés.
+
+        Args:
+            description: Description du produit (ou son AnalyseRequete)
+            detail: Niveau de détail du résultat (DETAIL_CODE, DETAIL_ANALYSIS ou DETAIL_FULL)
+            budget: Temps alloué à la requête, en secondes ou Budget (None: illimité)
+
+        Returns:
+            ClassificationResult, accessible comme un dict; caractéristiques et analyse linguistique
+            y figurent une seule fois, pas dans chaque correspondance
+        """
+        level = detail_rank(detail)
+        budget = budget if isinstance(budget, Budget) else Budget(budget)
+        # Découpages de la description faits une fois pour toutes les étapes
+        requete = analyser_requete(description)
+        stages = StagedPipeline({
+            'ambiguity': lambda s: self.detect_ambiguous_description(requete),
+            'language_analysis': lambda s: self.language_processor.analyze_text(requete),
+            'features': lambda s: self.extract_features(requete),
+            'exclusions': lambda s: self.match_exclusions(requete),
+            'corrections': lambda s: self.correct_query(requete),
+            'matches': lambda s: self.rank_matches(requete, s['language_analysis'], limit=self.MAX_MATCHES,
+                                                   exclusions=s['exclusions'], corrections=s['corrections'],
+                                                   budget=budget),
+            'explanation': lambda s: (self.generate_explanation(s['matches'][0], s['features'],
+                                                                s['language_analysis'])
+                                      if s['matches'] else "Aucune correspondance trouvée dans la base de données."),
+            'suggestions': lambda s: self.get_suggestions(requete, s['features'])
+        }, budget=budget, fallbacks={
+            'language_analysis': lambda: {'words': requete.mots_bruts, 'similar_words': {}, 'synonyms': {},
+                                          'semantic_categories': {}, 'french_words': [], 'unknown_words': []},
+            'corrections': dict,
+            'features': lambda: {'materials': [], 'functions': [], 'dimensions': [], 'brands': [],
+                                 'technical_specs': []},
+            'explanation': lambda: "Explication non calculée: temps de réponse alloué épuisé.",
+            'suggestions': list
+        })
+        
+        # Si la description est ambiguë, retourner immédiatement (sans analyse coûteuse)
+        ambiguity_check = stages['ambiguity']
         if ambiguity_check['is_ambiguous']:
-            return {
-                'best_match': None,
-                'all_matches': [],
-                'features': features,
-                'confidence': 0.0,
-                'explanation': f"❌ **Description ambiguë détectée**\n\n{ambiguity_check['message']}",
-                'suggestions': ambiguity_check['suggestions'],
-                'language_analysis': language_analysis,
-                'is_ambiguous': True,
-                'ambiguity_details': ambiguity_check
-            }
+            result = ClassificationResult(
+                best_match=None,
+                all_matches=[],
+                confidence=0.0,
+                suggestions=ambiguity_check['suggestions'],
+                is_ambiguous=True,
+                ambiguity_details=ambiguity_check
+            )
+            if level >= detail_rank(DETAIL_ANALYSIS):
+                result.features = stages['features']
+                result.language_analysis = stages['language_analysis']
+            if level >= detail_rank(DETAIL_FULL):
+                result.explanation = f"❌ **Description ambiguë détectée**\n\n{ambiguity_check['message']}"
+            if budget.skipped:
+                result.skipped_stages = list(budget.skipped)
+            return result
+        
+        results = stages['matches']
+        result = ClassificationResult(
+            best_match=results[0] if results else None,
+            all_matches=results,
+            confidence=results[0].confidence if results else 0.0,
+            language_analysis=stages['language_analysis']
+        )
+        if stages['exclusions']:
+            result.exclusions = [{'scope': clause.portee, 'target': clause.cible, 'rule': str(clause),
+                                  'redirect': list(clause.renvois)} for clause in stages['exclusions']]
+        if stages['corrections']:
+            result.corrections = stages['corrections']
+        if level >= detail_rank(DETAIL_ANALYSIS):
+            result.features = stages['features']
+        if level >= detail_rank(DETAIL_FULL):
+            result.explanation = stages['explanation']
+            result.suggestions = stages['suggestions']
+        if budget.skipped:
+            result.skipped_stages = list(budget.skipped)
+        return result
+    
+    def match_exclusions(self, description) -> List:
+        """Clauses « ne comprend pas » des Notes déclenchées par la description"""
+        return self.exclusions.declenchees(analyser_requete(description).mots_plies)
+    
+    def correct_query(self, description) -> Dict[str, List[str]]:
+        """
+        Termes du tarif proposés pour les mots de la description inconnus à la fois du tarif, du
+        lexique français et de la base de produits (fautes de frappe: "chausurres" -> "chaussures")
+        """
+        requete = analyser_requete(description)
+        index = self.get_subheading_index()
+        terms = index['index'].doc_ids
+        word_table = getattr(self.language_processor, 'word_table', None)
+        synonym_table = self.get_synonym_table()
+        corrections = {}
+        for word in dict.fromkeys(requete.mots_plies):
+            if not word.isalpha() or radical(word) in terms or synonym_table.relations([word]):
+                continue
+            if word_table is not None and word_table.analyse(word) is not None:
+                continue
+            proposals = [term for term, _ in index['vocabulary'].corriger(word)]
+            if proposals:
+                corrections[word] = proposals
+        return corrections
+    
+    def rank_matches(self, description, language_analysis: Dict, limit: Optional[int] = None,
+                     exclusions: Optional[List] = None,
+                     corrections: Optional[Dict[str, List[str]]] = None,
+                     budget: Optional[Budget] = None) -> List[Match]:
+        """
+        Correspondances (produits puis sous-positions) triées par confiance décroissante (les limit premières)
+
+        Les correspondances des chapitres et positions visés par les Notes (exclusions, sinon celles
+        déclenchées par la description) perdent EXCLUSION_PENALTY de confiance. Les termes proposés pour les mots mal orthographiés
+        (corrections, sinon correct_query) s'ajoutent à la requête. Le budget est vérifié à chaque
+        produit: une fois épuisé, seuls les produits cités par la description sont encore évalués
+        ('product_scan'), sans analyse contextuelle ('context_analysis'), similarité TF-IDF
+        ('semantic_similarity') ni règles RGI ('rgi_rules'); le classement BM25F s'arrête aux
+        meilleures lignes déjà évaluées ('subheading_ranking').
+        """
+        results = []
+        requete = analyser_requete(description)
+        description = requete.texte
+        description_lower = requete.minuscule
+        if exclusions is None:
+            exclusions = self.match_exclusions(requete)
+        excluded_chapters, excluded_headings = (self.exclusions.portee_exclue(exclusions, requete.mots_plies)
+                                                if exclusions else (frozenset(), frozenset()))
+        if corrections is None:
+            corrections = self.correct_query(requete)
+        words = list(requete.mots_plies) + [term for terms in corrections.values() for term in terms]
+        # Mots-clés, synonymes, marques, matières et fonctions des produits présents dans la description
+        # (une consultation par groupe de mots au lieu d'une recherche de chaque terme de chaque produit)
+        synonym_table = self.get_synonym_table()
+        relations = synonym_table.relations(words)
+        # Entrées de la base citant des mots similaires à ceux de la description
+        similar_products = {word: synonym_table.produits_citant(similar_words)
+                            for word, similar_words in language_analysis['similar_words'].items()}
         
         # Recherche intelligente dans la base de données de produits
         for keyword, product_data in self.product_database.items():
+            expired = budget is not None and budget.expired()
+            if expired and keyword not in relations:
+                budget.skip('product_scan')
+                continue
+            digits = product_data['code'].replace('.', '')
+            found = relations.get(keyword, {})
             score = 0.0
             match_type = "none"
             match_details = {
@@ -730,40 +887,30 @@ class AdvancedCEDEAOClassifier:
             }
             
             # 1. Recherche par mot-clé principal
-            if keyword in description_lower:
+            if 'keyword' in found:
                 score += 0.4
                 match_type = "keyword"
                 match_details['keyword_match'] = True
             
             # 2. Recherche par synonymes étendus
-            synonyms = product_data.get('synonyms', [])
-            for synonym in synonyms:
-                if synonym in description_lower:
-                    score += 0.35
-                    match_type = "synonym"
-                    match_details['synonym_matches'].append(synonym)
+            if 'synonym' in found:
+                score += 0.35 * len(found['synonym'])
+                match_type = "synonym"
+                match_details['synonym_matches'] = found['synonym']
             
             # 3. Recherche par marques
-            brands = product_data.get('brands', [])
-            for brand in brands:
-                if brand in description_lower:
-                    match_details['brand_matches'].append(brand)
-                    score += 0.3
-                    match_type = "brand"
+            if 'brand' in found:
+                match_details['brand_matches'] = found['brand']
+                score += 0.3 * len(found['brand'])
+                match_type = "brand"
             
             # 4. Recherche par matériaux
-            materials = product_data.get('materials', [])
-            for material in materials:
-                if material in description_lower:
-                    match_details['material_matches'].append(material)
-                    score += 0.25
+            match_details['material_matches'] = found.get('material', [])
+            score += 0.25 * len(match_details['material_matches'])
             
             # 5. Recherche par fonctions
-            functions = product_data.get('functions', [])
-            for function in functions:
-                if function in description_lower:
-                    match_details['function_matches'].append(function)
-                    score += 0.1
+            match_details['function_matches'] = found.get('function', [])
+            score += 0.1 * len(match_details['function_matches'])
             
             # 6. Recherche par catégories sémantiques
             for word, categories in language_analysis['semantic_categories'].items():
@@ -772,8 +919,8 @@ class AdvancedCEDEAOClassifier:
                     score += 0.15
             
             # 7. Recherche par mots similaires
-            for word, similar_words in language_analysis['similar_words'].items():
-                if any(similar in [keyword] + synonyms + brands + materials + functions for similar in similar_words):
+            for word, products in similar_products.items():
+                if keyword in products:
                     match_details['similar_word_matches'].append(word)
                     score += 0.2
             
@@ -787,81 +934,131 @@ class AdvancedCEDEAOClassifier:
             elif 'iphone' in description_lower and keyword == 'smartphone':
                 score += 0.2
             
-            # 9. Analyse contextuelle avancée
-            context_score = self.analyze_context(description, product_data, language_analysis)
-            score += context_score
+            # 9. Analyse contextuelle avancée (sautée si le temps alloué est épuisé)
+            if expired:
+                budget.skip('context_analysis')
+            else:
+                score += self.analyze_context(requete, product_data, language_analysis)
             
             # Si on a trouvé une correspondance
             if score > 0:
-                # Calcul de la similarité sémantique
-                semantic_score = self.calculate_semantic_similarity(description, product_data['description'])
+                # Calcul de la similarité sémantique (sautée si le temps alloué est épuisé)
+                if expired:
+                    budget.skip('semantic_similarity')
+                    semantic_score = 0.0
+                else:
+                    semantic_score = self.calculate_semantic_similarity(description, product_data['description'])
                 
-                # Application des règles RGI
-                rgi_boost = self.apply_rgi_rules(description, product_data)
+                # Application des règles RGI (sautées si le temps alloué est épuisé)
+                if expired:
+                    budget.skip('rgi_rules')
+                    rgi_boost = 0.0
+                else:
+                    rgi_boost = self.apply_rgi_rules(requete, product_data)
                 
                 # Score final combiné
                 final_score = min(score + semantic_score * 0.3 + rgi_boost, 1.0)
+                if digits[:2] in excluded_chapters or f"{digits[:2]}.{digits[2:4]}" in excluded_headings:
+                    final_score = max(final_score - self.EXCLUSION_PENALTY, 0.0)
                 
                 match_details['match_type'] = match_type
                 
-                results.append({
-                    'type': 'product',
-                    'code': product_data['code'],
-                    'description': product_data['description'],
-                    'rate': product_data['rate'],
-                    'section': product_data['section'],
-                    'confidence': final_score,
-                    'features': features,
-                    'rgi_applied': rgi_boost > 0,
-                    'match_details': match_details,
-                    'language_analysis': language_analysis
-                })
-        
-        # Recherche dans les sous-positions
-        for code, data in self.subheadings.items():
-            if any(word in data['description'].lower() for word in description_lower.split()):
-                semantic_score = self.calculate_semantic_similarity(description, data['description'])
-                results.append({
-                    'type': 'subheading',
-                    'code': code,
-                    'description': data['description'],
-                    'rate': data['rate'],
-                    'confidence': semantic_score,
-                    'features': features,
-                    'rgi_applied': False,
-                    'match_details': {'match_type': 'subheading'},
-                    'language_analysis': language_analysis
-                })
-        
-        # Trier par confiance
-        results.sort(key=lambda x: x['confidence'], reverse=True)
-        
-        if results:
-            best_match = results[0]
-            return {
-                'best_match': best_match,
-                'all_matches': results[:5],
-                'features': features,
-                'confidence': best_match['confidence'],
-                'explanation': self.generate_explanation(best_match, features),
-                'suggestions': self.get_suggestions(description, features),
-                'language_analysis': language_analysis
-            }
-        else:
-            return {
-                'best_match': None,
-                'all_matches': [],
-                'features': features,
-                'confidence': 0.0,
-                'explanation': "Aucune correspondance trouvée dans la base de données.",
-                'suggestions': self.get_suggestions(description, features),
-                'language_analysis': language_analysis
+                results.append(Match(
+                    type='product',
+                    code=product_data['code'],
+                    description=product_data['description'],
+                    rate=product_data['rate'],
+                    section=product_data['section'],
+                    confidence=float(final_score),
+                    rgi_applied=rgi_boost > 0,
+                    match_details=match_details
+                ))
+        
+        # Recherche dans les sous-positions: BM25F (désignation, libellés hérités, titres, termes
+        # développés à l'indexation) avec élagage MaxScore; la requête reçoit les têtes des groupes
+        # de synonymes de ses termes. La confiance est le score rapporté au meilleur score
+        # atteignable par la requête (somme des bornes de ses termes indexés).
+        # Les mesures de la description pénalisent les lignes dont les seuils les excluent
+        # (« d'un poids n'excédant pas 10 kg ») et favorisent celles qui les contiennent; les Notes
+        # déclenchées pénalisent les lignes de leur portée sans les retirer du classement.
+        index = self.get_subheading_index()
+        query = words + synonym_table.canoniques_de(words)
+        ranked, _, interrupted = index['index'].search(query, self.SUBHEADING_CANDIDATES,
+                                                       should_stop=budget.expired if budget is not None else None)
+        if interrupted:
+            budget.skip('subheading_ranking')
+        ceiling = index['index'].max_score(query)
+        for doc_id, score in ranked:
+            confidence = min(score / ceiling, 1.0)
+            code = index['codes'][doc_id]
+            if code[:2] in excluded_chapters or f"{code[:2]}.{code[2:4]}" in excluded_headings:
+                confidence = max(confidence - self.EXCLUSION_PENALTY, 0.0)
+            if requete.mesures:
+                compatible = index['intervals'].verifier(doc_id, requete.mesures)
+                if compatible is False:
+                    confidence = max(confidence - self.MEASURE_PENALTY, 0.0)
+                elif compatible:
+                    confidence = min(confidence + self.MEASURE_BOOST, 1.0)
+            data = self.subheadings[code]
+            results.append(Match(
+                type='subheading',
+                code=code,
+                description=data['description'],
+                rate=data['rate'],
+                confidence=float(confidence)
+            ))
+        
+        # Trier par confiance (tas borné si seules les meilleures sont demandées)
+        if limit is not None:
+            return heapq.nlargest(limit, results, key=lambda x: x.confidence)
+        results.sort(key=lambda x: x.confidence, reverse=True)
+        return results
+    
+    def get_synonym_table(self) -> TableSynonymes:
+        """Synonymes du processeur linguistique et relations de la base de produits, compilés une fois"""
+        table = self.synonym_table
+        if table is None:
+            groups = getattr(self.language_processor, 'synonyms_database', {})
+            table = self.synonym_table = TableSynonymes(groups, self.product_database)
+        return table
+    
+    def get_subheading_index(self) -> Dict:
+        """
+        Index BM25F, index des seuils et trigrammes du vocabulaire des sous-positions, reconstruits
+        si les sous-positions changent
+        """
+        index = self.subheading_index
+        if index is None or len(index['codes']) != len(self.subheadings):
+            codes = list(self.subheadings)
+            # Champs hérités tirés de la structure du tarif; à défaut, la seule désignation. Chaque
+            # ligne est aussi indexée sous les têtes de synonymes et les termes des produits de sa position
+            tariff = self.tariff
+            lines = {line.code: line for line in tariff.lignes} if tariff else {}
+            synonym_table = self.get_synonym_table()
+            documents = []
+            for code in codes:
+                if code in lines:
+                    fields = tariff.champs(lines[code])
+                else:
+                    fields = {'designation': self.subheadings[code]['description'], 'parents': ''}
+                position = f"{code[:2]}.{code[2:4]}"
+                fields['synonymes'] = synonym_table.developpement(
+                    fields['designation'] + ' ' + fields['parents'], position)
+                documents.append(fields)
+            index = {
+                'codes': codes,
+                'index': FieldedLexicalIndex(documents),
+                'intervals': IndexIntervalles(lines[code].intervalles if code in lines else {} for code in codes),
+                # Mots des lignes, libellés, titres et termes développés: cibles des corrections
+                'vocabulary': IndexTrigrammes(word for fields in documents for text in fields.values()
+                                              for word in mots_normalises(text) if word.isalpha())
             }
+            self.subheading_index = index
+        return index
     
-    def analyze_context(self, description: str, product_data: Dict, language_analysis: Dict) -> float:
+    def analyze_context(self, description, product_data: Dict, language_analysis: Dict) -> float:
         """Analyse contextuelle avancée pour améliorer la classification"""
         context_score = 0.0
-        description_lower = description.lower()
         
         # Analyse des mots français reconnus
         french_words = language_analysis['french_words']
@@ -887,8 +1084,12 @@ class AdvancedCEDEAOClassifier:
         
         return context_score
     
-    def generate_explanation(self, match: Dict, features: Dict) -> str:
-        """Génère une explication détaillée de la classification avec analyse linguistique"""
+    def generate_explanation(self, match: Dict, features: Dict, language_analysis: Optional[Dict] = None) -> str:
+        """
+        Génère une explication détaillée de la classification avec analyse linguistique
+
+        language_analysis: analyse de la description (une par requête, absente des correspondances)
+        """
         explanation = f"Le produit a été classé sous le code {match['code']} "
         explanation += f"({match['description']}) avec une confiance de {match['confidence']:.1%}.\n\n"
         
@@ -927,7 +1128,6 @@ class AdvancedCEDEAOClassifier:
             explanation += "\n"
         
         # Analyse linguistique
-        language_analysis = match.get('language_analysis', {})
         if language_analysis:
             explanation += "**📚 Analyse Linguistique Avancée:**\n"
             
@@ -967,10 +1167,11 @@ class AdvancedCEDEAOClassifier:
         
         return explanation
     
-    def get_suggestions(self, description: str, features: Dict) -> List[str]:
+    def get_suggestions(self, description, features: Dict) -> List[str]:
         """Génère des suggestions intelligentes pour améliorer la description"""
         suggestions = []
-        description_lower = description.lower()
+        requete = analyser_requete(description)
+        description_lower = requete.minuscule
         
         # Détection des mots ambigus qui nécessitent des précisions
         ambiguous_words = {
@@ -1109,14 +1310,15 @@ class AdvancedCEDEAOClassifier:
             if not features['technical_specs']:
                 suggestions.append("Ajoutez les spécifications techniques (ex: dimensions, capacité, puissance)")
             
-            if len(description.split()) < 3:
+            if requete.nombre_mots < 3:
                 suggestions.append("Fournissez une description plus détaillée du produit")
         
         return suggestions
     
-    def detect_ambiguous_description(self, description: str) -> Dict:
+    def detect_ambiguous_description(self, description) -> Dict:
         """Détecte si une description est ambiguë et suggère des clarifications"""
-        description_lower = description.lower()
+        requete = analyser_requete(description)
+        description_lower = requete.minuscule
         
         # Mots très génériques qui nécessitent toujours des précisions
         very_generic_words = {
@@ -1205,7 +1407,7 @@ class AdvancedCEDEAOClassifier:
                 has_context = any(context_word in description_lower for context_word in details['context_words'])
                 
                 # Si pas de contexte et description courte, alors ambigu
-                if not has_context and len(description.split()) < 4:
+                if not has_context and requete.nombre_mots < 4:
                     return {
                         'is_ambiguous': True,
                         'type': 'ambiguous_word',
@@ -1215,7 +1417,7 @@ class AdvancedCEDEAOClassifier:
                     }
         
         # Description trop courte
-        if len(description.split()) < 2:
+        if requete.nombre_mots < 2:
             return {
                 'is_ambiguous': True,
                 'type': 'too_short',
@@ -1393,6 +1595,11 @@ def main():
                 
                 elif result['best_match']:
                     st.success(f"✅ Classification réussie avec une confiance de {result['confidence']:.1%}")
+                    if result.get('corrections'):
+                        st.info("🔤 Corrections appliquées : " + ", ".join(
+                            f"{word} → {' / '.join(terms)}" for word, terms in result['corrections'].items()))
+                    if result.get('skipped_stages'):
+                        st.caption("⏱️ Étapes écourtées faute de temps : " + ", ".join(result['skipped_stages']))
                     
                     # Affichage du meilleur résultat
                     best = result['best_match']
@@ -3,6 +3,9 @@ import re
 from typing import Dict, List, Tuple, Optional
 import json
 import os
+from relevance_engine import RelevanceEngine
+from normalisation import normaliser_texte
+from tarif_structure import Tarif, analyser_tarif
 
 class SimpleCEDEAOClassifier:
     def __init__(self):
@@ -11,6 +14,7 @@ class SimpleCEDEAOClassifier:
         self.chapters = {}
         self.subheadings = {}
         self.product_database = self.create_product_database()
+        self.relevance_engine = RelevanceEngine()
         self.load_data()
     
     def create_product_database(self):
@@ -151,25 +155,32 @@ class SimpleCEDEAOClassifier:
             with open(self.data_file, 'r', encoding='utf-8') as file:
                 content = file.read()
             
-            # Parse les sections
-            self.parse_sections(content)
-            # Parse les chapitres
-            self.parse_chapters(content)
+            # Sections et chapitres lus en une passe (table des matières)
+            tariff = analyser_tarif(content)
+            for anomaly in tariff.anomalies():
+                st.warning(f"Structure du tarif: {anomaly}")
+            self.parse_sections(tariff)
+            self.parse_chapters(tariff)
             # Parse les sous-positions
             self.parse_subheadings(content)
             
         except Exception as e:
             st.error(f"Erreur lors du chargement des données: {e}")
-    
-    def parse_sections(self, content: str):
-        """Parse les sections du système harmonisé"""
-        section_pattern = r'SECTION ([IVX]+)\s*\n([^\n]+(?:\n[^\n]+)*?)(?=SECTION|\Z)'
-        matches = re.finditer(section_pattern, content, re.MULTILINE | re.DOTALL)
         
-        for match in matches:
-            section_num = match.group(1)
-            section_title = match.group(2).strip()
-            self.sections[section_num] = section_title
+        self.build_relevance_index()
+    
+    def build_relevance_index(self):
+        """Tokenise une seule fois les textes du tarif et de la base de produits"""
+        # Mots-clés de produits sous forme normalisée: "cafe" trouve "café"
+        self.product_keys = [(normaliser_texte(keyword), product_data)
+                             for keyword, product_data in self.product_database.items()]
+        self.relevance_engine.add_texts(data['description'] for data in self.product_database.values())
+        self.relevance_engine.add_texts(data['description'] for data in self.subheadings.values())
+        self.relevance_engine.add_texts(self.chapters.values())
+    
+    def parse_sections(self, tariff: Tarif):
+        """Sections du système harmonisé, lues dans la table des matières par analyser_tarif"""
+        self.sections.update(tariff.sections)
         
         # Si aucune section n'est trouvée, créer des sections basées sur les chapitres
         if not self.sections:
@@ -204,27 +215,9 @@ class SimpleCEDEAOClassifier:
         for section_num, title in section_mapping.items():
             self.sections[section_num] = title
     
-    def parse_chapters(self, content: str):
-        """Parse les chapitres du système harmonisé"""
-        # Pattern pour les chapitres numérotés
-        chapter_pattern = r'^(\d+)\s+([^\n]+(?:\n[^\n]+)*?)(?=^\d+\s|$)'
-        matches = re.finditer(chapter_pattern, content, re.MULTILINE | re.DOTALL)
-        
-        for match in matches:
-            chapter_num = match.group(1)
-            chapter_content = match.group(2).strip()
-            self.chapters[chapter_num] = chapter_content
-        
-        # Si aucun chapitre n'est trouvé, essayer un autre pattern
-        if not self.chapters:
-            chapter_pattern2 = r'(\d+)\s+([^\n]+)'
-            matches2 = re.finditer(chapter_pattern2, content, re.MULTILINE)
-            
-            for match in matches2:
-                chapter_num = match.group(1)
-                chapter_content = match.group(2).strip()
-                if chapter_num not in self.chapters:
-                    self.chapters[chapter_num] = chapter_content
+    def parse_chapters(self, tariff: Tarif):
+        """Chapitres du système harmonisé (titres de la table des matières, clés "01" à "99")"""
+        self.chapters.update(tariff.chapitres)
     
     def parse_subheadings(self, content: str):
         """Parse les sous-positions avec leurs taux"""
@@ -244,14 +237,19 @@ class SimpleCEDEAOClassifier:
     def search_product(self, description: str) -> List[Dict]:
         """Recherche un produit dans la base de données"""
         results = []
-        description_lower = description.lower()
+        description_folded = normaliser_texte(description)
+        description_words = description_folded.split()
+        engine = self.relevance_engine
+        query = engine.prepare_query(description_folded)
+        # Textes du tarif contenant un mot de la description (index des sous-chaînes, sans parcours)
+        matching_texts = engine.texts_containing(description_words)
         
         # Recherche dans la base de données de produits courants
-        for keyword, product_data in self.product_database.items():
-            if keyword in description_lower:
-                relevance = self.calculate_relevance(description_lower, product_data['description'].lower())
+        for keyword, product_data in self.product_keys:
+            if keyword in description_folded:
+                relevance = engine.relevance(query, engine.profile(product_data['description']))
                 # Bonus pour les correspondances exactes de mots-clés
-                if keyword in description_lower:
+                if keyword in description_folded:
                     relevance += 0.2
                 results.append({
                     'type': 'product',
@@ -264,30 +262,32 @@ class SimpleCEDEAOClassifier:
         
         # Recherche dans les sous-positions (si disponibles)
         for code, data in self.subheadings.items():
-            if any(word in data['description'].lower() for word in description_lower.split()):
+            if data['description'] in matching_texts:
+                profile = engine.profile(data['description'])
                 results.append({
                     'type': 'subheading',
                     'code': code,
                     'description': data['description'],
                     'rate': data['rate'],
-                    'relevance': self.calculate_relevance(description_lower, data['description'].lower())
+                    'relevance': engine.relevance(query, profile)
                 })
         
         # Recherche dans les chapitres (si disponibles)
         for chapter_num, chapter_content in self.chapters.items():
-            if any(word in chapter_content.lower() for word in description_lower.split()):
+            if chapter_content in matching_texts:
+                profile = engine.profile(chapter_content)
                 results.append({
                     'type': 'chapter',
                     'code': chapter_num,
                     'description': chapter_content[:200] + "...",
                     'rate': 'À déterminer selon sous-position',
-                    'relevance': self.calculate_relevance(description_lower, chapter_content.lower())
+                    'relevance': engine.relevance(query, profile)
                 })
         
         # Si aucun résultat, essayer une recherche par mots-clés
         if not results:
-            keywords = description_lower.split()
-            for keyword, product_data in self.product_database.items():
+            keywords = description_words
+            for keyword, product_data in self.product_keys:
                 if any(kw in keyword for kw in keywords):
                     results.append({
                         'type': 'product',
@@ -304,49 +304,7 @@ class SimpleCEDEAOClassifier:
     
     def calculate_relevance(self, query: str, text: str) -> float:
         """Calcule la pertinence d'une correspondance"""
-        query_words = set(query.lower().split())
-        text_words = set(text.lower().split())
-        
-        if not query_words:
-            return 0.0
-        
-        # Calcul de la pertinence basé sur l'intersection des mots
-        intersection = query_words.intersection(text_words)
-        base_relevance = len(intersection) / len(query_words)
-        
-        # Bonus pour les correspondances exactes
-        if query.lower() in text.lower():
-            base_relevance += 0.3
-        
-        # Bonus pour les mots-clés importants
-        important_words = ['ordinateur', 'voiture', 'médicament', 'café', 'coton', 'machine', 'laptop', 'smartphone', 'téléphone', 'automobile', 'antibiotique', 'thé', 'chocolat', 't-shirt', 'vêtement', 'outil', 'savon', 'parfum']
-        for word in important_words:
-            if word in query.lower() and word in text.lower():
-                base_relevance += 0.2
-        
-        # Bonus pour les correspondances partielles
-        for query_word in query_words:
-            for text_word in text_words:
-                if query_word in text_word or text_word in query_word:
-                    base_relevance += 0.1
-        
-        # Bonus pour les correspondances de matériaux
-        materials = ['coton', 'laine', 'soie', 'cuir', 'plastique', 'métal', 'bois', 'verre', 'céramique']
-        for material in materials:
-            if material in query.lower() and material in text.lower():
-                base_relevance += 0.15
-        
-        # Bonus pour les correspondances de fonctions
-        functions = ['traitement', 'télécommunication', 'transport', 'médical', 'alimentaire', 'textile', 'mécanique', 'électrique']
-        for function in functions:
-            if function in query.lower() and function in text.lower():
-                base_relevance += 0.15
-        
-        # Garantir une pertinence minimale pour les correspondances trouvées
-        if base_relevance > 0:
-            base_relevance = max(base_relevance, 0.3)  # Minimum 30% si correspondance trouvée
-        
-        return min(base_relevance, 1.0)  # Limiter à 100%
+        return self.relevance_engine.calculate_relevance(query, text)
     
     def get_section_for_chapter(self, chapter_num: str) -> str:
         """Retourne la section correspondant à un chapitre"""
@@ -0,0 +1,645 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks de performance et de précision des classificateurs CEDEAO
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+from typing import Dict, List
+
+# Corpus de référence: descriptions réelles et chapitre attendu
+CORPUS_BENCHMARK = [
+    {
+        "description": "Ordinateur portable Dell avec processeur Intel i7, 16GB RAM, 512GB SSD, écran 15 pouces",
+        "expected_chapter": "84"
+    },
+    {
+        "description": "Ordinateur portable Dell Latitude 5520, processeur Intel Core i7-1165G7 2.8GHz, 16GB RAM DDR4, disque SSD 512GB, écran LCD 15.6 pouces 1920x1080, carte graphique Intel UHD Graphics, WiFi 6, Bluetooth 5.0, batterie lithium-ion 68Wh, poids 1.8kg, couleur noir",
+        "expected_chapter": "84"
+    },
+    {
+        "description": "T-shirt en coton 100%, manches courtes, col rond, taille M",
+        "expected_chapter": "61"
+    },
+    {
+        "description": "Médicament antibiotique en comprimés, boîte de 20 unités",
+        "expected_chapter": "30"
+    },
+    {
+        "description": "Voiture automobile Toyota Corolla, moteur essence 1.8L, 4 portes, transmission automatique",
+        "expected_chapter": "87"
+    },
+    {
+        "description": "Café en grains arabica, torréfié, emballé sous vide, origine Colombie",
+        "expected_chapter": "09"
+    },
+    {
+        "description": "Smartphone Samsung Galaxy S23, écran AMOLED 6.1 pouces, 8GB RAM, stockage 256GB, 5G",
+        "expected_chapter": "85"
+    },
+    {
+        "description": "Vélo de route en aluminium, cadre rigide, 21 vitesses, freins à disque, poids 12kg",
+        "expected_chapter": "87"
+    },
+    {
+        "description": "Chaussures de sport Nike Air Max en cuir et textile, semelle en caoutchouc",
+        "expected_chapter": "64"
+    },
+    {
+        "description": "Ballon de football en cuir naturel, taille 5",
+        "expected_chapter": "95"
+    },
+    {
+        "description": "Noix de coco desséchées, en sacs de 25 kg",
+        "expected_chapter": "08"
+    },
+    {
+        "description": "Savon de toilette parfumé en pains de 100 g",
+        "expected_chapter": "34"
+    }
+]
+
+# Descriptions du corpus de référence avec fautes de frappe et anglicismes
+CORPUS_FAUTES = [
+    {"description": "Ordinatuer portable Dell, processeur Intel i7, 16GB RAM", "expected_chapter": "84"},
+    {"description": "Tshirt en cotton, manches courtes, col rond", "expected_chapter": "61"},
+    {"description": "Medicamant antibiotique en comprimés", "expected_chapter": "30"},
+    {"description": "Voiture automobille Toyota, moteur essence 1.8L", "expected_chapter": "87"},
+    {"description": "Caffe en grains arabica torréfié", "expected_chapter": "09"},
+    {"description": "Smartfone Samsung, écran 6.1 pouces, 5G", "expected_chapter": "85"},
+    {"description": "Bicylette de route en aluminium, 21 vitesses", "expected_chapter": "87"},
+    {"description": "Chausurres de sport en cuir, semelle en caoutchouc", "expected_chapter": "64"},
+    {"description": "Balon de footbal en cuir naturel", "expected_chapter": "95"},
+    {"description": "Noix de coco dessechées en sacs", "expected_chapter": "08"},
+    {"description": "Savonn de toilette en pains", "expected_chapter": "34"}
+]
+
+def chapter_of(code: str) -> str:
+    """Extrait le chapitre (2 chiffres) d'un code de sous-position ou de position"""
+    digits = code.replace('.', '')
+    return digits[:2].zfill(2) if digits else ''
+
+def load_database() -> Dict:
+    """Charge la base tarifaire utilisée par le classificateur sémantique"""
+    from app import CEDEAOClassifier
+
+    # Seul le parsing du fichier est nécessaire, sans charger l'IA ni le dictionnaire
+    return CEDEAOClassifier(load_models=False).get_database()
+
+def benchmark_embedding_precision(precisions: List[str] = ('float32', 'float16', 'int8')) -> Dict:
+    """Compare la précision et la mémoire des index quantifiés au chemin float32"""
+    from ai_classifier import AdvancedCEDEAOClassifier
+
+    database = load_database()
+    reference = None
+    report = {}
+
+    for precision in precisions:
+        classifier = AdvancedCEDEAOClassifier(embedding_precision=precision)
+        index = classifier.get_tariff_index(database)
+
+        start = time.perf_counter()
+        top_codes = []
+        correct = 0
+        for item in CORPUS_BENCHMARK:
+            results = classifier.classify_product(item['description'], database)
+            codes = [r['code'] for r in results]
+            top_codes.append(codes)
+            if codes and chapter_of(codes[0]) == item['expected_chapter']:
+                correct += 1
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = top_codes
+
+        # Recouvrement du top-10 et accord du top-1 avec le chemin float32
+        overlap = sum(len(set(a) & set(b)) / max(len(a), 1) for a, b in zip(top_codes, reference)) / len(CORPUS_BENCHMARK)
+        agreement = sum(1 for a, b in zip(top_codes, reference) if a[:1] == b[:1]) / len(CORPUS_BENCHMARK)
+
+        report[precision] = {
+            'accuracy': correct / len(CORPUS_BENCHMARK),
+            'top10_overlap': overlap,
+            'top1_agreement': agreement,
+            'memory_bytes': index['store'].nbytes,
+            'mean_latency_ms': elapsed * 1000 / len(CORPUS_BENCHMARK)
+        }
+
+        print(f"{precision:>8}: précision {report[precision]['accuracy']:.1%} | "
+              f"recouvrement top-10 {overlap:.1%} | accord top-1 {agreement:.1%} | "
+              f"mémoire {index['store'].nbytes / 1024:.0f} Ko | "
+              f"{report[precision]['mean_latency_ms']:.1f} ms/requête")
+
+    return report
+
+ENCODER_PROBE = """
+import json, resource, time
+start = time.perf_counter()
+from onnx_encoder import load_encoder
+encoder = load_encoder(backend=%r)
+startup = time.perf_counter() - start
+sentences = %r
+encoder.encode(sentences[:1])
+start = time.perf_counter()
+for sentence in sentences:
+    encoder.encode([sentence])
+latency = (time.perf_counter() - start) / len(sentences)
+print(json.dumps({'startup_s': startup, 'latency_ms': latency * 1000,
+                  'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+def benchmark_encoder_backends(backends: List[str] = ('torch', 'onnx')) -> Dict:
+    """Compare démarrage, latence par requête et RSS des backends d'encodeur (un processus chacun)"""
+    sentences = [item['description'] for item in CORPUS_BENCHMARK]
+    report = {}
+
+    for backend in backends:
+        process = subprocess.run([sys.executable, '-c', ENCODER_PROBE % (backend, sentences)],
+                                 capture_output=True, text=True)
+        if process.returncode != 0:
+            print(f"{backend:>8}: ❌ {process.stderr.strip().splitlines()[-1] if process.stderr else 'échec'}")
+            continue
+        report[backend] = json.loads(process.stdout.strip().splitlines()[-1])
+        print(f"{backend:>8}: démarrage {report[backend]['startup_s']:.2f} s | "
+              f"{report[backend]['latency_ms']:.1f} ms/requête | RSS max {report[backend]['max_rss_mb']:.0f} Mo")
+
+    return report
+
+METADATA_PROBE = """
+import contextlib, io, json, resource, time
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    from dictionnaire_intelligent import DictionnaireIntelligent
+    dictionnaire = DictionnaireIntelligent(%r, %r)
+startup = time.perf_counter() - start
+start = time.perf_counter()
+for word in %r:
+    dictionnaire.get_word_context(word), dictionnaire.get_word_frequency(word)
+lookup = (time.perf_counter() - start) / len(%r)
+try:
+    # Pic propre au processus (ru_maxrss conserve celui du parent au moment du fork)
+    with open('/proc/self/status') as status:
+        max_rss = next(int(line.split()[1]) for line in status if line.startswith('VmHWM')) / 1024
+except OSError:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({'startup_s': startup, 'lookup_us': lookup * 1e6, 'max_rss_mb': max_rss}))
+"""
+
+def benchmark_metadata_formats() -> Dict:
+    """Compare démarrage, accès et RSS des métadonnées JSON et ligne par ligne indexées"""
+    import contextlib
+    import io
+    from create_intelligent_dictionary import create_intelligent_dictionary
+    from metadonnees import ecrire_metadonnees
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        dictionnaire = create_intelligent_dictionary()
+    words = sorted(dictionnaire.word_contexts)[::600]
+    report = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        dict_file = os.path.join(directory, "dictionnaire_francais.txt")
+        with open(dict_file, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(sorted(dictionnaire.words)) + '\n')
+
+        json_dir, indexed_dir = os.path.join(directory, 'json'), os.path.join(directory, 'indexe')
+        os.makedirs(json_dir)
+        os.makedirs(indexed_dir)
+        with open(os.path.join(json_dir, "dictionnaire_metadata.json"), 'w', encoding='utf-8') as f:
+            json.dump({
+                "word_contexts": dict(dictionnaire.word_contexts),
+                "word_families": {k: list(v) for k, v in dictionnaire.word_families.items()},
+                "semantic_groups": {k: list(v) for k, v in dictionnaire.semantic_groups.items()},
+                "frequency_scores": dictionnaire.frequency_scores
+            }, f, ensure_ascii=False, indent=2)
+        ecrire_metadonnees(os.path.join(indexed_dir, "dictionnaire_metadata.json"), dictionnaire.word_contexts,
+                           dictionnaire.word_families, dictionnaire.semantic_groups, dictionnaire.frequency_scores)
+
+        # Compilation du lexique hors mesure
+        subprocess.run([sys.executable, '-c', METADATA_PROBE % (dict_file, 'absent.json', [], [1])],
+                       capture_output=True, text=True)
+
+        for name, metadata_dir in (('json', json_dir), ('indexe', indexed_dir)):
+            metadata_file = os.path.join(metadata_dir, "dictionnaire_metadata.json")
+            process = subprocess.run([sys.executable, '-c', METADATA_PROBE % (dict_file, metadata_file, words, words)],
+                                     capture_output=True, text=True)
+            if process.returncode != 0:
+                print(f"{name:>8}: ❌ {process.stderr.strip().splitlines()[-1] if process.stderr else 'échec'}")
+                continue
+            report[name] = json.loads(process.stdout.strip().splitlines()[-1])
+            print(f"{name:>8}: démarrage {report[name]['startup_s'] * 1000:.0f} ms | "
+                  f"{report[name]['lookup_us']:.1f} µs/accès | RSS max {report[name]['max_rss_mb']:.0f} Mo")
+
+    return report
+
+def benchmark_topk_pruning(k: int = 20, repeat: int = 20) -> Dict:
+    """Compare le top-k BM25 élagué (MaxScore + tas) à l'évaluation exhaustive suivie d'un tri"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+    from lexical_index import LexicalIndex, same_ranking, top_k_exhaustive
+
+    database = load_database()
+    descriptions = [data['description'] for data in database['subheadings'].values()]
+    index = LexicalIndex(descriptions)
+    vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
+    report = {}
+
+    def similarity(query: str, text: str) -> float:
+        """Similarité TF-IDF par paire, comme AdvancedCEDEAOClassifier.calculate_semantic_similarity"""
+        try:
+            vectors = vectorizer.fit_transform([query, text])
+            return cosine_similarity(vectors[0:1], vectors[1:2])[0][0]
+        except ValueError:
+            return 0.0
+
+    for item in CORPUS_BENCHMARK:
+        query = item['description']
+        # Ancienne présélection du classificateur avancé: un mot de la requête contenu dans la ligne
+        words = query.lower().split()
+        legacy = [description for description in descriptions
+                  if any(word in description.lower() for word in words)]
+        # ... puis une similarité TF-IDF par candidat (contre SUBHEADING_CANDIDATES aujourd'hui)
+        start = time.perf_counter()
+        for description in legacy:
+            similarity(query, description)
+        legacy_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for doc, _ in index.top_k(query, k):
+            similarity(query, descriptions[doc])
+        reranked_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            exhaustive = top_k_exhaustive(index, query, k)
+        exhaustive_ms = (time.perf_counter() - start) * 1000 / repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            pruned, scored, _ = index.search(query, k)
+        pruned_ms = (time.perf_counter() - start) * 1000 / repeat
+
+        assert same_ranking(pruned, exhaustive), query
+        report[query] = {
+            'legacy_candidates': len(legacy),
+            'legacy_ms': legacy_ms,
+            'matching': len(index.scores(query)),
+            'fully_scored': scored,
+            'exhaustive_ms': exhaustive_ms,
+            'pruned_ms': pruned_ms,
+            'reranked_ms': reranked_ms
+        }
+        print(f"{query[:32]:<32} | ancien {len(legacy):>4} cand. {legacy_ms:>6.0f} ms | "
+              f"BM25 {report[query]['matching']:>3} docs, {scored:>3} évalués, "
+              f"{exhaustive_ms:.2f} → {pruned_ms:.2f} ms | top-{k} + TF-IDF {reranked_ms:.0f} ms")
+
+    return report
+
+def benchmark_fielded_ranking(k: int = 5, repeat: int = 20) -> Dict:
+    """Compare BM25 sur la seule désignation et BM25F sur les champs hérités du tarif structuré"""
+    from lexical_index import FieldedLexicalIndex, LexicalIndex
+    from tarif_structure import charger_tarif
+
+    start = time.perf_counter()
+    tarif = charger_tarif()
+    parse_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    flat = LexicalIndex(line.designation for line in tarif.lignes)
+    flat_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    fielded = FieldedLexicalIndex(tarif.champs(line) for line in tarif.lignes)
+    fielded_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(tarif.lignes)} lignes N.T.S. lues en {parse_ms:.0f} ms | "
+          f"index BM25 {flat_ms:.0f} ms, BM25F {fielded_ms:.0f} ms")
+
+    report = {'lines': len(tarif.lignes), 'parse_ms': parse_ms, 'flat_build_ms': flat_ms,
+              'fielded_build_ms': fielded_ms, 'queries': {}}
+    correct = {'flat': 0, 'fielded': 0}
+    for item in CORPUS_BENCHMARK:
+        query = item['description']
+        row = {}
+        for name, index in (('flat', flat), ('fielded', fielded)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                top = index.top_k(query, k)
+            row[f'{name}_ms'] = (time.perf_counter() - start) * 1000 / repeat
+            row[name] = [tarif.lignes[doc].code for doc, _ in top]
+            if top and row[name][0][:2] == item['expected_chapter']:
+                correct[name] += 1
+        report['queries'][query] = row
+        print(f"{query[:32]:<32} | attendu {item['expected_chapter']} | "
+              f"BM25 {(row['flat'] or ['-'])[0]:<13} {row['flat_ms']:.2f} ms | "
+              f"BM25F {(row['fielded'] or ['-'])[0]:<13} {row['fielded_ms']:.2f} ms")
+
+    report['flat_accuracy'] = correct['flat'] / len(CORPUS_BENCHMARK)
+    report['fielded_accuracy'] = correct['fielded'] / len(CORPUS_BENCHMARK)
+    print(f"Chapitre du premier résultat correct: BM25 {correct['flat']}/{len(CORPUS_BENCHMARK)}, "
+          f"BM25F {correct['fielded']}/{len(CORPUS_BENCHMARK)}")
+    return report
+
+def benchmark_interval_index(repeat: int = 200) -> Dict:
+    """Compare la recherche des lignes dont les seuils contiennent une mesure: index contre parcours"""
+    from intervalles import IndexIntervalles, extraire_mesures
+    from tarif_structure import charger_tarif
+
+    tarif = charger_tarif()
+    start = time.perf_counter()
+    index = IndexIntervalles(line.intervalles for line in tarif.lignes)
+    build_ms = (time.perf_counter() - start) * 1000
+    constrained = sum(1 for line in tarif.lignes if line.intervalles)
+    print(f"{constrained}/{len(tarif.lignes)} lignes avec seuils, "
+          f"grandeurs {sorted(index.bornes)}, index construit en {build_ms:.1f} ms")
+
+    report = {'constrained_lines': constrained, 'build_ms': build_ms, 'measures': {}}
+    for item in CORPUS_BENCHMARK:
+        for measure in extraire_mesures(item['description']):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                scanned = {doc for doc, line in enumerate(tarif.lignes)
+                           if measure.grandeur in line.intervalles
+                           and line.intervalles[measure.grandeur].contient(measure.valeur)}
+            scan_us = (time.perf_counter() - start) * 1e6 / repeat
+            start = time.perf_counter()
+            for _ in range(repeat):
+                found = index.documents(measure.grandeur, measure.valeur)
+            index_us = (time.perf_counter() - start) * 1e6 / repeat
+            assert found == scanned
+            key = f"{measure.grandeur}={measure.valeur:g}"
+            report['measures'][key] = {'lines': len(found), 'scan_us': scan_us, 'index_us': index_us}
+            print(f"{key:<24} | {len(found):>4} lignes | parcours {scan_us:>7.0f} µs | index {index_us:.1f} µs")
+    return report
+
+def benchmark_synonym_expansion(repeat: int = 200) -> Dict:
+    """
+    Compare la recherche des synonymes et des termes de produits à chaque requête (parcours des
+    listes) aux tables compilées, et le classement BM25F avec et sans les termes développés
+    """
+    import spacy
+    from app_advanced import AdvancedCEDEAOClassifier
+    from lexical_index import FIELD_WEIGHTS, FieldedLexicalIndex
+    from normalisation import mots_normalises
+    from synonymes import TableSynonymes
+    from tarif_structure import charger_tarif
+
+    # Tables du classificateur avancé, sans son tarif (chargé plus bas) ni modèle spaCy
+    classifier = AdvancedCEDEAOClassifier(data_file=None, nlp=spacy.blank('fr'))
+    groups = classifier.language_processor.synonyms_database
+    products = classifier.product_database
+    start = time.perf_counter()
+    table = TableSynonymes(groups, products)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    def scan_synonyms(word):
+        synonyms = list(groups.get(word, []))
+        for key, values in groups.items():
+            if word in values:
+                synonyms.append(key)
+                synonyms.extend(v for v in values if v != word)
+        return set(synonyms)
+
+    def scan_products(text):
+        return {keyword: [term for field in ('synonyms', 'brands', 'materials', 'functions')
+                          for term in data.get(field, []) if term in text]
+                for keyword, data in products.items()}
+
+    descriptions = [item['description'] for item in CORPUS_BENCHMARK]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for description in descriptions:
+            lower = description.lower()
+            for word in lower.split():
+                scan_synonyms(word)
+            scan_products(lower)
+    scan_us = (time.perf_counter() - start) * 1e6 / (repeat * len(descriptions))
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for description in descriptions:
+            words = mots_normalises(description)
+            for word in description.lower().split():
+                table.synonymes_de(word)
+            table.relations(words)
+            table.canoniques_de(words)
+    lookup_us = (time.perf_counter() - start) * 1e6 / (repeat * len(descriptions))
+    print(f"Tables compilées en {build_ms:.1f} ms | par requête: parcours {scan_us:.0f} µs, "
+          f"consultations {lookup_us:.0f} µs")
+
+    tarif = charger_tarif()
+    documents = []
+    for line in tarif.lignes:
+        fields = tarif.champs(line)
+        fields['synonymes'] = table.developpement(fields['designation'] + ' ' + fields['parents'], line.position)
+        documents.append(fields)
+    plain = FieldedLexicalIndex(documents, fields={f: w for f, w in FIELD_WEIGHTS.items() if f != 'synonymes'})
+    expanded = FieldedLexicalIndex(documents)
+    correct = {'plain': 0, 'expanded': 0}
+    for item in CORPUS_BENCHMARK:
+        words = mots_normalises(item['description'])
+        row = {}
+        for name, index, query in (('plain', plain, words),
+                                   ('expanded', expanded, list(words) + table.canoniques_de(words))):
+            top = index.top_k(query, 1)
+            row[name] = tarif.lignes[top[0][0]].code if top else '-'
+            correct[name] += row[name][:2] == item['expected_chapter']
+        print(f"{item['description'][:32]:<32} | attendu {item['expected_chapter']} | "
+              f"sans {row['plain']:<13} | développé {row['expanded']}")
+    print(f"Chapitre du premier résultat correct: sans {correct['plain']}/{len(CORPUS_BENCHMARK)}, "
+          f"développé {correct['expanded']}/{len(CORPUS_BENCHMARK)}")
+    return {'build_ms': build_ms, 'scan_us': scan_us, 'lookup_us': lookup_us,
+            'plain_accuracy': correct['plain'] / len(CORPUS_BENCHMARK),
+            'expanded_accuracy': correct['expanded'] / len(CORPUS_BENCHMARK)}
+
+def benchmark_structure_parsing(repeat: int = 3) -> Dict:
+    """
+    Compare les anciennes expressions multi-lignes (sections, chapitres) à la lecture en une passe
+    de tarif_structure, et vérifie que le temps de celle-ci croît linéairement avec le fichier
+    """
+    import re
+    from intervalles import seuils_texte
+    from normalisation import normaliser_texte
+    from tarif_structure import NOMBRE_CHAPITRES, NOMBRE_SECTIONS, analyser_tarif
+
+    with open("MON-TEC-CEDEAO-SH-2022-FREN-09-04-2024.txt", 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        sections = re.findall(r'SECTION ([IVX]+)\s*\n([^\n]+(?:\n[^\n]+)*?)(?=SECTION|\Z)',
+                              content, re.MULTILINE | re.DOTALL)
+        chapters = {match[0] for match in re.findall(r'^(\d+)\s+([^\n]+(?:\n[^\n]+)*?)(?=^\d+\s|$)',
+                                                      content, re.MULTILINE | re.DOTALL)}
+    regex_ms = (time.perf_counter() - start) * 1000 / repeat
+    print(f"Expressions multi-lignes: {len(sections)} sections, {len(chapters)} « chapitres », {regex_ms:.1f} ms")
+
+    report = {'regex': {'sections': len(sections), 'chapters': len(chapters), 'ms': regex_ms}, 'scaling': {}}
+    lines = content.splitlines(keepends=True)
+    for fraction in (0.25, 0.5, 1.0):
+        prefix = ''.join(lines[:int(len(lines) * fraction)])
+        start = time.perf_counter()
+        for _ in range(repeat):
+            # Mémos vidés: chaque lecture part de zéro
+            seuils_texte.cache_clear()
+            normaliser_texte.cache_clear()
+            tarif = analyser_tarif(prefix)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+        per_line_us = elapsed_ms * 1000 / (len(lines) * fraction)
+        report['scaling'][fraction] = {'ms': elapsed_ms, 'us_per_line': per_line_us, 'lines': len(tarif.lignes)}
+        print(f"{fraction:>4.0%} du fichier | {elapsed_ms:>6.1f} ms | {per_line_us:.1f} µs/ligne | "
+              f"{len(tarif.lignes)} lignes N.T.S.")
+
+    harmonised = [chapter for chapter in tarif.chapitres if int(chapter) <= NOMBRE_CHAPITRES]
+    print(f"Une passe: {len(tarif.sections)} sections, {len(harmonised)} chapitres du SH, "
+          f"{len(tarif.positions)} positions, {len(tarif.notes_chapitres)} Notes de chapitre")
+    assert len(tarif.sections) == NOMBRE_SECTIONS and len(harmonised) == NOMBRE_CHAPITRES
+    assert not tarif.anomalies(), tarif.anomalies()
+    report['sections'], report['chapters'] = len(tarif.sections), len(harmonised)
+    return report
+
+def benchmark_word_analyses(repeat: int = 20) -> Dict:
+    """
+    Compare l'analyse mot par mot recalculée à chaque requête (mots similaires, synonymes,
+    catégories) aux consultations de la table des analyses précalculée
+    """
+    from app_advanced import FrenchLanguageProcessor
+
+    start = time.perf_counter()
+    processor = FrenchLanguageProcessor()
+    init_ms = (time.perf_counter() - start) * 1000
+    table = processor.word_table
+    descriptions = [item['description'] for item in CORPUS_BENCHMARK]
+    words = [word.lower().strip('.,!?;:()[]{}"\'') for description in descriptions for word in description.split()]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for word in words:
+            analysis = table.analyses.get(processor.french_keys.get(word, word))
+            if analysis is not None:
+                processor.compute_word_analysis(analysis.mot)
+    computed_ms = (time.perf_counter() - start) * 1000 / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for description in descriptions:
+            processor.analyze_text(description)
+    table_ms = (time.perf_counter() - start) * 1000 / repeat
+    print(f"Table de {len(table.analyses)} mots chargée en {init_ms:.0f} ms (avec le processeur)")
+    print(f"Corpus ({len(words)} mots): calcul par mot {computed_ms:.1f} ms, table {table_ms:.2f} ms "
+          f"| mémo hors table: {table.hors_table.cache_info()}")
+    return {'init_ms': init_ms, 'computed_ms': computed_ms, 'table_ms': table_ms, 'words': len(table.analyses)}
+
+def benchmark_typo_correction(repeat: int = 200) -> Dict:
+    """
+    Classement BM25F des descriptions mal orthographiées avec et sans les termes du tarif proposés
+    par l'index des trigrammes, et temps de correction d'un mot
+    """
+    import spacy
+    from app_advanced import AdvancedCEDEAOClassifier
+    from correction import IndexTrigrammes
+    from normalisation import mots_normalises
+
+    classifier = AdvancedCEDEAOClassifier(nlp=spacy.blank('fr'))
+    index = classifier.get_subheading_index()
+    vocabulary = index['vocabulary']
+    start = time.perf_counter()
+    IndexTrigrammes(vocabulary.termes)
+    build_ms = (time.perf_counter() - start) * 1000
+    synonym_table = classifier.get_synonym_table()
+
+    correct = {'plain': 0, 'corrected': 0}
+    words = set()
+    for item in CORPUS_FAUTES:
+        corrections = classifier.correct_query(item['description'])
+        row = {}
+        for name, extra in (('plain', []), ('corrected', [t for terms in corrections.values() for t in terms])):
+            query = list(mots_normalises(item['description'])) + extra
+            top = index['index'].top_k(query + synonym_table.canoniques_de(query), 1)
+            row[name] = index['codes'][top[0][0]] if top else '-'
+            correct[name] += row[name][:2] == item['expected_chapter']
+        words.update(corrections)
+        print(f"{item['description'][:28]:<28} | attendu {item['expected_chapter']} | sans {row['plain']:<13} | "
+              f"corrigé {row['corrected']:<13} | {corrections}")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for word in words:
+            vocabulary._corriger(word)
+    correction_us = (time.perf_counter() - start) * 1e6 / (repeat * max(len(words), 1))
+    print(f"Index de {len(vocabulary.termes)} termes construit en {build_ms:.0f} ms | "
+          f"correction d'un mot {correction_us:.0f} µs (hors mémo)")
+    print(f"Chapitre du premier résultat correct: sans {correct['plain']}/{len(CORPUS_FAUTES)}, "
+          f"corrigé {correct['corrected']}/{len(CORPUS_FAUTES)}")
+    return {'build_ms': build_ms, 'correction_us': correction_us,
+            'plain_accuracy': correct['plain'] / len(CORPUS_FAUTES),
+            'corrected_accuracy': correct['corrected'] / len(CORPUS_FAUTES)}
+
+def benchmark_cascade(repeat: int = 5) -> Dict:
+    """
+    Cascade du moteur le moins coûteux au plus coûteux: part des descriptions résolues par étage,
+    latence moyenne et p99, précision au chapitre, comparées au seul moteur le plus coûteux disponible
+    """
+    import numpy as np
+    import spacy
+    from app_simple import SimpleCEDEAOClassifier
+    from app_advanced import AdvancedCEDEAOClassifier
+    from app import CEDEAOClassifier
+    from cascade import ClassificationCascade, build_cascade
+
+    engines = {'simple': SimpleCEDEAOClassifier()}
+    # Niveau 'code' du classificateur avancé: aucun modèle spaCy n'est nécessaire
+    engines['advanced'] = AdvancedCEDEAOClassifier(nlp=spacy.blank('fr'))
+    # Classificateur à embeddings de app.py, s'il a pu être initialisé (modèle disponible)
+    application = CEDEAOClassifier()
+    if application.advanced_classifier is not None:
+        engines['transformer'] = application.advanced_classifier
+    else:
+        print("⚠️ Étage transformer indisponible")
+
+    descriptions = CORPUS_BENCHMARK + CORPUS_FAUTES
+    cascade = build_cascade(database=application.get_database(), **engines)
+    last = cascade.tiers[-1]
+    for tier in cascade.tiers:
+        # Index construits avant les mesures
+        tier.classify(descriptions[0]['description'])
+
+    report = {}
+    for name, tiers in (('cascade', cascade.tiers), (last.name, [last])):
+        runner = ClassificationCascade(tiers)
+        latencies, correct = [], 0
+        for _ in range(repeat):
+            for item in descriptions:
+                result = runner.classify(item['description'])
+                latencies.append(result.seconds * 1000)
+                correct += bool(result.code) and chapter_of(result.code) == item['expected_chapter']
+        shares = ', '.join(f"{tier} {share:.0%}" for tier, share in runner.stats().items())
+        report[name] = {'mean_ms': float(np.mean(latencies)), 'p99_ms': float(np.percentile(latencies, 99)),
+                        'accuracy': correct / len(latencies), 'resolved': runner.stats()}
+        print(f"{name:<12} | résolues: {shares} | moyenne {report[name]['mean_ms']:.1f} ms | "
+              f"p99 {report[name]['p99_ms']:.1f} ms | chapitre correct {report[name]['accuracy']:.0%}")
+    return report
+
+BENCHMARKS = {
+    'precision': benchmark_embedding_precision,
+    'encodeur': benchmark_encoder_backends,
+    'metadonnees': benchmark_metadata_formats,
+    'elagage': benchmark_topk_pruning,
+    'champs': benchmark_fielded_ranking,
+    'seuils': benchmark_interval_index,
+    'structure': benchmark_structure_parsing,
+    'synonymes': benchmark_synonym_expansion,
+    'analyses': benchmark_word_analyses,
+    'corrections': benchmark_typo_correction,
+    'cascade': benchmark_cascade
+}
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"❌ Benchmark inconnu: {name} (disponibles: {', '.join(BENCHMARKS)})")
+            continue
+        print(f"\n📊 Benchmark: {name}")
+        print("=" * 60)
+        BENCHMARKS[name]()
+
+if __name__ == "__main__":
+    main()
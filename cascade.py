@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cascade de classification: les moteurs sont essayés du moins coûteux au plus coûteux, et la réponse
+d'un moteur est acceptée dès que sa confiance et son avance sur le second résultat atteignent les
+seuils de son étage. Sinon la description passe à l'étage suivant; le dernier étage répond toujours.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seuils par défaut (confiance minimale, avance minimale sur le second) des étages de build_cascade.
+# Étage avancé: les produits cités plafonnent à 1 et la confiance BM25F est rapportée au meilleur
+# score atteignable par la requête; sur le corpus de benchmark_classification, (0.5, 0.05) accepte
+# 15 des 23 descriptions, toutes dans le bon chapitre, et renvoie à l'étage suivant les descriptions
+# hors vocabulaire (« couleur noir taille moyenne »: 0.31) et les égalités entre produits
+DEFAULT_THRESHOLDS = {
+    'simple': (0.5, 0.25),
+    'advanced': (0.5, 0.05),
+    'transformer': (0.0, 0.0),
+}
+
+@dataclass(frozen=True)
+class Tier:
+    """Étage de la cascade: un moteur et l'extraction (code, confiance) de ses résultats triés"""
+
+    name: str
+    classify: Callable[[str], Any]
+    # Résultat brut du moteur -> [(code, confiance)] par confiance décroissante
+    candidates: Callable[[Any], List[Tuple[str, float]]]
+    min_confidence: float = 0.0
+    min_margin: float = 0.0
+
+@dataclass
+class Attempt:
+    """Passage d'une description dans un étage"""
+
+    tier: str
+    confidence: float
+    margin: float
+    seconds: float
+    accepted: bool
+
+@dataclass
+class CascadeResult:
+    """Réponse de l'étage qui a accepté la description, et étages essayés avant lui"""
+
+    tier: str
+    code: Optional[str]
+    confidence: float
+    margin: float
+    results: Any
+    attempts: List[Attempt] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> float:
+        return sum(attempt.seconds for attempt in self.attempts)
+
+def compatible(code: str, other: str) -> bool:
+    """Codes dont l'un précise l'autre ("84.71" et "8471.30.10.00"): ils ne se concurrencent pas"""
+    digits, other_digits = code.replace('.', ''), other.replace('.', '')
+    return digits.startswith(other_digits) or other_digits.startswith(digits)
+
+def margin_of(candidates: List[Tuple[str, float]]) -> float:
+    """
+    Avance du premier résultat sur le premier résultat concurrent (code incompatible), ou toute sa
+    confiance s'il n'a pas de concurrent
+    """
+    if not candidates:
+        return 0.0
+    best_code, best = candidates[0]
+    runner_up = next((confidence for code, confidence in candidates[1:] if not compatible(code, best_code)), 0.0)
+    return best - runner_up
+
+class ClassificationCascade:
+    """Moteurs essayés dans l'ordre des étages, avec compteurs des descriptions résolues par étage"""
+
+    def __init__(self, tiers: Sequence[Tier]):
+        if not tiers:
+            raise ValueError("La cascade demande au moins un étage")
+        self.tiers = list(tiers)
+        self.resolved: Dict[str, int] = {tier.name: 0 for tier in self.tiers}
+
+    def classify(self, description: str) -> CascadeResult:
+        attempts = []
+        for position, tier in enumerate(self.tiers):
+            start = time.perf_counter()
+            results = tier.classify(description)
+            candidates = tier.candidates(results)
+            seconds = time.perf_counter() - start
+            confidence = candidates[0][1] if candidates else 0.0
+            margin = margin_of(candidates)
+            last = position == len(self.tiers) - 1
+            accepted = last or (bool(candidates) and confidence >= tier.min_confidence and margin >= tier.min_margin)
+            attempts.append(Attempt(tier.name, confidence, margin, seconds, accepted))
+            if accepted:
+                self.resolved[tier.name] += 1
+                return CascadeResult(tier.name, candidates[0][0] if candidates else None, confidence, margin,
+                                     results, attempts)
+
+    def stats(self) -> Dict[str, float]:
+        """Part des descriptions résolues par chaque étage"""
+        total = sum(self.resolved.values())
+        return {name: (count / total if total else 0.0) for name, count in self.resolved.items()}
+
+def simple_candidates(results: List[Dict]) -> List[Tuple[str, float]]:
+    """Résultats de SimpleCEDEAOClassifier.search_product (pertinence)"""
+    return [(result['code'], result['relevance']) for result in results]
+
+def advanced_candidates(result) -> List[Tuple[str, float]]:
+    """ClassificationResult du classificateur avancé (rien si la description est ambiguë)"""
+    if result['is_ambiguous']:
+        return []
+    return [(match.code, match.confidence) for match in result['all_matches']]
+
+def transformer_candidates(results: List[Dict]) -> List[Tuple[str, float]]:
+    """Résultats de ai_classifier.AdvancedCEDEAOClassifier.classify_product (score final)"""
+    return [(result['code'], result['final_score']) for result in results]
+
+def build_cascade(simple=None, advanced=None, transformer=None, database: Optional[Dict] = None,
+                  thresholds: Optional[Dict[str, Tuple[float, float]]] = None) -> ClassificationCascade:
+    """
+    Cascade des moteurs fournis, du moins coûteux au plus coûteux
+
+    Args:
+        simple: SimpleCEDEAOClassifier (mots-clés)
+        advanced: AdvancedCEDEAOClassifier de app_advanced (BM25F, règles; niveau 'code')
+        transformer: AdvancedCEDEAOClassifier de ai_classifier (embeddings), avec sa base tarifaire
+        thresholds: Nom d'étage -> (confiance minimale, avance minimale), complète DEFAULT_THRESHOLDS
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    tiers = []
+    if simple is not None:
+        tiers.append(Tier('simple', simple.search_product, simple_candidates, *thresholds['simple']))
+    if advanced is not None:
+        tiers.append(Tier('advanced', lambda description: advanced.classify_product(description, detail='code'),
+                          advanced_candidates, *thresholds['advanced']))
+    if transformer is not None:
+        tiers.append(Tier('transformer', lambda description: transformer.classify_product(description, database),
+                          transformer_candidates, *thresholds['transformer']))
+    return ClassificationCascade(tiers)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Résultats compacts du classificateur avancé: une correspondance ne porte que son code, son score
+et ses indicateurs; les caractéristiques et l'analyse linguistique sont stockées une fois par requête
+"""
+
+import json
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class _MappingAccess:
+    """Accès par clé (result['code'], result.get(...)) pour rester compatible avec les anciens dict"""
+
+    __slots__ = ()
+    # Champs considérés comme absents tant qu'ils valent None
+    OPTIONAL_FIELDS = frozenset()
+
+    def keys(self) -> List[str]:
+        return [f.name for f in fields(self)
+                if not (f.name in self.OPTIONAL_FIELDS and getattr(self, f.name) is None)]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def to_dict(self) -> Dict:
+        return {key: _plain(getattr(self, key)) for key in self.keys()}
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, _MappingAccess):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+@dataclass(slots=True)
+class Match(_MappingAccess):
+    """Correspondance candidate (produit de la base ou sous-position du tarif)"""
+
+    OPTIONAL_FIELDS = frozenset({'section', 'match_details'})
+
+    type: str
+    code: str
+    description: str
+    rate: str
+    confidence: float
+    section: Optional[str] = None
+    rgi_applied: bool = False
+    # Détail des correspondances (produits uniquement)
+    match_details: Optional[Dict] = None
+
+@dataclass(slots=True)
+class ClassificationResult(_MappingAccess):
+    """Résultat d'une classification; les champs de présentation dépendent du niveau de détail"""
+
+    OPTIONAL_FIELDS = frozenset({'features', 'language_analysis', 'explanation', 'suggestions',
+                                 'ambiguity_details', 'exclusions', 'corrections', 'skipped_stages'})
+
+    best_match: Optional[Match]
+    all_matches: List[Match]
+    confidence: float
+    features: Optional[Dict] = None
+    language_analysis: Optional[Dict] = None
+    explanation: Optional[str] = None
+    suggestions: Optional[List[str]] = None
+    is_ambiguous: bool = False
+    ambiguity_details: Optional[Dict] = None
+    # Clauses des Notes (« ne comprend pas ») qui ont écarté des chapitres ou positions
+    exclusions: Optional[List[Dict]] = None
+    # Mots mal orthographiés -> termes du tarif ajoutés à la requête
+    corrections: Optional[Dict[str, List[str]]] = None
+    # Étapes facultatives sautées ou écourtées faute de temps (budget de classify_product)
+    skipped_stages: Optional[List[str]] = None
+
+def _default(value: Any) -> Any:
+    """Conversion des types non natifs pour json (les scalaires numpy, les résultats)"""
+    if isinstance(value, _MappingAccess):
+        return value.to_dict()
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+def dumps(result: Any) -> bytes:
+    """Sérialise un résultat (ou une liste de résultats) en JSON UTF-8, avec orjson s'il est installé"""
+    if orjson is not None:
+        return orjson.dumps(result, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATACLASS)
+    return json.dumps(result, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Correction des fautes de frappe par les trigrammes de caractères du vocabulaire du tarif (mots
+pliés des lignes N.T.S., libellés hérités, titres de chapitres et de sections). Un mot inconnu est
+rapproché des termes dont l'indice de Jaccard des trigrammes atteint le seuil; les termes de
+taille incompatible avec ce seuil ne sont jamais évalués (filtre de longueur), et les listes de
+trigrammes sont triées par taille pour n'en parcourir que la tranche admissible. Un terme proche
+n'est retenu que s'il est à une ou deux fautes de frappe du mot (distance d'édition): les mots
+dérivés (« puissant », « puissance ») partagent beaucoup de trigrammes sans en être une.
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from normalisation import TAILLE_MEMO
+
+# Indice de Jaccard minimal entre les trigrammes d'un mot et ceux d'un terme du tarif
+SEUIL_JACCARD = 0.4
+# Nombre maximal de termes proposés pour un mot
+CORRECTIONS_MAX = 2
+# Longueur minimale d'un mot corrigé (les mots plus courts sont trop ambigus)
+LONGUEUR_MIN = 4
+# Nombre maximal de fautes (insertion, suppression, substitution, inversion de deux lettres) corrigées
+DISTANCE_MAX = 2
+# Longueur minimale d'un mot corrigé de deux fautes ("cent" n'est pas "cement")
+LONGUEUR_DEUX_FAUTES = 6
+
+def trigrammes(mot: str) -> FrozenSet[str]:
+    """Trigrammes d'un mot plié, bornes comprises: "velo" -> {'$ve', 'vel', 'elo', 'lo$'}"""
+    borne = f"${mot}$"
+    return frozenset(borne[i:i + 3] for i in range(len(borne) - 2))
+
+def distance_edition(mot: str, terme: str) -> int:
+    """Distance de Damerau-Levenshtein restreinte: "ordinatuer" -> "ordinateur" vaut 1"""
+    precedente, courante = None, list(range(len(terme) + 1))
+    for i in range(1, len(mot) + 1):
+        suivante = [i] + [0] * len(terme)
+        for j in range(1, len(terme) + 1):
+            cout = mot[i - 1] != terme[j - 1]
+            suivante[j] = min(courante[j] + 1, suivante[j - 1] + 1, courante[j - 1] + cout)
+            if (precedente is not None and j > 1 and mot[i - 1] == terme[j - 2]
+                    and mot[i - 2] == terme[j - 1]):
+                suivante[j] = min(suivante[j], precedente[j - 2] + 1)
+        precedente, courante = courante, suivante
+    return courante[-1]
+
+def faute_plausible(mot: str, terme: str) -> bool:
+    """
+    Vrai si le terme est à une faute du mot, ou à deux fautes d'un mot assez long qui garde sa
+    première et sa dernière lettre ("chausurres" -> "chaussures", mais pas "puissant" -> "puissance");
+    le pluriel du terme ne compte pas comme une faute ("bicylette" -> "bicyclettes")
+    """
+    if terme[-1] in 'sx' and mot[-1] not in 'sx':
+        terme = terme[:-1]
+    distance = distance_edition(mot, terme)
+    if distance <= 1:
+        return True
+    return (distance <= DISTANCE_MAX and len(mot) >= LONGUEUR_DEUX_FAUTES
+            and mot[0] == terme[0] and mot[-1] == terme[-1])
+
+class IndexTrigrammes:
+    """Index inversé trigramme -> termes du vocabulaire, trié par nombre de trigrammes des termes"""
+
+    def __init__(self, vocabulaire: Iterable[str], seuil: float = SEUIL_JACCARD,
+                 taille_memo: int = TAILLE_MEMO):
+        self.seuil = seuil
+        termes = sorted({terme for terme in vocabulaire if len(terme) >= LONGUEUR_MIN},
+                        key=lambda terme: (len(trigrammes(terme)), terme))
+        self.termes = termes
+        self.tailles = [len(trigrammes(terme)) for terme in termes]
+        self.vocabulaire = frozenset(termes)
+        # Trigramme -> rangs des termes qui le contiennent (croissants, donc par taille croissante)
+        self.listes: Dict[str, List[int]] = {}
+        for rang, terme in enumerate(termes):
+            for trigramme in trigrammes(terme):
+                self.listes.setdefault(trigramme, []).append(rang)
+        self.corriger = lru_cache(maxsize=taille_memo)(self._corriger)
+
+    def _corriger(self, mot: str, limite: int = CORRECTIONS_MAX) -> Tuple[Tuple[str, float], ...]:
+        """
+        Termes les plus proches d'un mot plié (indice de Jaccard décroissant), vide si aucun n'atteint
+        le seuil en restant une faute de frappe plausible
+        """
+        if len(mot) < LONGUEUR_MIN or mot in self.vocabulaire:
+            return ()
+        cherches = trigrammes(mot)
+        n = len(cherches)
+        # J(A, B) >= s impose s·|A| <= |B| <= |A| / s: rangs des termes de taille admissible
+        debut = bisect_left(self.tailles, math.ceil(self.seuil * n))
+        fin = bisect_right(self.tailles, math.floor(n / self.seuil))
+        communs: Dict[int, int] = {}
+        for trigramme in cherches:
+            rangs = self.listes.get(trigramme)
+            if not rangs:
+                continue
+            for rang in rangs[bisect_left(rangs, debut):bisect_left(rangs, fin)]:
+                communs[rang] = communs.get(rang, 0) + 1
+
+        proches = []
+        for rang, commun in communs.items():
+            jaccard = commun / (n + self.tailles[rang] - commun)
+            if jaccard >= self.seuil and faute_plausible(mot, self.termes[rang]):
+                proches.append((-jaccard, self.termes[rang]))
+        proches.sort()
+        return tuple((terme, -jaccard) for jaccard, terme in proches[:limite])
@@ -5,10 +5,10 @@ Script pour créer un dictionnaire français intelligent avec compréhension con
 """
 
 import re
-import json
 import random
 from typing import Set, Dict, List, Tuple
 from collections import defaultdict
+from metadonnees import ecrire_metadonnees
 
 class IntelligentFrenchDictionary:
     """Dictionnaire français intelligent avec compréhension contextuelle"""
@@ -416,18 +416,16 @@ def save_intelligent_dictionary(dict_intelligent: IntelligentFrenchDictionary,
         print(f"✅ Dictionnaire intelligent sauvegardé dans {filename}")
         print(f"   {len(dict_intelligent.words)} mots écrits")
         
-        # Sauvegarder aussi les métadonnées contextuelles
-        metadata = {
-            "word_contexts": dict(dict_intelligent.word_contexts),
-            "word_families": {k: list(v) for k, v in dict_intelligent.word_families.items()},
-            "semantic_groups": {k: list(v) for k, v in dict_intelligent.semantic_groups.items()},
-            "frequency_scores": dict_intelligent.frequency_scores
-        }
+        # Sauvegarder aussi les métadonnées contextuelles (lignes JSON + index des clés)
+        fichiers = ecrire_metadonnees(
+            "dictionnaire_metadata.json",
+            dict_intelligent.word_contexts,
+            dict_intelligent.word_families,
+            dict_intelligent.semantic_groups,
+            dict_intelligent.frequency_scores
+        )
         
-        with open("dictionnaire_metadata.json", 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
-        
-        print(f"✅ Métadonnées contextuelles sauvegardées dans dictionnaire_metadata.json")
+        print(f"✅ Métadonnées contextuelles sauvegardées dans {fichiers['donnees']}")
         
     except Exception as e:
         print(f"❌ Erreur lors de la sauvegarde: {e}")
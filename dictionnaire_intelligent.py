@@ -9,13 +9,17 @@ import re
 from typing import Set, List, Dict, Tuple, Optional
 from collections import defaultdict
 import difflib
+from lexique import Lexique, charger_lexique
+from metadonnees import charger_metadonnees
+from normalisation import normaliser_texte
 
 class DictionnaireIntelligent:
     """Dictionnaire français intelligent avec compréhension contextuelle"""
     
     def __init__(self, dict_file: str = "dictionnaire_francais.txt", 
                  metadata_file: str = "dictionnaire_metadata.json"):
-        self.words = set()
+        self.words: Lexique = Lexique(None)
+        self.folded_words: Lexique = Lexique(None)
         self.word_contexts = defaultdict(list)
         self.word_families = defaultdict(set)
         self.semantic_groups = defaultdict(set)
@@ -25,20 +29,28 @@ class DictionnaireIntelligent:
         self.load_metadata(metadata_file)
         
     def load_dictionary(self, filename: str):
-        """Charge le dictionnaire de base"""
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                for line in f:
-                    word = line.strip().lower()
-                    if word:
-                        self.words.add(word)
+        """Charge le dictionnaire de base (lexique compilé mappé en mémoire)"""
+        self.words = charger_lexique(filename)
+        # Clés sans accents ni ligatures: "velo" est reconnu comme "vélo"
+        self.folded_words = charger_lexique(filename, plier=True)
+        if self.words.fichier_lexique:
             print(f"✅ Dictionnaire chargé: {len(self.words)} mots")
-        except FileNotFoundError:
+        else:
             print(f"⚠️ Fichier dictionnaire non trouvé: {filename}")
             
     def load_metadata(self, filename: str):
-        """Charge les métadonnées contextuelles"""
+        """Charge les métadonnées contextuelles (format ligne par ligne indexé, sinon JSON)"""
         try:
+            metadonnees = charger_metadonnees(filename)
+            if metadonnees is not None:
+                # Vues paresseuses: chaque enregistrement est décodé au premier accès
+                self.word_contexts = metadonnees.contextes()
+                self.word_families = metadonnees.familles()
+                self.semantic_groups = metadonnees.groupes()
+                self.frequency_scores = metadonnees.frequences()
+                print(f"✅ Métadonnées contextuelles indexées ouvertes")
+                return
+            
             with open(filename, 'r', encoding='utf-8') as f:
                 metadata = json.load(f)
                 
@@ -61,7 +73,8 @@ class DictionnaireIntelligent:
     
     def is_french_word(self, word: str) -> bool:
         """Vérifie si un mot est français"""
-        return word.lower() in self.words
+        word = word.lower()
+        return word in self.words or normaliser_texte(word) in self.folded_words
     
     def get_word_context(self, word: str) -> List[str]:
         """Récupère le contexte d'un mot"""
@@ -5,10 +5,13 @@ Utilitaires pour la gestion du dictionnaire français
 """
 
 import os
-import re
 import json
-from typing import Set, List, Dict, Optional
+from typing import Set, List, Dict, Optional, Union
 from collections import defaultdict
+from lexique import Lexique, charger_lexique
+from metadonnees import charger_metadonnees
+from normalisation import normaliser_texte
+from analyse_requete import AnalyseRequete, analyser_requete
 
 class DictionnaireFrancais:
     """Classe pour gérer le dictionnaire français"""
@@ -24,7 +27,9 @@ class DictionnaireFrancais:
         """
         self.fichier_dictionnaire = fichier_dictionnaire
         self.fichier_metadata = fichier_metadata
-        self.mots_francais: Set[str] = set()
+        self.mots_francais: Lexique = Lexique(None)
+        # Clés normalisées (sans accents) des mots, pour retrouver "vélo" à partir de "velo"
+        self.cles_normalisees: Lexique = Lexique(None)
         self.contextes_mots = defaultdict(list)
         self.familles_mots = defaultdict(set)
         self.groupes_semantiques = defaultdict(set)
@@ -34,14 +39,11 @@ class DictionnaireFrancais:
         self.charger_metadata()
     
     def charger_dictionnaire(self) -> None:
-        """Charge le dictionnaire depuis le fichier"""
+        """Charge le dictionnaire via son lexique compilé (mappé en mémoire, recompilé si le texte a changé)"""
         try:
             if os.path.exists(self.fichier_dictionnaire):
-                with open(self.fichier_dictionnaire, 'r', encoding='utf-8') as f:
-                    for ligne in f:
-                        mot = ligne.strip().lower()
-                        if mot and len(mot) > 1:
-                            self.mots_francais.add(mot)
+                self.mots_francais = charger_lexique(self.fichier_dictionnaire)
+                self.cles_normalisees = charger_lexique(self.fichier_dictionnaire, plier=True)
                 print(f"✓ Dictionnaire français chargé: {len(self.mots_francais)} mots")
             else:
                 print(f"⚠ Fichier dictionnaire non trouvé: {self.fichier_dictionnaire}")
@@ -49,9 +51,17 @@ class DictionnaireFrancais:
             print(f"✗ Erreur lors du chargement du dictionnaire: {e}")
     
     def charger_metadata(self) -> None:
-        """Charge les métadonnées contextuelles"""
+        """Charge les métadonnées contextuelles (format ligne par ligne indexé, sinon JSON)"""
         try:
-            if os.path.exists(self.fichier_metadata):
+            metadonnees = charger_metadonnees(self.fichier_metadata)
+            if metadonnees is not None:
+                # Vues paresseuses: chaque enregistrement est décodé au premier accès
+                self.contextes_mots = metadonnees.contextes()
+                self.familles_mots = metadonnees.familles()
+                self.groupes_semantiques = metadonnees.groupes()
+                self.scores_frequence = metadonnees.frequences()
+                print(f"✓ Métadonnées contextuelles indexées ouvertes")
+            elif os.path.exists(self.fichier_metadata):
                 with open(self.fichier_metadata, 'r', encoding='utf-8') as f:
                     metadata = json.load(f)
                     
@@ -78,41 +88,34 @@ class DictionnaireFrancais:
         Returns:
             True si le mot est français, False sinon
         """
-        return mot.lower().strip() in self.mots_francais
+        mot = mot.lower().strip()
+        return len(mot) > 1 and (mot in self.mots_francais or normaliser_texte(mot) in self.cles_normalisees)
     
-    def extraire_mots_francais(self, texte: str) -> List[str]:
+    def extraire_mots_francais(self, texte: Union[str, AnalyseRequete]) -> List[str]:
         """
         Extrait tous les mots français d'un texte
         
         Args:
-            texte: Le texte à analyser
+            texte: Le texte à analyser (ou son AnalyseRequete, pour réutiliser les mots reconnus)
             
         Returns:
             Liste des mots français trouvés
         """
-        # Nettoyer le texte
-        texte_propre = re.sub(r'[^\w\s]', ' ', texte.lower())
-        mots = re.findall(r'\b\w+\b', texte_propre)
-        
-        mots_francais = []
-        for mot in mots:
-            if len(mot) > 1 and self.est_mot_francais(mot):
-                mots_francais.append(mot)
-        
-        return mots_francais
+        return [mot for mot in analyser_requete(texte).mots_reconnus(self) if len(mot) > 1]
     
-    def calculer_ratio_francais(self, texte: str) -> float:
+    def calculer_ratio_francais(self, texte: Union[str, AnalyseRequete]) -> float:
         """
         Calcule le ratio de mots français dans un texte
         
         Args:
-            texte: Le texte à analyser
+            texte: Le texte à analyser (ou son AnalyseRequete)
             
         Returns:
             Ratio entre 0 et 1 (1 = 100% français)
         """
-        mots_francais = self.extraire_mots_francais(texte)
-        mots_totaux = len(re.findall(r'\b\w+\b', texte.lower()))
+        analyse = analyser_requete(texte)
+        mots_francais = self.extraire_mots_francais(analyse)
+        mots_totaux = len(analyse.mots)
         
         if mots_totaux == 0:
             return 0.0
@@ -133,7 +136,11 @@ class DictionnaireFrancais:
         mot_lower = mot.lower()
         suggestions = []
         
-        for mot_dict in self.mots_francais:
+        # Seuls les mots partageant les 3 premières lettres (ou préfixes courts du mot) sont candidats
+        candidats = list(self.mots_francais.mots_avec_prefixe(mot_lower[:3]))
+        candidats += [mot_lower[:i] for i in range(1, min(3, len(mot_lower))) if mot_lower[:i] in self.mots_francais]
+        
+        for mot_dict in candidats:
             # Calcul de similarité simple (distance de Levenshtein simplifiée)
             if len(mot_dict) >= len(mot_lower) - 1 and len(mot_dict) <= len(mot_lower) + 1:
                 # Mots de longueur similaire
@@ -169,7 +176,8 @@ class DictionnaireFrancais:
         for mot in nouveaux_mots:
             mot_propre = mot.lower().strip()
             if mot_propre and len(mot_propre) > 1:
-                self.mots_francais.add(mot_propre)
+                self.mots_francais.ajouter(mot_propre)
+                self.cles_normalisees.ajouter(normaliser_texte(mot_propre))
         
         # Sauvegarder le dictionnaire enrichi
         self.sauvegarder_dictionnaire()
@@ -180,6 +188,9 @@ class DictionnaireFrancais:
             with open(self.fichier_dictionnaire, 'w', encoding='utf-8') as f:
                 for mot in sorted(self.mots_francais):
                     f.write(mot + '\n')
+            # Recompile le lexique à partir du fichier mis à jour
+            self.mots_francais = charger_lexique(self.fichier_dictionnaire)
+            self.cles_normalisees = charger_lexique(self.fichier_dictionnaire, plier=True)
             print(f"✓ Dictionnaire sauvegardé: {len(self.mots_francais)} mots")
         except Exception as e:
             print(f"✗ Erreur lors de la sauvegarde: {e}")
@@ -227,26 +238,24 @@ class DictionnaireFrancais:
                 return groupe
         return None
     
-    def analyser_contexte_texte(self, texte: str) -> Dict:
-        """Analyse le contexte d'un texte"""
-        mots = re.findall(r'\b\w+\b', texte.lower())
-        mots_francais = []
+    def analyser_contexte_texte(self, texte: Union[str, AnalyseRequete]) -> Dict:
+        """Analyse le contexte d'un texte (ou de son AnalyseRequete)"""
+        analyse = analyser_requete(texte)
+        mots = analyse.mots
+        mots_francais = list(analyse.mots_reconnus(self))
         analyse_contexte = defaultdict(int)
         analyse_semantique = defaultdict(int)
         
-        for mot in mots:
-            if self.est_mot_francais(mot):
-                mots_francais.append(mot)
-                
-                # Analyser les contextes
-                contextes = self.obtenir_contexte_mot(mot)
-                for contexte in contextes:
-                    analyse_contexte[contexte] += 1
-                
-                # Analyser les groupes sémantiques
-                groupe_semantique = self.obtenir_groupe_semantique(mot)
-                if groupe_semantique:
-                    analyse_semantique[groupe_semantique] += 1
+        for mot in mots_francais:
+            # Analyser les contextes
+            contextes = self.obtenir_contexte_mot(mot)
+            for contexte in contextes:
+                analyse_contexte[contexte] += 1
+            
+            # Analyser les groupes sémantiques
+            groupe_semantique = self.obtenir_groupe_semantique(mot)
+            if groupe_semantique:
+                analyse_semantique[groupe_semantique] += 1
         
         return {
             "mots_francais": mots_francais,
@@ -269,11 +278,13 @@ def analyser_description_douane(description: str, dictionnaire: DictionnaireFran
     Returns:
         Dictionnaire avec l'analyse
     """
-    mots_francais = dictionnaire.extraire_mots_francais(description)
-    ratio_francais = dictionnaire.calculer_ratio_francais(description)
+    # Les mots reconnus sont calculés une fois et partagés par les trois analyses
+    analyse = AnalyseRequete(description)
+    mots_francais = dictionnaire.extraire_mots_francais(analyse)
+    ratio_francais = dictionnaire.calculer_ratio_francais(analyse)
     
     # Analyse contextuelle intelligente
-    analyse_contexte = dictionnaire.analyser_contexte_texte(description)
+    analyse_contexte = dictionnaire.analyser_contexte_texte(analyse)
     
     # Analyser le contexte douanier
     contextes_douane = ["douane", "import", "export", "commerce", "transport"]
@@ -319,7 +330,7 @@ def suggerer_améliorations_description(description: str, dictionnaire: Dictionn
     suggestions = []
     
     # Analyser les mots non reconnus
-    mots_tous = re.findall(r'\b\w+\b', description.lower())
+    mots_tous = analyser_requete(description).mots
     mots_non_reconnus = [mot for mot in mots_tous if len(mot) > 2 and not dictionnaire.est_mot_francais(mot)]
     
     for mot in mots_non_reconnus[:5]:  # Limiter à 5 suggestions
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache borné des embeddings de requêtes, avec niveau disque optionnel
+"""
+
+import os
+import re
+import json
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Optional
+
+class QueryEmbeddingCache:
+    """Cache LRU texte prétraité → embedding, persistant sur disque si demandé"""
+
+    VECTORS_FILE = "query_vectors.npy"
+    KEYS_FILE = "query_keys.jsonl"
+    # Lignes allouées à la création du niveau disque, doublées quand il est plein
+    DISK_INITIAL_ROWS = 256
+
+    def __init__(self, max_entries: int = 1024, cache_dir: Optional[str] = None,
+                 disk_max_entries: int = 100000, encoder: Optional[str] = None):
+        """
+        Args:
+            max_entries: Nombre maximal d'embeddings gardés en mémoire
+            cache_dir: Répertoire du niveau disque (vecteurs mappés en mémoire + index des clés)
+            disk_max_entries: Capacité maximale du niveau disque
+            encoder: Identité de l'encodeur (modèle et backend); chaque encodeur a son
+                sous-répertoire, pour ne jamais relire les vecteurs d'un autre
+        """
+        self.max_entries = max_entries
+        if cache_dir and encoder:
+            cache_dir = os.path.join(cache_dir, re.sub(r'[^\w.-]', '_', encoder))
+        self.cache_dir = cache_dir
+        self.disk_max_entries = disk_max_entries
+        self.memory = OrderedDict()
+        self.disk_index: Dict[str, int] = {}
+        self.disk_vectors = None
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        if cache_dir:
+            self.load_disk_tier()
+
+    def load_disk_tier(self) -> None:
+        """Ouvre le niveau disque existant (les vecteurs ne sont lus qu'à l'accès)"""
+        keys_path = os.path.join(self.cache_dir, self.KEYS_FILE)
+        vectors_path = os.path.join(self.cache_dir, self.VECTORS_FILE)
+        if not (os.path.exists(keys_path) and os.path.exists(vectors_path)):
+            return
+
+        try:
+            self.disk_vectors = np.load(vectors_path, mmap_mode='r+')
+            with open(keys_path, 'r', encoding='utf-8') as f:
+                for row, line in enumerate(f):
+                    if row >= len(self.disk_vectors):
+                        break
+                    self.disk_index[json.loads(line)] = row
+        except Exception as e:
+            print(f"⚠️ Cache disque des requêtes ignoré: {e}")
+            self.disk_index = {}
+            self.disk_vectors = None
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Retourne l'embedding en cache ou None"""
+        vector = self.memory.get(key)
+        if vector is not None:
+            self.memory.move_to_end(key)
+            self.counters['memory_hits'] += 1
+            return vector
+
+        row = self.disk_index.get(key)
+        if row is not None:
+            vector = np.array(self.disk_vectors[row], dtype=np.float32)
+            self.remember(key, vector)
+            self.counters['disk_hits'] += 1
+            return vector
+
+        self.counters['misses'] += 1
+        return None
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """Ajoute un embedding au cache mémoire et, si configuré, au niveau disque"""
+        vector = np.asarray(vector, dtype=np.float32)
+        self.remember(key, vector)
+        if self.cache_dir and key not in self.disk_index:
+            self.write_to_disk(key, vector)
+
+    def remember(self, key: str, vector: np.ndarray) -> None:
+        """Insère dans le niveau mémoire en évinçant l'entrée la moins récente"""
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def write_to_disk(self, key: str, vector: np.ndarray) -> None:
+        """Ajoute une ligne au fichier de vecteurs mappé (agrandi si besoin) et à l'index des clés"""
+        if self.disk_vectors is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.disk_vectors = np.lib.format.open_memmap(
+                os.path.join(self.cache_dir, self.VECTORS_FILE), mode='w+', dtype=np.float32,
+                shape=(min(self.DISK_INITIAL_ROWS, self.disk_max_entries), len(vector)))
+            open(os.path.join(self.cache_dir, self.KEYS_FILE), 'w').close()
+
+        row = len(self.disk_index)
+        if self.disk_vectors.shape[1] != len(vector):
+            return  # Dimension différente: mémoire seule
+        if row >= len(self.disk_vectors):
+            if row >= self.disk_max_entries:
+                return  # Niveau disque plein: mémoire seule
+            self.grow_disk_tier(min(2 * len(self.disk_vectors), self.disk_max_entries))
+
+        self.disk_vectors[row] = vector
+        self.disk_vectors.flush()
+        with open(os.path.join(self.cache_dir, self.KEYS_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(key, ensure_ascii=False) + '\n')
+        self.disk_index[key] = row
+
+    def grow_disk_tier(self, rows: int) -> None:
+        """Recopie les vecteurs dans un fichier de rows lignes, substitué à l'ancien"""
+        path = os.path.join(self.cache_dir, self.VECTORS_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32,
+                                          shape=(rows, self.disk_vectors.shape[1]))
+        used = len(self.disk_index)
+        grown[:used] = self.disk_vectors[:used]
+        grown.flush()
+        del grown
+        self.disk_vectors = None
+        os.replace(tmp_path, path)
+        self.disk_vectors = np.load(path, mmap_mode='r+')
+
+    def stats(self) -> Dict:
+        """Compteurs d'accès et taux de succès du cache"""
+        hits = self.counters['memory_hits'] + self.counters['disk_hits']
+        lookups = hits + self.counters['misses']
+        return {
+            **self.counters,
+            'hits': hits,
+            'lookups': lookups,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'memory_entries': len(self.memory),
+            'disk_entries': len(self.disk_index)
+        }
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stockage des embeddings du tarif CEDEAO avec quantification optionnelle
+"""
+
+import os
+import re
+import hashlib
+import numpy as np
+from typing import List, Optional, Tuple
+
+# Répertoire des copies pleine précision quand aucun n'est donné
+EMBEDDING_CACHE_ENV = 'CEDEAO_EMBEDDING_CACHE_DIR'
+DEFAULT_EMBEDDING_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cedeao', 'embeddings')
+
+class EmbeddingStore:
+    """Matrice d'embeddings normalisés, en float32, float16 ou int8 (échelle par ligne)"""
+
+    PRECISIONS = ('float32', 'float16', 'int8')
+    CHUNK_SIZE = 4096
+
+    def __init__(self, embeddings: np.ndarray, precision: str = 'float32',
+                 cache_dir: Optional[str] = None, cache_key: Optional[str] = None):
+        """
+        Construit le stockage à partir d'une matrice (n, dim)
+
+        Args:
+            embeddings: Embeddings bruts du tarif
+            precision: 'float32', 'float16' ou 'int8'
+            cache_dir: Répertoire où écrire la copie pleine précision (mappée en mémoire), utilisée
+                pour re-classer les meilleurs candidats (défaut: CEDEAO_EMBEDDING_CACHE_DIR, sinon
+                DEFAULT_EMBEDDING_CACHE_DIR); si l'écriture échoue, la copie reste en mémoire
+            cache_key: Identifiant des embeddings (empreinte du tarif) qui nomme la copie sur disque
+        """
+        if precision not in self.PRECISIONS:
+            raise ValueError(f"Précision inconnue: {precision} (attendu: {', '.join(self.PRECISIONS)})")
+
+        self.precision = precision
+        full = self._normalize(np.asarray(embeddings, dtype=np.float32))
+
+        if precision == 'float32':
+            self.vectors = full
+            self.scales = None
+        elif precision == 'float16':
+            self.vectors = full.astype(np.float16)
+            self.scales = None
+        else:
+            # Quantification symétrique int8 avec une échelle par ligne
+            max_abs = np.abs(full).max(axis=1) if len(full) else np.zeros(0, dtype=np.float32)
+            self.scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+            self.vectors = np.clip(np.rint(full / self.scales[:, None]), -127, 127).astype(np.int8)
+
+        # Copie pleine précision pour le re-classement des meilleurs candidats: mappée depuis le
+        # disque plutôt que gardée en mémoire à côté de la matrice quantifiée
+        if precision == 'float32':
+            self.full_precision = full
+        else:
+            cache_dir = cache_dir or os.environ.get(EMBEDDING_CACHE_ENV, DEFAULT_EMBEDDING_CACHE_DIR)
+            try:
+                self.full_precision = self._map_full_precision(full, cache_dir, cache_key)
+            except OSError:
+                # Répertoire non inscriptible: re-classement depuis une copie en mémoire
+                self.full_precision = full
+
+    @staticmethod
+    def _map_full_precision(full: np.ndarray, cache_dir: str, cache_key: Optional[str]) -> np.memmap:
+        """Écrit (si absente) la copie float32 nommée par cache_key et la relit mappée en mémoire"""
+        if cache_key is None:
+            cache_key = hashlib.sha256(full.tobytes()).hexdigest()[:16]
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_key = re.sub(r'[^\w.-]', '_', cache_key)
+        path = os.path.join(cache_dir, f"embeddings_{cache_key}.float32.npy")
+        if os.path.exists(path):
+            mapped = np.load(path, mmap_mode='r')
+            if mapped.shape == full.shape:
+                return mapped
+        # Écriture dans un fichier temporaire puis renommage: un autre processus ne lit jamais
+        # une copie partielle
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, full)
+        os.replace(tmp_path, path)
+        return np.load(path, mmap_mode='r')
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        """Normalise les lignes pour que le produit scalaire soit la similarité cosinus"""
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire résidente: matrice des scores, échelles et copie pleine précision si elle n'est pas mappée"""
+        resident = self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+        full = self.full_precision
+        if full is not self.vectors and not isinstance(full, np.memmap):
+            resident += full.nbytes
+        return resident
+
+    def approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Similarités cosinus calculées sur la matrice (éventuellement quantifiée)"""
+        query = self._normalize(np.asarray(query, dtype=np.float32))[0]
+        if self.precision == 'float32':
+            return self.vectors @ query
+
+        scores = np.empty(len(self.vectors), dtype=np.float32)
+        # Calcul par blocs pour ne pas matérialiser toute la matrice en float32
+        for start in range(0, len(self.vectors), self.CHUNK_SIZE):
+            block = self.vectors[start:start + self.CHUNK_SIZE].astype(np.float32)
+            scores[start:start + len(block)] = block @ query
+        if self.scales is not None:
+            scores *= self.scales
+        return scores
+
+    def scores(self, query: np.ndarray, rerank_k: int = 50) -> np.ndarray:
+        """
+        Similarités de la requête avec toutes les lignes
+
+        Les rerank_k meilleurs candidats du calcul approché sont recalculés en pleine précision
+        (copie mappée depuis le répertoire de cache); les autres gardent leur score approché.
+        """
+        scores = self.approximate_scores(query)
+        if self.precision == 'float32' or rerank_k <= 0 or not len(scores):
+            return scores
+
+        k = min(rerank_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        query = self._normalize(np.asarray(query, dtype=np.float32))[0]
+        scores[top] = np.asarray(self.full_precision[top], dtype=np.float32) @ query
+        return scores
+
+    def row_scores(self, query: np.ndarray, rows: List[int]) -> np.ndarray:
+        """Similarités de la requête avec les seules lignes rows, en pleine précision"""
+        query = self._normalize(np.asarray(query, dtype=np.float32))[0]
+        rows = np.asarray(rows, dtype=np.int64)
+        return np.asarray(self.full_precision[rows], dtype=np.float32) @ query
+
+    def top_k(self, query: np.ndarray, k: int, rerank_k: int = 50) -> List[Tuple[int, float]]:
+        """Les k lignes les plus similaires (similarité décroissante, puis rang croissant)"""
+        scores = self.scores(query, rerank_k=max(rerank_k, k))
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [(int(i), float(scores[i])) for i in sorted(top, key=lambda i: (-scores[i], i))]
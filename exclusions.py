@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Règles d'exclusion des Notes de section et de chapitre (« Le présent Chapitre ne comprend pas les
+fruits non comestibles ») compilées une fois: chaque clause porte sur une section, un chapitre ou une
+position, a des termes déclencheurs indexés et renvoie éventuellement vers d'autres chapitres ou
+positions. Une description qui contient tous les termes d'une clause (et qui correspond aux positions
+ou chapitres qualifiant l'élément, « des n°s 42.01 ou 42.02 ») déclenche la clause; sa portée est
+alors pénalisée, hors chapitres et positions dont les libellés contiennent eux-mêmes la description.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from lexical_index import STOP_WORDS
+from normalisation import mots_normalises, racine
+
+# Sujet de la clause: le chapitre, la section ou une position nommément
+CLAUSE_PATTERN = re.compile(
+    r"(le présent chapitre|la présente section|le n°\s*(\d{2}\.\d{2}))\s+ne comprend pas\s*(:?)", re.I)
+# Début d'une Note numérotée ("2.-", "3.- ") ou des Notes de sous-positions
+NOTE_SUIVANTE = re.compile(r"\n(?:\d+\s*\.?\s*-|Notes? de sous-positions)", re.I)
+# Énumération a), b)... en début de ligne
+ELEMENT = re.compile(r"(?:^|\n)\s*[a-z]\)\s*")
+# Fin d'une exclusion sans énumération: point en fin de ligne
+FIN_PHRASE = re.compile(r"\.\s*(?:\n|$)")
+# Premier membre d'un élément, avant virgule, parenthèse, renvoi ou « ni »
+PREMIER_MEMBRE = re.compile(r"[,;:(]| ni | (?:du|des|au|aux|de la) (?:n°|chapitre|section)", re.I)
+RENVOI_POSITIONS = re.compile(r"n°s?\s*((?:\d{2}\.\d{2,4}(?:\s*(?:,|et|ou|à)\s*)?)+)")
+RENVOI_CHAPITRES = re.compile(r"Chapitres?\s+((?:\d{1,2}(?:\s*(?:,|et|ou)\s*)?)+)")
+# Renvoi qualifiant l'élément (« articles en matières textiles des n°s 42.01 ou 42.02 »), par
+# opposition au renvoi entre parenthèses qui indique seulement où classer (« maïs doux (Chapitre 7) »)
+QUALIFICATIF = re.compile(r"\b(?:du|des|au|aux|de la)\s+(?:n°s?\s*(?:\d{2}\.\d{2,4}(?:\s*(?:,|et|ou|à)\s*)?)+|"
+                          r"Chapitres?\s+(?:\d{1,2}(?:\s*(?:,|et|ou)\s*)?)+)", re.I)
+# Condition de l'élément (« contenant plus de 20 % en poids de saucisse, de viande... »)
+CONDITION = re.compile(r"\bcontenant\b([^()]*)", re.I)
+# Exceptions de l'élément (« autres que les produits décrits aux n°s 21.03 ou 21.04 »), non qualifiantes
+EXCEPTION = re.compile(r"\b(?:autres que|à l.exception)[^,;]*", re.I)
+
+# Mots trop généraux pour déclencher une exclusion (en plus des mots outils de l'index)
+MOTS_VIDES = STOP_WORDS | frozenset({
+    'ce', 'ces', 'cet', 'cette', 'leur', 'leurs', 'ni', 'que', 'qui', 'meme', 'memes', 'compris', 'ainsi',
+    'dit', 'dite', 'dits', 'dites', 'autre', 'autres', 'produit', 'produits', 'article', 'articles',
+    'contenant', 'partir', 'obtenu', 'obtenus', 'type', 'types', 'ceux', 'celles', 'tel', 'tels', 'notamment',
+    'dans', 'ont', 'ete', 'etre', 'comme', 'plus', 'poids', 'provenant'
+})
+# Termes déclencheurs par clause: au moins MIN_TERMES (un seul mot, « les viandes », exclurait trop)
+MIN_TERMES = 2
+MAX_TERMES = 4
+
+def racines(mots: Iterable[str]) -> FrozenSet[str]:
+    return frozenset(racine(mot) for mot in mots)
+
+@dataclass(frozen=True, slots=True)
+class ClauseExclusion:
+    """Clause « ne comprend pas » d'une Note"""
+
+    portee: str                  # 'section', 'chapitre' ou 'position'
+    cible: str                   # "XI", "08" ou "10.05"
+    texte: str                   # élément exclu, tel qu'écrit dans la Note
+    termes: Tuple[str, ...]      # racines pliées, toutes requises
+    renvois: Tuple[str, ...]     # chapitres ("15") ou positions ("16.04") cités par la Note
+    qualificatifs: Tuple[str, ...] = ()  # renvois qualifiant l'élément, dont l'un doit correspondre
+    conditions: Tuple[str, ...] = ()     # racines de la condition « contenant ... », dont l'une est requise
+
+    def __str__(self) -> str:
+        libelle = {'section': 'La Section', 'chapitre': 'Le Chapitre', 'position': 'Le n°'}[self.portee]
+        return f"{libelle} {self.cible} ne comprend pas {self.texte}"
+
+def termes_declencheurs(element: str) -> Tuple[str, ...]:
+    """Racines du premier membre d'un élément exclu, sans mots vides ni nombres"""
+    membre = PREMIER_MEMBRE.split(element, maxsplit=1)[0]
+    termes: List[str] = []
+    for mot in mots_normalises(membre):
+        if len(mot) > 1 and mot not in MOTS_VIDES and not any(c.isdigit() for c in mot):
+            mot = racine(mot)
+            if mot not in termes:
+                termes.append(mot)
+    return tuple(termes[:MAX_TERMES])
+
+def renvois(element: str) -> Tuple[str, ...]:
+    """Chapitres et positions cités par un élément exclu ("(n° 16.04)", "(Chapitre 15)")"""
+    cites: List[str] = []
+    for correspondance in RENVOI_POSITIONS.finditer(element):
+        cites += re.findall(r"\d{2}\.\d{2}", correspondance.group(1))
+    for correspondance in RENVOI_CHAPITRES.finditer(element):
+        cites += [numero.zfill(2) for numero in re.findall(r"\d+", correspondance.group(1))]
+    return tuple(dict.fromkeys(cites))
+
+def qualificatifs(element: str) -> Tuple[str, ...]:
+    """Chapitres et positions qualifiant un élément exclu ("des n°s 42.01 ou 42.02", "du Chapitre 64")"""
+    element = EXCEPTION.sub('', element)
+    return tuple(dict.fromkeys(cite for correspondance in QUALIFICATIF.finditer(element)
+                               for cite in renvois(correspondance.group(0))))
+
+def conditions(element: str) -> Tuple[str, ...]:
+    """Racines de la condition d'un élément exclu ("contenant plus de 20 % ... de viande, de poisson")"""
+    element = EXCEPTION.sub('', element)
+    termes: List[str] = []
+    for correspondance in CONDITION.finditer(element):
+        for mot in mots_normalises(QUALIFICATIF.sub('', correspondance.group(1))):
+            if len(mot) > 1 and mot not in MOTS_VIDES and not any(c.isdigit() for c in mot):
+                termes.append(racine(mot))
+    return tuple(dict.fromkeys(termes))
+
+def extraire_clauses(notes: str, portee: str, cible: str) -> List[ClauseExclusion]:
+    """Clauses d'exclusion du texte des Notes d'une section ou d'un chapitre"""
+    clauses = []
+    for correspondance in CLAUSE_PATTERN.finditer(notes):
+        if correspondance.group(2):
+            portee_clause, cible_clause = 'position', correspondance.group(2)
+        else:
+            portee_clause, cible_clause = portee, cible
+        suite = notes[correspondance.end():]
+        fin = NOTE_SUIVANTE.search(suite)
+        suite = suite[:fin.start()] if fin else suite
+        if correspondance.group(3):
+            elements = [e for e in ELEMENT.split(suite) if e.strip()]
+        else:
+            fin = FIN_PHRASE.search(suite)
+            elements = [suite[:fin.start()] if fin else suite]
+
+        for element in elements:
+            element = re.sub(r"\s+", " ", element).strip().rstrip(';.').strip()
+            # Éléments conditionnels (« en ce qui concerne les n°s ... », « à l'exception ... »)
+            if re.match(r"(en ce qui concerne|à l.exception|sous réserve)", element, re.I):
+                continue
+            termes = termes_declencheurs(element)
+            if len(termes) >= MIN_TERMES:
+                clauses.append(ClauseExclusion(portee_clause, cible_clause, element, termes, renvois(element),
+                                               qualificatifs(element), conditions(element)))
+    return clauses
+
+class TableExclusions:
+    """
+    Clauses compilées, indexées par terme déclencheur
+
+    vocabulaire: racines des titres et des lignes de chaque chapitre ("08") et position ("10.05");
+    sans vocabulaire, les qualificatifs ne sont pas vérifiés et aucune portée n'est épargnée.
+    """
+
+    def __init__(self, clauses: Iterable[ClauseExclusion], section_chapitre: Optional[Mapping[str, str]] = None,
+                 vocabulaire: Optional[Mapping[str, FrozenSet[str]]] = None):
+        self.clauses = list(clauses)
+        self.section_chapitre = dict(section_chapitre or {})
+        self.vocabulaire = dict(vocabulaire or {})
+        self.par_terme: Dict[str, List[int]] = {}
+        for numero, clause in enumerate(self.clauses):
+            for terme in clause.termes:
+                self.par_terme.setdefault(terme, []).append(numero)
+
+    def __len__(self) -> int:
+        return len(self.clauses)
+
+    def correspond(self, portee: str, presents: FrozenSet[str]) -> bool:
+        """Le titre ou les lignes d'un chapitre ou d'une position contiennent l'un des termes"""
+        return not presents.isdisjoint(self.vocabulaire.get(portee, ()))
+
+    def declenchees(self, mots: Iterable[str]) -> List[ClauseExclusion]:
+        """
+        Clauses dont tous les termes figurent parmi les mots (pliés) d'une description, dont la
+        condition éventuelle a l'un de ses termes dans la description et dont un qualificatif éventuel
+        correspond à la description par un autre mot que ces termes
+        """
+        presents = racines(mot for mot in mots if mot not in MOTS_VIDES)
+        candidates = sorted({numero for terme in presents for numero in self.par_terme.get(terme, ())})
+        clauses = []
+        for numero in candidates:
+            clause = self.clauses[numero]
+            if not all(terme in presents for terme in clause.termes):
+                continue
+            if clause.conditions and presents.isdisjoint(clause.conditions):
+                continue
+            if clause.qualificatifs and self.vocabulaire:
+                autres = presents.difference(clause.termes)
+                if not any(self.correspond(cible, autres) for cible in clause.qualificatifs):
+                    continue
+            clauses.append(clause)
+        return clauses
+
+    def portee_exclue(self, clauses: Iterable[ClauseExclusion],
+                      mots: Iterable[str] = ()) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """
+        Chapitres ("08") et positions ("10.05") visés par des clauses déclenchées, hors ceux dont le
+        titre ou les lignes contiennent l'un des mots (pliés) de la description autres que les termes
+        de la clause: le mot qui déclenche l'exclusion (« non comestibles ») ne protège pas sa cible
+        """
+        mots = racines(mot for mot in mots if mot not in MOTS_VIDES)
+        chapitres, positions = set(), set()
+        for clause in clauses:
+            presents = mots.difference(clause.termes)
+            if clause.portee == 'section':
+                cibles = {chapitre for chapitre, section in self.section_chapitre.items() if section == clause.cible}
+                chapitres |= {c for c in cibles if not self.correspond(c, presents)}
+            elif clause.portee == 'chapitre':
+                if not self.correspond(clause.cible, presents):
+                    chapitres.add(clause.cible)
+            elif not self.correspond(clause.cible, presents):
+                positions.add(clause.cible)
+        return frozenset(chapitres), frozenset(positions)
+
+def vocabulaire_tarif(tarif) -> Dict[str, FrozenSet[str]]:
+    """Racines des titres, libellés et lignes de chaque chapitre ("08") et position ("08.01") d'un Tarif"""
+    textes: Dict[str, List[str]] = {}
+    for chapitre, titre in tarif.chapitres.items():
+        textes.setdefault(chapitre, []).append(titre)
+    for position, libelle in tarif.positions.items():
+        textes.setdefault(position, []).append(libelle)
+    for ligne in tarif.lignes:
+        for portee in (ligne.chapitre, ligne.position):
+            textes.setdefault(portee, []).append(ligne.designation + ' ' + ligne.parents)
+    return {portee: racines(mot for texte in liste for mot in mots_normalises(texte)
+                            if mot not in MOTS_VIDES and not any(c.isdigit() for c in mot))
+            for portee, liste in textes.items()}
+
+def construire_exclusions(tarif) -> TableExclusions:
+    """Table des clauses de toutes les Notes d'un Tarif (tarif_structure)"""
+    clauses = []
+    for section, notes in tarif.notes_sections.items():
+        clauses += extraire_clauses(notes, 'section', section)
+    for chapitre, notes in tarif.notes_chapitres.items():
+        clauses += extraire_clauses(notes, 'chapitre', chapitre)
+    return TableExclusions(clauses, tarif.section_chapitre, vocabulaire_tarif(tarif))
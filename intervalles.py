@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Seuils numériques des libellés du tarif (« d'un poids n'excédant pas 185 g », « excédant 1 % mais
+n'excédant pas 6 % ») convertis en intervalles typés dans une unité de référence, mesures extraites
+d'une description, et index d'intervalles par grandeur interrogé par recherche dichotomique
+"""
+
+import math
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from normalisation import TAILLE_MEMO, normaliser_texte
+
+# Unité (forme pliée, minuscules) -> (grandeur, facteur vers l'unité de référence de la grandeur)
+UNITES = {
+    'mg': ('masse', 0.001), 'g': ('masse', 1.0), 'kg': ('masse', 1000.0),
+    't': ('masse', 1e6), 'tonne': ('masse', 1e6), 'tonnes': ('masse', 1e6),
+    'mm': ('longueur', 1.0), 'cm': ('longueur', 10.0), 'm': ('longueur', 1000.0),
+    'pouce': ('longueur', 25.4), 'pouces': ('longueur', 25.4),
+    'cm3': ('volume', 1.0), 'ml': ('volume', 1.0), 'cl': ('volume', 10.0),
+    'l': ('volume', 1000.0), 'litre': ('volume', 1000.0), 'litres': ('volume', 1000.0),
+    'w': ('puissance', 1.0), 'kw': ('puissance', 1000.0), 'mw': ('puissance', 1e6),
+    'va': ('puissance_apparente', 1.0), 'kva': ('puissance_apparente', 1000.0),
+    'v': ('tension', 1.0), 'kv': ('tension', 1000.0),
+    '%': ('pourcentage', 1.0),
+    'g/m2': ('grammage', 1.0),
+    'g/cm3': ('masse_volumique', 1.0),
+}
+
+# Nombre: "1.500" et "10 000" (séparateurs de milliers), "0,5" ou "1.8" (décimales)
+NOMBRE = r"\d{1,3}(?:[. ]\d{3})+(?:,\d+)?(?![\d.])|\d+(?:[.,]\d+)?"
+UNITE = '|'.join(re.escape(unite) for unite in sorted(UNITES, key=len, reverse=True))
+# Dans une description, l'unité n'est suivie ni d'un mot ni d'un trait d'union (« 100 t-shirts »)
+MESURE_PATTERN = re.compile(rf"(?<![\w.,])({NOMBRE})\s*({UNITE})(?![\w/-])")
+# Générations de réseau mobile, à ne pas lire comme des grammes
+RESEAUX_MOBILES = frozenset({'2g', '3g', '4g', '5g'})
+# Unités trop ambiguës dans une description (« moteur 2 t » : deux temps), lues seulement dans le tarif
+UNITES_AMBIGUES = frozenset({'t'})
+# "1.500" ou "1,500": milliers ou décimales selon l'auteur, la mesure est ignorée dans une description
+NOMBRE_AMBIGU = re.compile(r"\d{1,3}[.,]\d{3}")
+
+# Comparatifs (texte plié) -> (borne fixée, borne incluse)
+COMPARATIFS = {
+    "n'excedant pas": ('haut', True), 'excedant pas': ('haut', True), 'excedant': ('bas', False),
+    "d'au moins": ('bas', True), 'au moins': ('bas', True), "d'au plus": ('haut', True), 'au plus': ('haut', True),
+    'plus de': ('bas', False), 'moins de': ('haut', False),
+    'inferieur ou egal a': ('haut', True), 'inferieur a': ('haut', False),
+    'superieur ou egal a': ('bas', True), 'superieur a': ('bas', False),
+}
+COMPARATIF_PATTERN = re.compile(
+    r"(n'excedant pas|excedant pas|excedant|d'au moins|au moins|d'au plus|au plus|plus de|moins de|"
+    r"(?:inferieur|superieur)e?s? ou egale?s? a|(?:inferieur|superieur)e?s? a)"
+    rf"\s+({NOMBRE})(?:\s*({UNITE})(?![\w/]))?")
+
+@dataclass(frozen=True, slots=True)
+class Intervalle:
+    """Plage de valeurs d'une grandeur, dans son unité de référence"""
+
+    grandeur: str
+    bas: float = -math.inf
+    haut: float = math.inf
+    bas_inclus: bool = False
+    haut_inclus: bool = False
+
+    def contient(self, valeur: float) -> bool:
+        if valeur < self.bas or (valeur == self.bas and not self.bas_inclus):
+            return False
+        return valeur < self.haut or (valeur == self.haut and self.haut_inclus)
+
+    def intersection(self, autre: 'Intervalle') -> 'Intervalle':
+        """Plage commune (les deux seuils de « excédant 1 % mais n'excédant pas 6 % »)"""
+        if (autre.bas, not autre.bas_inclus) > (self.bas, not self.bas_inclus):
+            bas, bas_inclus = autre.bas, autre.bas_inclus
+        else:
+            bas, bas_inclus = self.bas, self.bas_inclus
+        if (autre.haut, autre.haut_inclus) < (self.haut, self.haut_inclus):
+            haut, haut_inclus = autre.haut, autre.haut_inclus
+        else:
+            haut, haut_inclus = self.haut, self.haut_inclus
+        return Intervalle(self.grandeur, bas, haut, bas_inclus, haut_inclus)
+
+@dataclass(frozen=True, slots=True)
+class Mesure:
+    """Valeur d'une grandeur lue dans une description, dans l'unité de référence"""
+
+    grandeur: str
+    valeur: float
+
+def lire_nombre(texte: str) -> float:
+    """"1.500" -> 1500, "10 000" -> 10000, "0,5" -> 0.5, "1.8" -> 1.8"""
+    if re.fullmatch(r"\d{1,3}(?:[. ]\d{3})+(?:,\d+)?", texte):
+        texte = texte.replace('.', '').replace(' ', '')
+    return float(texte.replace(',', '.'))
+
+@lru_cache(maxsize=TAILLE_MEMO)
+def seuils_texte(texte: str) -> Tuple[Intervalle, ...]:
+    """
+    Seuils d'un texte, dans l'ordre
+
+    Un seuil sans unité prend celle du seuil suivant du même texte (« excédant 50 mais n'excédant
+    pas 250 cm³ »), à défaut celle du précédent. Le résultat est mémorisé: les libellés de position
+    et de groupe sont partagés par de nombreuses lignes.
+    """
+    if not any(c.isdigit() for c in texte):
+        # Sans chiffre, pas de seuil: le pliage du texte est évité
+        return ()
+    seuils = [(correspondance.group(1), correspondance.group(2), correspondance.group(3))
+              for correspondance in COMPARATIF_PATTERN.finditer(normaliser_texte(texte))]
+    resultat = []
+    for i, (comparatif, nombre, unite) in enumerate(seuils):
+        if unite is None:
+            unite = next((u for _, _, u in seuils[i + 1:] if u), None) or \
+                next((u for _, _, u in reversed(seuils[:i]) if u), None)
+            if unite is None:
+                continue
+        grandeur, facteur = UNITES[unite]
+        borne, incluse = COMPARATIFS[re.sub(r'(ieur)e?s?|(egal)e?s?', r'\1\2', comparatif)]
+        valeur = lire_nombre(nombre) * facteur
+        if borne == 'bas':
+            resultat.append(Intervalle(grandeur, bas=valeur, bas_inclus=incluse))
+        else:
+            resultat.append(Intervalle(grandeur, haut=valeur, haut_inclus=incluse))
+    return tuple(resultat)
+
+def extraire_intervalles(*textes: str) -> Dict[str, Intervalle]:
+    """
+    Intervalles par grandeur exprimés par les seuils des textes (libellés hérités puis désignation);
+    les seuils d'une même grandeur se combinent
+    """
+    intervalles: Dict[str, Intervalle] = {}
+    for texte in textes:
+        for seuil in seuils_texte(texte):
+            grandeur = seuil.grandeur
+            intervalles[grandeur] = intervalles[grandeur].intersection(seuil) if grandeur in intervalles else seuil
+    return intervalles
+
+def extraire_mesures(texte: str) -> List[Mesure]:
+    """
+    Mesures d'une description: "poids 1.8kg" -> Mesure('masse', 1800.0)
+
+    Plus prudente que la lecture des seuils du tarif: les nombres dont le séparateur peut être celui
+    des milliers comme celui des décimales et les unités ambiguës sont ignorés.
+    """
+    mesures = []
+    for correspondance in MESURE_PATTERN.finditer(normaliser_texte(texte)):
+        if (correspondance.group(0) in RESEAUX_MOBILES or correspondance.group(2) in UNITES_AMBIGUES
+                or NOMBRE_AMBIGU.fullmatch(correspondance.group(1))):
+            continue
+        grandeur, facteur = UNITES[correspondance.group(2)]
+        mesures.append(Mesure(grandeur, lire_nombre(correspondance.group(1)) * facteur))
+    return mesures
+
+def verifier_mesures(intervalles: Mapping[str, Intervalle], mesures: Iterable[Mesure]) -> Optional[bool]:
+    """
+    Compatibilité des seuils d'une ligne avec les mesures d'une description: None si aucune grandeur
+    mesurée n'est contrainte, sinon True si chaque grandeur contrainte a au moins une mesure dans
+    son intervalle
+    """
+    valeurs: Dict[str, List[float]] = {}
+    for mesure in mesures:
+        if mesure.grandeur in intervalles:
+            valeurs.setdefault(mesure.grandeur, []).append(mesure.valeur)
+    if not valeurs:
+        return None
+    return all(any(intervalles[grandeur].contient(valeur) for valeur in liste) for grandeur, liste in valeurs.items())
+
+class IndexIntervalles:
+    """
+    Index des intervalles des documents, par grandeur
+
+    Les bornes d'une grandeur découpent la droite en segments élémentaires (chaque borne, puis
+    l'ouvert entre deux bornes consécutives); l'ensemble des documents contenant chaque segment est
+    précalculé, si bien qu'une valeur se résout par une recherche dichotomique parmi les bornes.
+    """
+
+    def __init__(self, documents: Iterable[Mapping[str, Intervalle]]):
+        par_grandeur: Dict[str, List[Tuple[int, Intervalle]]] = {}
+        for doc_id, intervalles in enumerate(documents):
+            for grandeur, intervalle in intervalles.items():
+                par_grandeur.setdefault(grandeur, []).append((doc_id, intervalle))
+
+        # Par grandeur: bornes triées et documents de chaque segment (2i: ouvert avant la borne i,
+        # 2i + 1: la borne i, 2m: au-delà de la dernière)
+        self.bornes: Dict[str, List[float]] = {}
+        self.segments: Dict[str, List[FrozenSet[int]]] = {}
+        self.contraints: Dict[str, FrozenSet[int]] = {}
+        for grandeur, entrees in par_grandeur.items():
+            bornes = sorted({b for _, i in entrees for b in (i.bas, i.haut) if math.isfinite(b)})
+            segments = [set() for _ in range(2 * len(bornes) + 1)]
+            for doc_id, intervalle in entrees:
+                premier = 0 if intervalle.bas == -math.inf else \
+                    2 * bisect_left(bornes, intervalle.bas) + (1 if intervalle.bas_inclus else 2)
+                dernier = len(segments) - 1 if intervalle.haut == math.inf else \
+                    2 * bisect_left(bornes, intervalle.haut) + (1 if intervalle.haut_inclus else 0)
+                for segment in range(premier, dernier + 1):
+                    segments[segment].add(doc_id)
+            self.bornes[grandeur] = bornes
+            self.segments[grandeur] = [frozenset(segment) for segment in segments]
+            self.contraints[grandeur] = frozenset(doc_id for doc_id, _ in entrees)
+
+    def documents(self, grandeur: str, valeur: float) -> FrozenSet[int]:
+        """Documents dont l'intervalle de la grandeur contient la valeur"""
+        bornes = self.bornes.get(grandeur)
+        if bornes is None:
+            return frozenset()
+        i = bisect_left(bornes, valeur)
+        return self.segments[grandeur][2 * i + 1 if i < len(bornes) and bornes[i] == valeur else 2 * i]
+
+    def verifier(self, doc_id: int, mesures: Iterable[Mesure]) -> Optional[bool]:
+        """Comme verifier_mesures, pour un document de l'index"""
+        valeurs: Dict[str, List[float]] = {}
+        for mesure in mesures:
+            if doc_id in self.contraints.get(mesure.grandeur, ()):
+                valeurs.setdefault(mesure.grandeur, []).append(mesure.valeur)
+        if not valeurs:
+            return None
+        return all(any(doc_id in self.documents(grandeur, valeur) for valeur in liste)
+                   for grandeur, liste in valeurs.items())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index inversé BM25 des lignes du tarif avec sélection des k meilleures par élagage MaxScore:
+les documents qui ne peuvent plus entrer dans le top-k ne sont pas entièrement évalués.
+La variante BM25F pondère séparément les champs d'une ligne (désignation, libellés hérités,
+titres de chapitre et de section).
+"""
+
+import heapq
+import math
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from normalisation import mots_normalises, radical
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Champs BM25F d'une ligne du tarif: (poids, normalisation de longueur b)
+FIELD_WEIGHTS = {
+    'designation': (3.0, 0.75),
+    'parents': (1.5, 0.75),
+    'chapitre': (0.6, 0.5),
+    'section': (0.3, 0.5),
+    # Termes ajoutés à l'indexation: têtes de synonymes, mots-clés et marques des produits (synonymes.py);
+    # sa longueur dépend du nombre de produits de la position, pas de la ligne: pas de normalisation
+    'synonymes': (1.0, 0.0),
+}
+
+# Candidats évalués entre deux consultations de l'interruption de top_k (une horloge par candidat coûterait)
+STOP_CHECK_INTERVAL = 64
+
+# Mots outils (forme pliée) ignorés à l'indexation et dans les requêtes
+STOP_WORDS = frozenset({
+    'a', 'au', 'aux', 'd', 'de', 'des', 'du', 'en', 'et', 'l', 'la', 'le', 'les', 'ou', 'par',
+    'pour', 'sur', 'un', 'une', 'avec', 'sans', 'dont'
+})
+
+def tokenize(text: str) -> List[str]:
+    """Termes indexés d'un texte: radicaux des mots pliés, sans mots outils ni caractères isolés"""
+    return terms(mots_normalises(text))
+
+def terms(words: Iterable[str]) -> List[str]:
+    """Radicaux de mots déjà pliés (mémorisés), sans mots outils ni caractères isolés"""
+    return [radical(word) for word in words if len(word) > 1 and word not in STOP_WORDS]
+
+class LexicalIndex:
+    """Listes de postings triées par document, avec l'impact BM25 de chaque posting précalculé"""
+
+    def __init__(self, documents: Iterable[str], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.build(self.pseudo_frequencies(documents))
+
+    def pseudo_frequencies(self, documents: Iterable[str]) -> List[Dict[str, float]]:
+        """Fréquences des termes de chaque document, normalisées par la longueur du document"""
+        term_frequencies = [Counter(tokenize(document)) for document in documents]
+        lengths = [sum(frequencies.values()) for frequencies in term_frequencies]
+        average_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        return [{term: frequency / (1 - self.b + self.b * length / average_length)
+                 for term, frequency in frequencies.items()}
+                for frequencies, length in zip(term_frequencies, lengths)]
+
+    def build(self, frequencies: List[Dict[str, float]]):
+        """Listes de postings et impacts BM25 à partir des fréquences normalisées"""
+        self.size = len(frequencies)
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for doc_id, document in enumerate(frequencies):
+            for term, frequency in document.items():
+                postings.setdefault(term, []).append((doc_id, frequency))
+
+        # Par terme: documents (croissants), impacts BM25 et impact maximal (borne supérieure)
+        k1 = self.k1
+        self.doc_ids: Dict[str, List[int]] = {}
+        self.impacts: Dict[str, List[float]] = {}
+        self.upper_bounds: Dict[str, float] = {}
+        for term, entries in postings.items():
+            idf = math.log(1 + (self.size - len(entries) + 0.5) / (len(entries) + 0.5))
+            impacts = [idf * frequency * (k1 + 1) / (frequency + k1) for _, frequency in entries]
+            self.doc_ids[term] = [doc_id for doc_id, _ in entries]
+            self.impacts[term] = impacts
+            self.upper_bounds[term] = max(impacts)
+
+    def query_terms(self, query) -> Counter:
+        """Termes indexés d'une requête (texte ou mots déjà pliés) et leur fréquence"""
+        words = tokenize(query) if isinstance(query, str) else terms(query)
+        return Counter(word for word in words if word in self.doc_ids)
+
+    def max_score(self, query) -> float:
+        """Meilleur score atteignable par la requête: somme des bornes de ses termes (0 si aucun)"""
+        return sum(weight * self.upper_bounds[term] for term, weight in self.query_terms(query).items())
+
+    def scores(self, query) -> Dict[int, float]:
+        """Score BM25 exhaustif de tous les documents contenant au moins un terme"""
+        totals: Dict[int, float] = {}
+        for term, weight in self.query_terms(query).items():
+            for doc_id, impact in zip(self.doc_ids[term], self.impacts[term]):
+                totals[doc_id] = totals.get(doc_id, 0.0) + weight * impact
+        return totals
+
+    def top_k(self, query, k: int, should_stop: Optional[Callable[[], bool]] = None) -> List[Tuple[int, float]]:
+        """Les k meilleurs documents (score décroissant, puis rang croissant), voir search"""
+        return self.search(query, k, should_stop)[0]
+
+    def search(self, query, k: int,
+               should_stop: Optional[Callable[[], bool]] = None) -> Tuple[List[Tuple[int, float]], int, bool]:
+        """
+        Les k meilleurs documents par MaxScore, le nombre de documents entièrement évalués et
+        l'interruption de la recherche (propres à l'appel: l'index est partagé entre threads)
+
+        Les termes sont triés par borne supérieure croissante; tant que la somme des bornes d'un
+        préfixe de termes ne dépasse pas le seuil du tas, ces termes ne suffisent pas à faire entrer
+        un document: seuls les autres (« essentiels ») proposent des candidats, et l'évaluation
+        d'un candidat s'arrête dès que son score plus les bornes restantes ne dépasse plus le seuil.
+        should_stop est consulté tous les STOP_CHECK_INTERVAL candidats: s'il répond vrai, les
+        meilleurs documents parmi ceux déjà évalués sont retournés, avec l'interruption.
+        """
+        weights = self.query_terms(query)
+        if k <= 0 or not weights:
+            return [], 0, False
+
+        terms = sorted(weights, key=lambda term: weights[term] * self.upper_bounds[term])
+        bounds = [weights[term] * self.upper_bounds[term] for term in terms]
+        # cumulative[i]: somme des bornes des termes 0..i-1
+        cumulative = [0.0]
+        for bound in bounds:
+            cumulative.append(cumulative[-1] + bound)
+
+        postings = [self.doc_ids[term] for term in terms]
+        impacts = [self.impacts[term] for term in terms]
+        positions = [0] * len(terms)
+        heap: List[Tuple[float, int]] = []  # (score, -doc_id): le pire résultat en tête
+        threshold = -math.inf
+        first_essential = 0
+        candidates = 0
+        scored = 0
+        interrupted = False
+
+        while True:
+            candidates += 1
+            if should_stop is not None and candidates % STOP_CHECK_INTERVAL == 0 and should_stop():
+                interrupted = True
+                break
+            # Prochain candidat: plus petit document courant des listes essentielles
+            doc_id = min((postings[i][positions[i]] for i in range(first_essential, len(terms))
+                          if positions[i] < len(postings[i])), default=None)
+            if doc_id is None:
+                break
+
+            score = 0.0
+            for i in range(first_essential, len(terms)):
+                if positions[i] < len(postings[i]) and postings[i][positions[i]] == doc_id:
+                    score += weights[terms[i]] * impacts[i][positions[i]]
+                    positions[i] += 1
+
+            # Termes non essentiels, du plus fort au plus faible, tant que le seuil reste atteignable
+            for i in range(first_essential - 1, -1, -1):
+                if score + cumulative[i + 1] <= threshold:
+                    break
+                found = bisect_left(postings[i], doc_id, positions[i])
+                positions[i] = found
+                if found < len(postings[i]) and postings[i][found] == doc_id:
+                    score += weights[terms[i]] * impacts[i][found]
+            else:
+                scored += 1
+                if len(heap) < k:
+                    heapq.heappush(heap, (score, -doc_id))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, -doc_id))
+                else:
+                    continue
+                if len(heap) == k:
+                    threshold = heap[0][0]
+                    while first_essential < len(terms) and cumulative[first_essential + 1] <= threshold:
+                        first_essential += 1
+                    if first_essential == len(terms):
+                        break
+
+        return [(-negative_id, score) for score, negative_id in sorted(heap, reverse=True)], scored, interrupted
+
+class FieldedLexicalIndex(LexicalIndex):
+    """
+    Index BM25F: chaque document est un dictionnaire champ -> texte
+
+    La fréquence d'un terme est la somme, sur les champs, de sa fréquence pondérée par le poids du
+    champ et normalisée par la longueur du champ rapportée à sa longueur moyenne. La saturation k1
+    s'applique ensuite une seule fois: un terme répété dans la désignation et les libellés hérités
+    ne compte pas deux fois plus. Tout est précalculé à l'indexation, le score d'une requête reste
+    une somme d'impacts comme pour BM25.
+    """
+
+    def __init__(self, documents: Iterable[Mapping[str, str]],
+                 fields: Mapping[str, Tuple[float, float]] = FIELD_WEIGHTS, k1: float = BM25_K1):
+        self.fields = dict(fields)
+        super().__init__(documents, k1=k1)
+
+    def pseudo_frequencies(self, documents: Iterable[Mapping[str, str]]) -> List[Dict[str, float]]:
+        documents = [[Counter(tokenize(document.get(field, ''))) for field in self.fields] for document in documents]
+        # Longueur moyenne de chaque champ sur l'ensemble des documents
+        averages = []
+        for position in range(len(self.fields)):
+            total = sum(sum(document[position].values()) for document in documents)
+            averages.append((total / len(documents)) if total else 1.0)
+
+        frequencies = []
+        for document in documents:
+            combined: Dict[str, float] = {}
+            for (weight, b), average, counts in zip(self.fields.values(), averages, document):
+                norm = 1 - b + b * sum(counts.values()) / average
+                for term, frequency in counts.items():
+                    combined[term] = combined.get(term, 0.0) + weight * frequency / norm
+            frequencies.append(combined)
+        return frequencies
+
+def top_k_exhaustive(index: LexicalIndex, query, k: int) -> List[Tuple[int, float]]:
+    """Référence sans élagage: tous les documents évalués puis triés"""
+    ranked = sorted(index.scores(query).items(), key=lambda item: (-item[1], item[0]))
+    return ranked[:k]
+
+def same_ranking(found: List[Tuple[int, float]], expected: List[Tuple[int, float]],
+                 tolerance: float = 1e-9) -> bool:
+    """
+    Même classement que la référence: mêmes scores et mêmes documents dans le même ordre, sauf entre
+    documents à égalité à tolerance près (l'ordre des additions flottantes diffère entre top_k et
+    scores et peut départager deux documents de même score). Les documents à égalité avec le
+    dernier retenu peuvent être remplacés par d'autres de même score.
+    """
+    if len(found) != len(expected):
+        return False
+    start = 0
+    while start < len(expected):
+        end = start + 1
+        while end < len(expected) and abs(expected[end][1] - expected[start][1]) <= tolerance:
+            end += 1
+        if any(abs(score - expected[start][1]) > tolerance for _, score in found[start:end]):
+            return False
+        if end < len(expected) and {doc for doc, _ in found[start:end]} != {doc for doc, _ in expected[start:end]}:
+            return False
+        start = end
+    return True
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lexique compilé du dictionnaire français: table de chaînes triée, mappée en mémoire et partagée
+entre processus (appartenance en O(longueur) par hachage, énumération par préfixe)
+"""
+
+import os
+import sys
+import mmap
+import zlib
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+from normalisation import normaliser_texte
+
+MAGIC = b'LEXQ'
+VERSION = 1
+# magic, version, nombre de mots, nombre d'alvéoles de hachage, taille des chaînes
+EN_TETE = struct.Struct('<4sIIII')
+VIDE = 0xFFFFFFFF
+
+def normaliser_mot(mot: str) -> str:
+    """Forme stockée d'un mot du dictionnaire"""
+    return mot.strip().lower()
+
+def compiler_lexique(mots: Iterable[str], fichier_lexique: str, normaliser: bool = True) -> int:
+    """
+    Écrit un lexique compilé (normaliser=False conserve les clés telles quelles)
+
+    Format (petit-boutiste): en-tête, offsets uint32[n+1] des mots triés (ordre des octets UTF-8),
+    table de hachage uint32[alvéoles] (CRC32, sondage linéaire), puis les chaînes concaténées
+
+    Returns:
+        Nombre de mots écrits
+    """
+    encodes = sorted({(normaliser_mot(mot) if normaliser else mot).encode('utf-8') for mot in mots} - {b''})
+    alveoles = 1
+    while alveoles < 2 * len(encodes):
+        alveoles *= 2
+
+    offsets = array('I', [0])
+    for mot in encodes:
+        offsets.append(offsets[-1] + len(mot))
+
+    table = array('I', [VIDE]) * alveoles
+    for index, mot in enumerate(encodes):
+        position = zlib.crc32(mot) & (alveoles - 1)
+        while table[position] != VIDE:
+            position = (position + 1) & (alveoles - 1)
+        table[position] = index
+
+    taille = offsets[-1]
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+        table.byteswap()
+
+    fichier_temporaire = fichier_lexique + '.tmp'
+    with open(fichier_temporaire, 'wb') as f:
+        f.write(EN_TETE.pack(MAGIC, VERSION, len(encodes), alveoles, taille))
+        f.write(offsets.tobytes())
+        f.write(table.tobytes())
+        f.write(b''.join(encodes))
+    os.replace(fichier_temporaire, fichier_lexique)
+    return len(encodes)
+
+def _lire_uint32(tampon, debut: int, nombre: int):
+    """Vue uint32 sur le tampon mappé (copie seulement sur une machine gros-boutiste)"""
+    vue = memoryview(tampon)[debut:debut + 4 * nombre]
+    if sys.byteorder == 'little':
+        return vue.cast('I')
+    valeurs = array('I', vue.tobytes())
+    valeurs.byteswap()
+    return valeurs
+
+class Lexique:
+    """Ensemble de mots en lecture seule sur un fichier mappé, avec ajouts en mémoire"""
+
+    def __init__(self, fichier_lexique: Optional[str]):
+        """
+        Args:
+            fichier_lexique: Fichier compilé par compiler_lexique (None: lexique vide)
+        """
+        self.fichier_lexique = fichier_lexique
+        # Mots ajoutés depuis la compilation (non persistés tant que le lexique n'est pas recompilé)
+        self.ajouts: Set[str] = set()
+        if fichier_lexique is None:
+            self.tampon, self.nombre_mots, self.alveoles = None, 0, 0
+            return
+
+        with open(fichier_lexique, 'rb') as f:
+            self.tampon = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.nombre_mots, self.alveoles, _ = EN_TETE.unpack_from(self.tampon, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Format de lexique non reconnu: {fichier_lexique}")
+
+        debut = EN_TETE.size
+        self.offsets = _lire_uint32(self.tampon, debut, self.nombre_mots + 1)
+        debut += 4 * (self.nombre_mots + 1)
+        self.table = _lire_uint32(self.tampon, debut, self.alveoles)
+        self.debut_chaines = debut + 4 * self.alveoles
+
+    def _mot_brut(self, index: int) -> bytes:
+        return self.tampon[self.debut_chaines + self.offsets[index]:self.debut_chaines + self.offsets[index + 1]]
+
+    def index_mot(self, mot: str) -> int:
+        """Rang du mot dans l'ordre trié, ou -1 s'il n'est pas compilé"""
+        if not self.alveoles:
+            return -1
+        encode = mot.encode('utf-8')
+        masque = self.alveoles - 1
+        position = zlib.crc32(encode) & masque
+        while True:
+            index = self.table[position]
+            if index == VIDE:
+                return -1
+            if self._mot_brut(index) == encode:
+                return index
+            position = (position + 1) & masque
+
+    def __contains__(self, mot: str) -> bool:
+        return mot in self.ajouts or self.index_mot(mot) >= 0
+
+    def __len__(self) -> int:
+        return self.nombre_mots + len(self.ajouts)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self.nombre_mots):
+            yield self._mot_brut(index).decode('utf-8')
+        yield from sorted(self.ajouts)
+
+    def ajouter(self, mot: str) -> None:
+        """Ajoute un mot (en mémoire)"""
+        if self.index_mot(mot) < 0:
+            self.ajouts.add(mot)
+
+    # Compatibilité avec l'ancien attribut de type set
+    add = ajouter
+
+    def mots_avec_prefixe(self, prefixe: str, limite: Optional[int] = None) -> Iterator[str]:
+        """Énumère dans l'ordre les mots commençant par le préfixe (recherche dichotomique)"""
+        prefixe_encode = prefixe.encode('utf-8')
+        cles = _VueMots(self)
+        index = bisect_left(cles, prefixe_encode)
+        trouves = 0
+        while index < self.nombre_mots and (limite is None or trouves < limite):
+            mot = self._mot_brut(index)
+            if not mot.startswith(prefixe_encode):
+                break
+            yield mot.decode('utf-8')
+            trouves += 1
+            index += 1
+        for mot in sorted(self.ajouts):
+            if mot.startswith(prefixe) and (limite is None or trouves < limite):
+                yield mot
+                trouves += 1
+
+class _VueMots:
+    """Séquence des mots compilés (octets), pour bisect"""
+
+    def __init__(self, lexique: Lexique):
+        self.lexique = lexique
+
+    def __len__(self) -> int:
+        return self.lexique.nombre_mots
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.lexique._mot_brut(index)
+
+_lexiques_ouverts: Dict[str, Lexique] = {}
+
+def charger_lexique(fichier_dictionnaire: str = "dictionnaire_francais.txt",
+                    fichier_lexique: Optional[str] = None, plier: bool = False) -> Lexique:
+    """
+    Ouvre le lexique compilé du dictionnaire, en le (re)compilant s'il est absent ou plus ancien
+    que le fichier texte. Une seule projection mémoire est partagée par processus.
+
+    Avec plier=True, le lexique contient les clés normalisées (normaliser_texte) des mots:
+    "velo" y trouve "vélo" par simple accès haché.
+
+    Returns:
+        Le lexique (vide si le dictionnaire texte et le lexique sont introuvables)
+    """
+    fichier_lexique = fichier_lexique or os.path.splitext(fichier_dictionnaire)[0] + ('.plie.lex' if plier else '.lex')
+    texte_existe = os.path.exists(fichier_dictionnaire)
+
+    if texte_existe and (not os.path.exists(fichier_lexique) or
+                         os.path.getmtime(fichier_lexique) < os.path.getmtime(fichier_dictionnaire)):
+        with open(fichier_dictionnaire, 'r', encoding='utf-8') as f:
+            compiler_lexique((normaliser_texte(mot.strip()) for mot in f) if plier else f, fichier_lexique)
+        _lexiques_ouverts.pop(os.path.abspath(fichier_lexique), None)
+    elif not os.path.exists(fichier_lexique):
+        return Lexique(None)
+
+    cle = os.path.abspath(fichier_lexique)
+    if cle not in _lexiques_ouverts:
+        _lexiques_ouverts[cle] = Lexique(fichier_lexique)
+    return _lexiques_ouverts[cle]
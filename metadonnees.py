@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métadonnées du dictionnaire intelligent en enregistrements JSON ligne par ligne, avec index des clés:
+les contextes, familles et fréquences d'un mot ne sont décodés qu'au premier accès
+"""
+
+import os
+import sys
+import json
+import mmap
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from lexique import Lexique, compiler_lexique
+
+FORMAT = "metadonnees-dictionnaire"
+VERSION = 1
+
+# Préfixes des clés: mot (contextes et fréquence), famille de mots, groupe sémantique
+PREFIXE_MOT = "m:"
+PREFIXE_FAMILLE = "f:"
+PREFIXE_GROUPE = "g:"
+
+def fichiers_metadonnees(fichier_metadata: str) -> Dict[str, str]:
+    """Fichiers du format ligne par ligne associés à un nom de fichier de métadonnées"""
+    base = os.path.splitext(fichier_metadata)[0]
+    return {'donnees': base + '.jsonl', 'cles': base + '.idx', 'offsets': base + '.off'}
+
+def ecrire_metadonnees(fichier_metadata: str, contextes: Dict[str, List[str]],
+                       familles: Dict[str, Iterable[str]], groupes: Dict[str, Iterable[str]],
+                       frequences: Dict[str, int]) -> Dict[str, str]:
+    """
+    Écrit les métadonnées: un enregistrement JSON par ligne, un lexique des clés et les offsets
+
+    Returns:
+        Les chemins des fichiers écrits
+    """
+    fichiers = fichiers_metadonnees(fichier_metadata)
+    enregistrements = {}
+    for mot in set(contextes) | set(frequences):
+        valeur = {}
+        if mot in contextes:
+            valeur['c'] = list(contextes[mot])
+        if mot in frequences:
+            valeur['n'] = frequences[mot]
+        enregistrements[PREFIXE_MOT + mot] = valeur
+    for racine, mots in familles.items():
+        enregistrements[PREFIXE_FAMILLE + racine] = sorted(mots)
+    for nom, mots in groupes.items():
+        enregistrements[PREFIXE_GROUPE + nom] = sorted(mots)
+
+    # Les lignes suivent l'ordre du lexique des clés (octets UTF-8) pour que le rang donne l'offset
+    cles = sorted(enregistrements, key=lambda cle: cle.encode('utf-8'))
+    offsets = array('Q')
+    with open(fichiers['donnees'], 'wb') as f:
+        en_tete = {'format': FORMAT, 'version': VERSION, 'contextes': len(contextes),
+                   'frequences': len(frequences), 'familles': len(familles), 'groupes': len(groupes)}
+        f.write(json.dumps(en_tete).encode('utf-8') + b'\n')
+        for cle in cles:
+            offsets.append(f.tell())
+            f.write(json.dumps([cle, enregistrements[cle]], ensure_ascii=False).encode('utf-8') + b'\n')
+
+    compiler_lexique(cles, fichiers['cles'], normaliser=False)
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    with open(fichiers['offsets'], 'wb') as f:
+        f.write(offsets.tobytes())
+    return fichiers
+
+class MetadonneesDictionnaire:
+    """Accès paresseux aux enregistrements (fichiers mappés, enregistrements décodés mémorisés)"""
+
+    def __init__(self, fichier_metadata: str):
+        fichiers = fichiers_metadonnees(fichier_metadata)
+        self.cles = Lexique(fichiers['cles'])
+        with open(fichiers['donnees'], 'rb') as f:
+            self.donnees = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(fichiers['offsets'], 'rb') as f:
+            if os.path.getsize(fichiers['offsets']) == 0:
+                self.offsets = array('Q')
+            elif sys.byteorder == 'little':
+                self.offsets = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast('Q')
+            else:
+                self.offsets = array('Q', f.read())
+                self.offsets.byteswap()
+
+        self.en_tete = json.loads(self.donnees[:self.donnees.find(b'\n')])
+        if self.en_tete.get('format') != FORMAT or self.en_tete.get('version') != VERSION:
+            raise ValueError(f"Format de métadonnées non reconnu: {fichiers['donnees']}")
+        self.decodes = {}
+
+    def enregistrement(self, cle: str):
+        """Décode (une seule fois) l'enregistrement d'une clé; None si elle est absente"""
+        if cle in self.decodes:
+            return self.decodes[cle]
+        rang = self.cles.index_mot(cle)
+        valeur = None
+        if rang >= 0:
+            debut = self.offsets[rang]
+            _, valeur = json.loads(self.donnees[debut:self.donnees.find(b'\n', debut)])
+        self.decodes[cle] = valeur
+        return valeur
+
+    def cles_avec_prefixe(self, prefixe: str) -> Iterator[str]:
+        """Énumère les clés d'un type d'enregistrement, sans préfixe"""
+        for cle in self.cles.mots_avec_prefixe(prefixe):
+            yield cle[len(prefixe):]
+
+    def contextes(self) -> 'VueMetadonnees':
+        return VueMetadonnees(self, PREFIXE_MOT, 'c', self.en_tete['contextes'])
+
+    def frequences(self) -> 'VueMetadonnees':
+        return VueMetadonnees(self, PREFIXE_MOT, 'n', self.en_tete['frequences'])
+
+    def familles(self) -> 'VueMetadonnees':
+        return VueMetadonnees(self, PREFIXE_FAMILLE, None, self.en_tete['familles'], set)
+
+    def groupes(self) -> 'VueMetadonnees':
+        return VueMetadonnees(self, PREFIXE_GROUPE, None, self.en_tete['groupes'], set)
+
+class VueMetadonnees(Mapping):
+    """Vue en lecture seule, compatible dict, sur un type d'enregistrement"""
+
+    def __init__(self, metadonnees: MetadonneesDictionnaire, prefixe: str, champ: Optional[str],
+                 taille: int, conversion=None):
+        self.metadonnees = metadonnees
+        self.prefixe = prefixe
+        self.champ = champ
+        self.taille = taille
+        self.conversion = conversion
+        self.converties = {}
+
+    def __getitem__(self, cle: str):
+        if cle in self.converties:
+            return self.converties[cle]
+        valeur = self.metadonnees.enregistrement(self.prefixe + cle)
+        if valeur is not None and self.champ is not None:
+            valeur = valeur.get(self.champ)
+        if valeur is None:
+            raise KeyError(cle)
+        if self.conversion is not None:
+            valeur = self.conversion(valeur)
+        self.converties[cle] = valeur
+        return valeur
+
+    def __iter__(self) -> Iterator[str]:
+        for cle in self.metadonnees.cles_avec_prefixe(self.prefixe):
+            if self.champ is None or cle in self:
+                yield cle
+
+    def __len__(self) -> int:
+        return self.taille
+
+def charger_metadonnees(fichier_metadata: str) -> Optional[MetadonneesDictionnaire]:
+    """Ouvre les métadonnées au format ligne par ligne si elles existent, sinon None"""
+    if not all(os.path.exists(chemin) for chemin in fichiers_metadonnees(fichier_metadata).values()):
+        return None
+    return MetadonneesDictionnaire(fichier_metadata)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chargement allégé des modèles spaCy et traitement par lots des descriptions
+"""
+
+import re
+from typing import Iterable, List
+
+import spacy
+
+# Composants jamais utilisés par les classificateurs (seuls la tokenisation et les entités nommées servent)
+UNUSED_COMPONENTS = ['tagger', 'morphologizer', 'parser', 'senter', 'attribute_ruler', 'lemmatizer']
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_N_PROCESS = 1
+
+# Mot candidat à une entité: majuscule (marque, modèle) ou mélange de lettres et de chiffres (S23, i7)
+ENTITY_CANDIDATE_PATTERN = re.compile(r'\b(?:\w*[A-ZÀ-Ý]\w*|\w*\d[^\W\d_]\w*|\w*[^\W\d_]\d\w*)\b')
+
+def load_pipeline(model_name: str = "fr_core_news_sm"):
+    """
+    Charge un modèle spaCy sans parser, lemmatiseur ni étiqueteur
+
+    Raises:
+        OSError: si le modèle n'est pas installé
+    """
+    return spacy.load(model_name, exclude=UNUSED_COMPONENTS)
+
+def has_entity_candidates(text: str) -> bool:
+    """Indique si le texte contient au moins un mot pouvant former une entité nommée"""
+    return ENTITY_CANDIDATE_PATTERN.search(text) is not None
+
+def parse(nlp, text: str, source: str = None):
+    """
+    Analyse un texte, en se limitant au tokeniseur si aucune entité n'est possible
+
+    Args:
+        nlp: Pipeline spaCy
+        text: Texte à analyser
+        source: Texte d'origine sur lequel détecter les candidats (par défaut: text)
+    """
+    if has_entity_candidates(text if source is None else source):
+        return nlp(text)
+    return nlp.make_doc(text)
+
+def parse_batch(nlp, texts: Iterable[str], sources: Iterable[str] = None,
+                batch_size: int = DEFAULT_BATCH_SIZE, n_process: int = DEFAULT_N_PROCESS) -> List:
+    """
+    Analyse une liste de textes avec nlp.pipe; les textes sans candidat ne sont que tokenisés
+
+    Returns:
+        Les Doc dans l'ordre des textes
+    """
+    texts = list(texts)
+    sources = texts if sources is None else list(sources)
+    docs = [None] * len(texts)
+
+    candidates = [i for i, source in enumerate(sources) if has_entity_candidates(source)]
+    for i, doc in zip(candidates, nlp.pipe((texts[i] for i in candidates),
+                                           batch_size=batch_size, n_process=n_process)):
+        docs[i] = doc
+
+    for i, doc in enumerate(docs):
+        if doc is None:
+            docs[i] = nlp.make_doc(texts[i])
+    return docs
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Normalisation commune des textes: minuscules, apostrophes et ligatures unifiées, accents retirés (NFKD)
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Tuple
+
+try:
+    from nltk.stem.snowball import FrenchStemmer
+except ImportError:
+    FrenchStemmer = None
+
+# Nombre maximal de textes normalisés gardés en mémoire
+TAILLE_MEMO = 65536
+
+TABLE_CARACTERES = str.maketrans({
+    '’': "'", '‘': "'", 'ʼ': "'", '´': "'", '`': "'", '′': "'",
+    'œ': 'oe', 'Œ': 'oe', 'æ': 'ae', 'Æ': 'ae'
+})
+MOT_PATTERN = re.compile(r'\w+')
+# Racinisation Snowball (français) des mots pliés; sans NLTK, singulier grossier de racine()
+RACINISEUR = FrenchStemmer() if FrenchStemmer is not None else None
+
+@lru_cache(maxsize=TAILLE_MEMO)
+def normaliser_texte(texte: str) -> str:
+    """
+    Clé pliée d'un texte: "Vélo d’Œuvre" → "velo d'oeuvre"
+
+    Le résultat est mémorisé (table bornée à TAILLE_MEMO entrées).
+    """
+    texte = texte.translate(TABLE_CARACTERES).lower()
+    decompose = unicodedata.normalize('NFKD', texte)
+    return ''.join(c for c in decompose if not unicodedata.combining(c))
+
+@lru_cache(maxsize=TAILLE_MEMO)
+def mots_normalises(texte: str) -> Tuple[str, ...]:
+    """Mots (\\w+) du texte plié, dans l'ordre"""
+    return tuple(MOT_PATTERN.findall(normaliser_texte(texte)))
+
+def racine(mot: str) -> str:
+    """Singulier grossier d'un mot plié: "fruits" -> "fruit", "volailles" -> "volaille" """
+    return mot[:-1] if len(mot) > 3 and mot[-1] in 'sx' else mot
+
+@lru_cache(maxsize=TAILLE_MEMO)
+def radical(mot: str) -> str:
+    """
+    Radical d'un mot plié, commun à l'indexation et aux requêtes: "chaussures" et "chaussure" ->
+    "chaussur", "animaux" -> "animal"
+
+    Le résultat est mémorisé (table bornée à TAILLE_MEMO entrées).
+    """
+    return RACINISEUR.stem(mot) if RACINISEUR is not None else racine(mot)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backend ONNX Runtime (CPU, quantification int8 dynamique) pour l'encodeur MiniLM multilingue
+"""
+
+import os
+import numpy as np
+from typing import List, Optional, Union
+
+DEFAULT_MODEL = 'paraphrase-multilingual-MiniLM-L12-v2'
+ENCODER_BACKEND_ENV = 'CEDEAO_ENCODER_BACKEND'
+# Répertoire des modèles exportés (par défaut: cache de l'utilisateur, jamais le répertoire courant)
+ONNX_DIR_ENV = 'CEDEAO_ONNX_DIR'
+DEFAULT_ONNX_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cedeao', 'onnx')
+
+class OnnxSentenceEncoder:
+    """Encodeur de phrases exécuté par onnxruntime, compatible avec SentenceTransformer.encode"""
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, onnx_dir: Optional[str] = None,
+                 quantize: bool = True, max_length: int = 128):
+        """
+        Args:
+            model_name: Modèle sentence-transformers à exporter
+            onnx_dir: Répertoire des modèles ONNX exportés (défaut: CEDEAO_ONNX_DIR, sinon DEFAULT_ONNX_DIR)
+            quantize: Utilise le modèle quantifié int8 (dynamique)
+            max_length: Longueur maximale des séquences
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.max_length = max_length
+        onnx_dir = onnx_dir or os.environ.get(ONNX_DIR_ENV, DEFAULT_ONNX_DIR)
+        self.model_dir = os.path.join(onnx_dir, model_name.replace('/', '_'))
+        self.model_path = os.path.join(self.model_dir, 'model_int8.onnx' if quantize else 'model.onnx')
+        # Identité de l'encodeur pour les caches d'embeddings (vecteurs propres au backend)
+        self.identity = f"{model_name}.onnx-int8" if quantize else f"{model_name}.onnx"
+
+        if not os.path.exists(self.model_path):
+            self.export(quantize)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(self.model_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def export(self, quantize: bool = True) -> None:
+        """Exporte le transformeur en ONNX (nécessite torch), puis le quantifie en int8"""
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        print(f"🔄 Export ONNX de {self.model_name}...")
+        os.makedirs(self.model_dir, exist_ok=True)
+        st_model = SentenceTransformer(self.model_name, device='cpu')
+        transformer = st_model[0].auto_model.eval()
+        tokenizer = st_model.tokenizer
+        tokenizer.save_pretrained(self.model_dir)
+
+        sample = tokenizer(["exemple de description"], return_tensors='pt')
+        names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in names}
+        dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+        fp32_path = os.path.join(self.model_dir, 'model.onnx')
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer, tuple(sample[name] for name in names), fp32_path,
+                input_names=names, output_names=['last_hidden_state'],
+                dynamic_axes=dynamic_axes, opset_version=14
+            )
+
+        if quantize:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            quantize_dynamic(fp32_path, os.path.join(self.model_dir, 'model_int8.onnx'),
+                             weight_type=QuantType.QInt8)
+        print(f"✅ Modèle ONNX exporté dans {self.model_dir}")
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Encode des phrases (mean pooling sur le masque d'attention, comme le modèle d'origine)"""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        embeddings = []
+        for start in range(0, len(sentences), batch_size):
+            batch = self.tokenizer(list(sentences[start:start + batch_size]), padding=True,
+                                   truncation=True, max_length=self.max_length, return_tensors='np')
+            inputs = {name: batch[name].astype(np.int64) for name in self.input_names if name in batch}
+            hidden = self.session.run(None, inputs)[0]
+            mask = batch['attention_mask'][..., None].astype(np.float32)
+            embeddings.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+
+        result = np.vstack(embeddings).astype(np.float32) if embeddings else np.zeros((0, 384), dtype=np.float32)
+        return result[0] if single else result
+
+def encoder_identity(encoder, model_name: str = DEFAULT_MODEL) -> str:
+    """Modèle et backend d'un encodeur chargé par load_encoder ('<modèle>.torch' pour PyTorch)"""
+    return getattr(encoder, 'identity', f"{model_name}.torch")
+
+def load_encoder(model_name: str = DEFAULT_MODEL, backend: Optional[str] = None, onnx_dir: Optional[str] = None):
+    """
+    Charge l'encodeur de phrases selon la configuration
+
+    Args:
+        model_name: Nom du modèle sentence-transformers
+        backend: 'torch' ou 'onnx' (par défaut: variable d'environnement CEDEAO_ENCODER_BACKEND, sinon 'torch')
+        onnx_dir: Répertoire des modèles ONNX exportés (voir OnnxSentenceEncoder)
+
+    Returns:
+        Un objet exposant encode(); retombe sur PyTorch si ONNX Runtime est indisponible
+    """
+    backend = (backend or os.environ.get(ENCODER_BACKEND_ENV, 'torch')).lower()
+
+    if backend == 'onnx':
+        try:
+            return OnnxSentenceEncoder(model_name, onnx_dir=onnx_dir)
+        except Exception as e:
+            print(f"⚠️ Backend ONNX indisponible ({e}), utilisation de PyTorch")
+    elif backend != 'torch':
+        print(f"⚠️ Backend d'encodeur inconnu: {backend}, utilisation de PyTorch")
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fusion de classements par rangs réciproques (RRF): chaque liste contribue 1 / (RRF_K + rang) pour
+chacun de ses éléments, sans normaliser des scores d'échelles différentes (BM25F, cosinus).
+"""
+
+import heapq
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+# Constante de lissage usuelle: atténue l'écart entre les tout premiers rangs
+RRF_K = 60
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[Hashable]], k: int = RRF_K,
+                           limit: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+    """
+    Éléments des classements (meilleur en tête) triés par score fusionné décroissant
+
+    Un élément présent plusieurs fois dans un même classement ne compte qu'à son meilleur rang.
+    À score égal, l'ordre de première apparition est conservé.
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        seen = set()
+        for rank, key in enumerate(ranking, start=1):
+            if key in seen:
+                continue
+            seen.add(key)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    order = {key: position for position, key in enumerate(scores)}
+    ranked = scores.items()
+    if limit is not None:
+        return heapq.nsmallest(limit, ranked, key=lambda item: (-item[1], order[item[0]]))
+    return sorted(ranked, key=lambda item: (-item[1], order[item[0]]))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur de pertinence du classificateur simple: textes du tarif tokenisés une seule fois
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+from normalisation import normaliser_texte
+
+# Listes de mots-clés bonifiés (l'ordre et les valeurs reproduisent calculate_relevance)
+IMPORTANT_WORDS = ['ordinateur', 'voiture', 'médicament', 'café', 'coton', 'machine', 'laptop', 'smartphone', 'téléphone', 'automobile', 'antibiotique', 'thé', 'chocolat', 't-shirt', 'vêtement', 'outil', 'savon', 'parfum']
+MATERIALS = ['coton', 'laine', 'soie', 'cuir', 'plastique', 'métal', 'bois', 'verre', 'céramique']
+FUNCTIONS = ['traitement', 'télécommunication', 'transport', 'médical', 'alimentaire', 'textile', 'mécanique', 'électrique']
+
+KEYWORD_BONUSES = [
+    (IMPORTANT_WORDS, 0.2),
+    (MATERIALS, 0.15),
+    (FUNCTIONS, 0.15)
+]
+PARTIAL_MATCH_BONUS = 0.1
+EXACT_MATCH_BONUS = 0.3
+MIN_RELEVANCE = 0.3
+
+# Mots-clés sous forme normalisée (sans accents), comparés aux textes normalisés
+FOLDED_KEYWORDS = [[normaliser_texte(word) for word in words] for words, _ in KEYWORD_BONUSES]
+
+def keyword_hits(text_folded: str) -> List[FrozenSet[int]]:
+    """Indices des mots-clés de chaque liste présents (sous-chaîne) dans le texte normalisé"""
+    return [frozenset(i for i, word in enumerate(words) if word in text_folded)
+            for words in FOLDED_KEYWORDS]
+
+class TextProfile:
+    """Forme précalculée d'un texte: clé normalisée, mots et mots-clés présents"""
+
+    __slots__ = ('folded', 'words', 'hits')
+
+    def __init__(self, text: str):
+        self.folded = normaliser_texte(text)
+        self.words = frozenset(self.folded.split())
+        self.hits = keyword_hits(self.folded)
+
+class QueryProfile:
+    """Forme précalculée d'une requête, valable pour un état donné du vocabulaire"""
+
+    __slots__ = ('folded', 'words', 'hits', 'partial_weights', 'vocabulary_size')
+
+    def __init__(self, query: str, partial_weights: Dict[str, int], vocabulary_size: int):
+        self.folded = normaliser_texte(query)
+        self.words = frozenset(self.folded.split())
+        self.hits = keyword_hits(self.folded)
+        # Nombre de mots de la requête liés à chaque mot du vocabulaire par inclusion
+        self.partial_weights = partial_weights
+        self.vocabulary_size = vocabulary_size
+
+class RelevanceEngine:
+    """Calcule la pertinence requête/texte en temps linéaire grâce à des index de sous-chaînes"""
+
+    def __init__(self, texts: Iterable[str] = ()):
+        self.profiles: Dict[str, TextProfile] = {}
+        self.vocabulary = set()
+        # Sous-chaîne → mots du vocabulaire qui la contiennent; mot → textes qui le contiennent
+        self.substring_index: Dict[str, List[str]] = {}
+        self.texts_by_word: Dict[str, List[str]] = {}
+        self.add_texts(texts)
+
+    def add_texts(self, texts: Iterable[str]) -> None:
+        """Tokenise et indexe des textes (appelé au chargement du tarif)"""
+        for text in texts:
+            self.profile(text)
+
+    def profile(self, text: str) -> TextProfile:
+        """Retourne le profil d'un texte, en l'indexant s'il est nouveau"""
+        profile = self.profiles.get(text)
+        if profile is None:
+            profile = TextProfile(text)
+            self.profiles[text] = profile
+            for word in profile.words - self.vocabulary:
+                self.index_word(word)
+            for word in profile.words:
+                self.texts_by_word.setdefault(word, []).append(text)
+        return profile
+
+    def texts_containing(self, words: Iterable[str]) -> Set[str]:
+        """Textes indexés dont la forme normalisée contient l'un des mots (normalisés) en sous-chaîne"""
+        texts = set()
+        for word in set(words):
+            for vocabulary_word in self.substring_index.get(word, ()):
+                texts.update(self.texts_by_word[vocabulary_word])
+        return texts
+
+    def index_word(self, word: str) -> None:
+        """Ajoute un mot au vocabulaire et à l'index des sous-chaînes"""
+        self.vocabulary.add(word)
+        substrings = {word[i:j] for i in range(len(word)) for j in range(i + 1, len(word) + 1)}
+        for substring in substrings:
+            self.substring_index.setdefault(substring, []).append(word)
+
+    def prepare_query(self, query: str) -> QueryProfile:
+        """Précalcule, pour une requête, le poids de correspondance partielle de chaque mot du vocabulaire"""
+        weights: Dict[str, int] = {}
+        for query_word in set(normaliser_texte(query).split()):
+            # Mots du vocabulaire contenant le mot de la requête, ou contenus dans celui-ci
+            related = set(self.substring_index.get(query_word, ()))
+            for i in range(len(query_word)):
+                for j in range(i + 1, len(query_word) + 1):
+                    if query_word[i:j] in self.vocabulary:
+                        related.add(query_word[i:j])
+            for word in related:
+                weights[word] = weights.get(word, 0) + 1
+        return QueryProfile(query, weights, len(self.vocabulary))
+
+    def relevance(self, query: QueryProfile, text: TextProfile) -> float:
+        """Pertinence d'un texte pour une requête préparée (linéaire en nombre de mots)"""
+        if not query.words:
+            return 0.0
+        if query.vocabulary_size != len(self.vocabulary):
+            # Des textes ont été indexés depuis la préparation de la requête
+            query.partial_weights = self.prepare_query(query.folded).partial_weights
+            query.vocabulary_size = len(self.vocabulary)
+
+        base_relevance = len(query.words & text.words) / len(query.words)
+
+        # Bonus pour les correspondances exactes
+        if query.folded in text.folded:
+            base_relevance += EXACT_MATCH_BONUS
+
+        # Bonus pour les mots-clés importants (les additions suivent l'ordre d'origine)
+        important_count = len(query.hits[0] & text.hits[0])
+        for _ in range(important_count):
+            base_relevance += KEYWORD_BONUSES[0][1]
+
+        # Bonus pour les correspondances partielles
+        partial_count = sum(query.partial_weights.get(word, 0) for word in text.words)
+        for _ in range(partial_count):
+            if base_relevance >= 1.0:
+                break  # Le résultat est de toute façon plafonné à 100%
+            base_relevance += PARTIAL_MATCH_BONUS
+
+        # Bonus pour les matériaux puis pour les fonctions
+        for position in (1, 2):
+            for _ in range(len(query.hits[position] & text.hits[position])):
+                base_relevance += KEYWORD_BONUSES[position][1]
+
+        # Garantir une pertinence minimale pour les correspondances trouvées
+        if base_relevance > 0:
+            base_relevance = max(base_relevance, MIN_RELEVANCE)
+
+        return min(base_relevance, 1.0)
+
+    def calculate_relevance(self, query: str, text: str) -> float:
+        """
+        Équivalent de calculate_relevance pour une paire isolée: un texte absent de l'index est
+        profilé dans un moteur éphémère (même résultat), sans faire grandir l'index
+        """
+        engine = self if text in self.profiles else RelevanceEngine([text])
+        return engine.relevance(engine.prepare_query(query), engine.profile(text))
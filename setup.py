@@ -24,8 +24,9 @@ def check_python_version():
     """Vérifie la version de Python"""
     print("🐍 Vérification de la version Python...")
     version = sys.version_info
-    if version.major < 3 or (version.major == 3 and version.minor < 8):
-        print(f"❌ Python 3.8+ requis, version actuelle: {version.major}.{version.minor}")
+    # 3.10: dataclasses à slots (@dataclass(slots=True)) des résultats et du tarif
+    if version.major < 3 or (version.major == 3 and version.minor < 10):
+        print(f"❌ Python 3.10+ requis, version actuelle: {version.major}.{version.minor}")
         return False
     print(f"✅ Python {version.major}.{version.minor}.{version.micro} - OK")
     return True
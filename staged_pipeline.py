@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Étapes de classification évaluées à la demande: chaque étape est calculée au premier accès,
+une seule fois, et n'entraîne que les étapes dont elle dépend. Un budget de temps par requête
+remplace les étapes facultatives par leur valeur de repli une fois épuisé.
+"""
+
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Niveaux de détail d'un résultat, du plus léger au plus complet
+DETAIL_CODE = 'code'            # code, confiance et correspondances
+DETAIL_ANALYSIS = 'analysis'    # + caractéristiques spaCy et analyse linguistique
+DETAIL_FULL = 'full'            # + explication et suggestions
+DETAIL_LEVELS = (DETAIL_CODE, DETAIL_ANALYSIS, DETAIL_FULL)
+
+def detail_rank(detail: str) -> int:
+    """
+    Rang d'un niveau de détail dans DETAIL_LEVELS
+
+    Raises:
+        ValueError: si le niveau est inconnu
+    """
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"Niveau de détail inconnu: {detail} (attendu: {', '.join(DETAIL_LEVELS)})")
+    return DETAIL_LEVELS.index(detail)
+
+class Budget:
+    """Temps alloué à une requête (secondes, None: illimité), décompté depuis sa création"""
+
+    def __init__(self, seconds: Optional[float] = None, clock: Callable[[], float] = time.perf_counter):
+        self.seconds = seconds
+        self.clock = clock
+        self.start = clock()
+        # Étapes sautées ou écourtées faute de temps, dans l'ordre
+        self.skipped: List[str] = []
+
+    def remaining(self) -> float:
+        if self.seconds is None:
+            return math.inf
+        return self.seconds - (self.clock() - self.start)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def skip(self, name: str) -> None:
+        if name not in self.skipped:
+            self.skipped.append(name)
+
+class StagedPipeline:
+    """
+    Graphe d'étapes nommées; une étape obtient ses dépendances par pipeline[nom]
+
+    Les étapes de fallbacks sont facultatives: si le budget est épuisé au moment de les calculer,
+    leur valeur de repli est utilisée et l'étape est notée dans budget.skipped.
+    """
+
+    def __init__(self, stages: Dict[str, Callable[['StagedPipeline'], Any]], budget: Optional[Budget] = None,
+                 fallbacks: Optional[Dict[str, Callable[[], Any]]] = None):
+        self.stages = stages
+        self.budget = budget if budget is not None else Budget()
+        self.fallbacks = fallbacks or {}
+        self.values: Dict[str, Any] = {}
+        # Étapes calculées, dans l'ordre d'évaluation
+        self.evaluated: List[str] = []
+        self.pending = set()
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self.values:
+            if name in self.pending:
+                raise ValueError(f"Dépendance circulaire sur l'étape {name}")
+            self.pending.add(name)
+            try:
+                if name in self.fallbacks and self.budget.expired():
+                    self.budget.skip(name)
+                    self.values[name] = self.fallbacks[name]()
+                else:
+                    self.values[name] = self.stages[name](self)
+            finally:
+                self.pending.discard(name)
+            self.evaluated.append(name)
+        return self.values[name]
+
+    def is_evaluated(self, name: str) -> bool:
+        return name in self.values
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synonymes et relations produit → position compilés une fois, à la construction des index: chaque
+terme (plié, au singulier, d'un à MAX_MOTS mots) renvoie directement à ses termes canoniques et aux
+entrées de la base de produits qui le citent. Les lignes du tarif sont indexées sous ces termes
+(champ 'synonymes' de lexical_index.FIELD_WEIGHTS), si bien qu'une description se développe par une
+consultation de dictionnaire par mot ou groupe de mots, sans parcourir les listes de synonymes.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from normalisation import mots_normalises, racine
+
+# Longueur maximale, en mots, d'un terme cherché dans un texte ("vélo tout terrain")
+MAX_MOTS = 3
+# Listes d'une entrée de la base de produits -> genre de correspondance (le mot-clé est 'keyword')
+GENRES = {'synonyms': 'synonym', 'brands': 'brand', 'materials': 'material', 'functions': 'function'}
+# Genres dont les termes sont ajoutés aux lignes du tarif de la position du produit
+GENRES_INDEXES = ('keyword', 'synonym', 'brand')
+
+def cle(terme: str) -> Tuple[str, ...]:
+    """Clé d'un terme: ses mots pliés au singulier ("Vélos de route" -> ('velo', 'de', 'route'))"""
+    return tuple(racine(mot) for mot in mots_normalises(terme))
+
+def cles_texte(mots: Sequence[str]) -> Iterator[Tuple[str, ...]]:
+    """Clés des groupes de 1 à MAX_MOTS mots consécutifs (mots déjà pliés)"""
+    mots = [racine(mot) for mot in mots]
+    for debut in range(len(mots)):
+        for fin in range(debut + 1, min(debut + MAX_MOTS, len(mots)) + 1):
+            yield tuple(mots[debut:fin])
+
+def position_produit(code: str) -> str:
+    """Position d'un code de la base de produits: "84.71" ou "8712.00.00" -> "87.12" """
+    chiffres = code.replace('.', '')
+    return f"{chiffres[:2]}.{chiffres[2:4]}"
+
+@dataclass(frozen=True, slots=True)
+class Relation:
+    """Terme d'une entrée de la base de produits"""
+
+    produit: str    # mot-clé de l'entrée
+    genre: str      # 'keyword', 'synonym', 'brand', 'material' ou 'function'
+    terme: str      # terme tel qu'écrit dans la base
+
+class TableSynonymes:
+    """
+    Groupes de synonymes (tête -> membres) et base de produits compilés en dictionnaires
+
+    - synonymes: mot (minuscules) -> tête et autres membres de ses groupes
+    - canoniques: clé d'un terme -> têtes des groupes qui le contiennent (pliées)
+    - relations_terme: clé d'un terme -> entrées de la base de produits qui le citent
+    - termes_position: position -> mots-clés, synonymes et marques des produits qui y sont classés
+    """
+
+    def __init__(self, groupes: Mapping[str, Iterable[str]], produits: Optional[Mapping[str, Mapping]] = None):
+        synonymes: Dict[str, Dict[str, None]] = {}
+        canoniques: Dict[Tuple[str, ...], Dict[str, None]] = {}
+        for tete, membres in groupes.items():
+            membres = list(membres)
+            synonymes.setdefault(tete, {}).update(dict.fromkeys(membres))
+            for membre in membres:
+                synonymes.setdefault(membre, {}).update(dict.fromkeys([tete] + membres))
+            tete_pliee = ' '.join(mots_normalises(tete))
+            for terme in [tete] + membres:
+                canoniques.setdefault(cle(terme), {})[tete_pliee] = None
+        self.synonymes = {mot: tuple(m for m in valeurs if m != mot) for mot, valeurs in synonymes.items()}
+        self.canoniques = {terme: tuple(tetes) for terme, tetes in canoniques.items()}
+
+        self.relations_terme: Dict[Tuple[str, ...], List[Relation]] = {}
+        termes_position: Dict[str, Dict[str, None]] = {}
+        for mot_cle, produit in (produits or {}).items():
+            termes = [('keyword', mot_cle)] + [(genre, terme) for liste, genre in GENRES.items()
+                                               for terme in produit.get(liste, [])]
+            for genre, terme in dict.fromkeys(termes):
+                self.relations_terme.setdefault(cle(terme), []).append(Relation(mot_cle, genre, terme))
+                if genre in GENRES_INDEXES:
+                    termes_position.setdefault(position_produit(produit['code']), {})[terme] = None
+        self.termes_position = {position: tuple(termes) for position, termes in termes_position.items()}
+
+    def synonymes_de(self, mot: str) -> List[str]:
+        return list(self.synonymes.get(mot.lower(), ()))
+
+    def canoniques_de(self, mots: Sequence[str]) -> List[str]:
+        """Têtes des groupes des termes d'une description (mots pliés), sans doublon"""
+        tetes: Dict[str, None] = {}
+        for terme in cles_texte(mots):
+            tetes.update(dict.fromkeys(self.canoniques.get(terme, ())))
+        return list(tetes)
+
+    def relations(self, mots: Sequence[str]) -> Dict[str, Dict[str, List[str]]]:
+        """Par mot-clé de produit puis par genre, termes de la base présents dans une description (mots pliés)"""
+        trouvees: Dict[str, Dict[str, List[str]]] = {}
+        vues = set()
+        for terme in cles_texte(mots):
+            for relation in self.relations_terme.get(terme, ()):
+                if relation not in vues:
+                    vues.add(relation)
+                    trouvees.setdefault(relation.produit, {}).setdefault(relation.genre, []).append(relation.terme)
+        return trouvees
+
+    def produits_citant(self, termes: Iterable[str]) -> FrozenSet[str]:
+        """Mots-clés des entrées de la base de produits qui citent l'un des termes (mot-clé, synonyme, marque...)"""
+        return frozenset(relation.produit for terme in termes for relation in self.relations_terme.get(cle(terme), ()))
+
+    def developpement(self, texte: str, position: str = '') -> str:
+        """
+        Termes sous lesquels une ligne du tarif est indexée en plus de son texte: têtes des groupes de
+        ses termes, puis termes des produits classés dans sa position
+        """
+        termes: Dict[str, None] = dict.fromkeys(self.canoniques_de(mots_normalises(texte)))
+        termes.update(dict.fromkeys(self.termes_position.get(position, ())))
+        return ' '.join(termes)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Structure du tarif CEDEAO lue ligne par ligne: chaque ligne N.T.S. avec sa désignation, les groupes
+à tirets et le libellé de position dont elle hérite, son chapitre, sa section et les seuils numériques
+de ces libellés (intervalles par grandeur); les Notes de section et de chapitre sont gardées en texte
+
+La lecture est un automate à une seule passe: chaque ligne est confrontée à des motifs ancrés sur
+cette seule ligne, sans retour en arrière sur le fichier, si bien que le temps est linéaire.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from intervalles import Intervalle, extraire_intervalles
+
+# Ligne N.T.S.: position si elle n'est pas subdivisée, code à 10 chiffres, tirets de niveau et
+# désignation (éventuellement sur plusieurs lignes); le dernier chiffre du code est parfois rejeté
+# au début de la ligne suivante (FIN_CODE)
+LIGNE_NTS = re.compile(r'^\s*(?:(\d{2}\.\d{2})\s+)?(\d{4}\.\d{2}\.\d{2}\.\d{1,2})(?!\d)\s*(-*)\s*(.*)$')
+FIN_CODE = re.compile(r'^\s*(\d)(?:\s+(.*))?$')
+# Colonnes finales: unité statistique, droit de douane (%), redevance statistique
+# (la redevance est parfois saisie « l » au lieu de 1)
+COLONNES = re.compile(r'\s(1000\s*(?:kWh|u)|[Kk]g|\d?u(?:\(jeu\))?|m[23²]?(?:\(\*\))?|l|1|carat|-)\s+(\d+)\s+(\d+|l)\s*$')
+LIGNE_POSITION = re.compile(r'^\s{0,8}(\d{2}\.\d{2})\s+(\S.*)$')
+LIGNE_GROUPE = re.compile(r'^\s+(-+)\s*(\S.*)$')
+# Table des matières: "SECTION IV" puis son titre, et les chapitres "22 Boissons, ..."
+TITRE_SECTION = re.compile(r'^SECTION ([IVX]+)\s*$')
+TITRE_CHAPITRE = re.compile(r'^\s*(\d{1,2})\s+(\S.*)$')
+# Titres du corps ("Section I", "Chapitre 8", y compris ceux des en-têtes de page), début et fin des Notes
+TITRE_CORPS = re.compile(r'^\s*(Section|Chapitre)\s+([IVX]+|\d+)\s*$')
+DEBUT_NOTES = re.compile(r'^Notes?\s*\.?$')
+FIN_NOTES = re.compile(r'^_{3,}$')
+# Structure attendue du Système harmonisé: 21 sections, chapitres 1 à 97 (le 77 est réservé);
+# les chapitres 98 et 99 sont réservés aux usages nationaux
+NOMBRE_SECTIONS = 21
+NOMBRE_CHAPITRES = 97
+# En-têtes et pieds de page répétés à chaque page
+# (les intitulés de colonnes « N° de position ... U.S. D.D. R.S. » sont parfois coupés sur deux lignes)
+BRUIT = re.compile(r'^\s*(?:\d+\s?F|Sections?\s+[IVX]+|Chapitre\s+\d+|\d{2}\.\d{2}(?:/\d+)?|'
+                   r'(?:N° de|position)(?:\s+(?:N\.T\.S\.|Désignation des marchandises|po-|[A-Z.]{1,4}))*|'
+                   r'N\.T\.S\..*|_+|Chapitres)\s*$')
+
+@dataclass(slots=True)
+class LigneTarif:
+    """Ligne N.T.S. du tarif et son contexte hérité"""
+
+    code: str
+    designation: str
+    niveau: int
+    position: str
+    libelle_position: str
+    groupes: Tuple[str, ...]
+    chapitre: str
+    section: str
+    unite: str
+    droit: int
+    redevance: int
+    # Seuils des libellés hérités et de la désignation (« d'un poids n'excédant pas 10 kg »)
+    intervalles: Dict[str, Intervalle] = field(default_factory=dict)
+
+    @property
+    def parents(self) -> str:
+        """Libellé de position puis groupes à tirets dont la ligne hérite"""
+        return ' '.join((self.libelle_position,) + self.groupes)
+
+@dataclass
+class Tarif:
+    """Lignes N.T.S., titres des sections et chapitres (table des matières), Notes et positions"""
+
+    lignes: List[LigneTarif]
+    sections: Dict[str, str]
+    chapitres: Dict[str, str]
+    section_chapitre: Dict[str, str]
+    # Libellé de chaque position ("08.01")
+    positions: Dict[str, str] = field(default_factory=dict)
+    # Texte des Notes (une ligne par ligne du fichier), par section et par chapitre
+    notes_sections: Dict[str, str] = field(default_factory=dict)
+    notes_chapitres: Dict[str, str] = field(default_factory=dict)
+
+    def titre_chapitre(self, chapitre: str) -> str:
+        return self.chapitres.get(chapitre, '')
+
+    def titre_section(self, section: str) -> str:
+        return self.sections.get(section, '')
+
+    def anomalies(self) -> List[str]:
+        """Écarts à la structure attendue (NOMBRE_SECTIONS sections, chapitres 1 à NOMBRE_CHAPITRES)"""
+        anomalies = []
+        if len(self.sections) != NOMBRE_SECTIONS:
+            anomalies.append(f"{len(self.sections)} sections au lieu de {NOMBRE_SECTIONS}")
+        manquants = [f"{numero:02d}" for numero in range(1, NOMBRE_CHAPITRES + 1) if f"{numero:02d}" not in self.chapitres]
+        if manquants:
+            anomalies.append(f"chapitres manquants: {', '.join(manquants)}")
+        sans_section = sorted(set(self.chapitres) - set(self.section_chapitre))
+        if sans_section:
+            anomalies.append(f"chapitres sans section: {', '.join(sans_section)}")
+        hors_table = sorted({ligne.chapitre for ligne in self.lignes} - set(self.chapitres))
+        if hors_table:
+            anomalies.append(f"lignes N.T.S. de chapitres absents de la table: {', '.join(hors_table)}")
+        return anomalies
+
+    def champs(self, ligne: LigneTarif) -> Dict[str, str]:
+        """Champs indexés d'une ligne (voir lexical_index.FIELD_WEIGHTS)"""
+        return {
+            'designation': ligne.designation,
+            'parents': ligne.parents,
+            'chapitre': self.titre_chapitre(ligne.chapitre),
+            'section': self.titre_section(ligne.section),
+        }
+
+def _nettoyer(texte: str) -> str:
+    """Désignation sans tirets, deux-points final ni espaces multiples"""
+    return re.sub(r'\s+', ' ', texte).strip().rstrip(':').strip()
+
+def analyser_tarif(contenu: str) -> Tarif:
+    """Lit le tarif en une passe: table des matières, puis positions, groupes et lignes N.T.S."""
+    sections: Dict[str, str] = {}
+    chapitres: Dict[str, str] = {}
+    section_chapitre: Dict[str, str] = {}
+    lignes: List[LigneTarif] = []
+    positions: Dict[str, List[str]] = {}
+
+    section_courante = None
+    titre_en_cours: Optional[List[str]] = None
+    chapitre_en_cours: Optional[str] = None
+
+    position, libelle_position = '', []
+    groupes: List[Tuple[int, List[str]]] = []
+    # Élément en cours de lecture: ('position'|'groupe'|'nts', données)
+    en_cours = None
+    # Dernier titre du corps lu (les en-têtes de page précèdent toujours le vrai titre) et Notes en cours
+    titre_corps: Optional[Tuple[str, str]] = None
+    notes: Dict[Tuple[str, str], List[str]] = {}
+    notes_en_cours: Optional[List[str]] = None
+
+    for ligne in contenu.splitlines():
+        ligne = ligne.replace('\x0c', '')
+        texte = ligne.strip()
+
+        # Notes de section ou de chapitre: du titre « Notes. » au trait de soulignement
+        if notes_en_cours is not None:
+            if FIN_NOTES.match(texte):
+                notes_en_cours = None
+                continue
+            if not LIGNE_NTS.match(ligne):
+                if texte and not BRUIT.match(ligne):
+                    notes_en_cours.append(texte)
+                continue
+            # Trait absent: la première ligne N.T.S. termine les Notes
+            notes_en_cours = None
+        correspondance = TITRE_CORPS.match(ligne)
+        if correspondance and section_courante is None:
+            genre, numero = correspondance.groups()
+            titre_corps = (genre, numero if genre == 'Section' else numero.zfill(2))
+        elif titre_corps and DEBUT_NOTES.match(texte):
+            notes_en_cours = notes.setdefault(titre_corps, [])
+            continue
+
+        # Table des matières (avant le corps du tarif: tant qu'aucune ligne N.T.S. n'a été lue)
+        if section_courante is not None and (texte.startswith('REGLES') or BRUIT.match(ligne)):
+            if texte.startswith('REGLES'):
+                section_courante = None
+            continue
+        if not lignes and en_cours is None:
+            correspondance = TITRE_SECTION.match(texte)
+            if correspondance:
+                section_courante = correspondance.group(1)
+                titre_en_cours, chapitre_en_cours = [], None
+                sections[section_courante] = ''
+                continue
+            if section_courante and titre_en_cours is not None:
+                if texte and not TITRE_CHAPITRE.match(ligne) and not texte.startswith('Note'):
+                    titre_en_cours.append(texte)
+                    continue
+                if titre_en_cours:
+                    sections[section_courante] = _nettoyer(' '.join(titre_en_cours))
+                    titre_en_cours = None
+            if section_courante and titre_en_cours is None:
+                correspondance = TITRE_CHAPITRE.match(ligne)
+                if correspondance and not LIGNE_POSITION.match(ligne):
+                    chapitre_en_cours = correspondance.group(1).zfill(2)
+                    chapitres[chapitre_en_cours] = _nettoyer(correspondance.group(2))
+                    section_chapitre[chapitre_en_cours] = section_courante
+                    continue
+                if chapitre_en_cours and texte and ligne.startswith(' ') and not texte.startswith('Note'):
+                    chapitres[chapitre_en_cours] = _nettoyer(chapitres[chapitre_en_cours] + ' ' + texte)
+                    continue
+
+        if not texte or BRUIT.match(ligne):
+            # Une ligne blanche termine les libellés de position et de groupe, pas une ligne N.T.S.
+            if not texte and en_cours is not None and en_cours[0] != 'nts':
+                en_cours = None
+            continue
+
+        correspondance = LIGNE_NTS.match(ligne)
+        fin_code = (FIN_CODE.match(ligne) if en_cours is not None and en_cours[0] == 'nts'
+                    and len(en_cours[1]['code']) < 13 else None)
+        if fin_code:
+            en_cours[1]['code'] += fin_code.group(1)
+            en_cours[1]['texte'].append(fin_code.group(2) or '')
+        elif correspondance:
+            position_seule, code, tirets, reste = correspondance.groups()
+            niveau = len(tirets)
+            if position_seule:
+                # Position non subdivisée: son libellé est celui de la ligne
+                position, libelle_position, groupes = position_seule, [], []
+                positions.setdefault(position, [])
+            groupes = [(n, g) for n, g in groupes if n < niveau]
+            en_cours = ('nts', {'code': code, 'niveau': niveau, 'texte': [reste]})
+        else:
+            correspondance = LIGNE_POSITION.match(ligne)
+            if correspondance and not COLONNES.search(ligne):
+                position, libelle_position = correspondance.group(1), [correspondance.group(2)]
+                positions[position] = libelle_position
+                groupes = []
+                en_cours = ('position', libelle_position)
+                continue
+            correspondance = LIGNE_GROUPE.match(ligne)
+            if correspondance and position:
+                niveau = len(correspondance.group(1))
+                groupes = [(n, g) for n, g in groupes if n < niveau]
+                texte_groupe = [correspondance.group(2)]
+                groupes.append((niveau, texte_groupe))
+                en_cours = ('groupe', texte_groupe)
+                if texte.endswith(':'):
+                    en_cours = None
+                continue
+            if en_cours is None:
+                continue
+            # Suite d'un libellé sur plusieurs lignes
+            if en_cours[0] == 'nts':
+                en_cours[1]['texte'].append(texte)
+            else:
+                en_cours[1].append(texte)
+                if en_cours[0] == 'groupe' and texte.endswith(':'):
+                    en_cours = None
+                continue
+
+        # Ligne N.T.S. complète quand les colonnes unité / droit / redevance sont atteintes
+        # (cherchées dans les deux dernières lignes lues, les colonnes pouvant être coupées, et non
+        # dans tout le libellé accumulé)
+        donnees = en_cours[1]
+        fin = ' ' + ' '.join(donnees['texte'][-2:])
+        colonnes = COLONNES.search(fin)
+        if colonnes and len(donnees['code']) == 13:
+            designation = _nettoyer(' '.join(donnees['texte'][:-2]) + fin[:colonnes.start()])
+            if position in positions and not positions[position]:
+                positions[position] = [designation]
+            chapitre = donnees['code'][:2]
+            libelle = _nettoyer(' '.join(libelle_position)) if position[:2] == chapitre else ''
+            textes_groupes = tuple(_nettoyer(' '.join(g)) for _, g in groupes)
+            lignes.append(LigneTarif(
+                code=donnees['code'],
+                designation=designation,
+                niveau=donnees['niveau'],
+                position=position if position[:2] == chapitre else donnees['code'][:2] + '.' + donnees['code'][2:4],
+                libelle_position=libelle,
+                groupes=textes_groupes,
+                chapitre=chapitre,
+                section=section_chapitre.get(chapitre, ''),
+                unite=colonnes.group(1),
+                droit=int(colonnes.group(2)),
+                redevance=int(colonnes.group(3).replace('l', '1')),
+                intervalles=extraire_intervalles(libelle, *textes_groupes, designation)
+            ))
+            en_cours = None
+
+    return Tarif(lignes, sections, chapitres, section_chapitre,
+                 positions={numero: _nettoyer(' '.join(libelle)) for numero, libelle in positions.items()},
+                 notes_sections={numero: '\n'.join(texte) for (genre, numero), texte in notes.items() if genre == 'Section'},
+                 notes_chapitres={numero: '\n'.join(texte) for (genre, numero), texte in notes.items() if genre == 'Chapitre'})
+
+def charger_tarif(fichier: str = "MON-TEC-CEDEAO-SH-2022-FREN-09-04-2024.txt") -> Tarif:
+    with open(fichier, 'r', encoding='utf-8') as f:
+        return analyser_tarif(f.read())
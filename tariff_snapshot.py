@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instantané du tarif CEDEAO: entrées et textes prétraités, calculés une fois par version du tarif
+"""
+
+import os
+import json
+import hashlib
+from typing import Callable, Dict, List, Optional
+
+# À incrémenter si le format ou le prétraitement du tarif change
+SNAPSHOT_VERSION = 1
+
+def tariff_fingerprint(database: Dict) -> str:
+    """Empreinte SHA-256 du contenu des sous-positions et chapitres"""
+    digest = hashlib.sha256()
+    for code, data in sorted(database.get('subheadings', {}).items()):
+        digest.update(f"S\x1f{code}\x1f{data['description']}\x1f{data.get('rate', '')}\x1e".encode('utf-8'))
+    for chapter_num, chapter_content in sorted(database.get('chapters', {}).items()):
+        digest.update(f"C\x1f{chapter_num}\x1f{chapter_content}\x1e".encode('utf-8'))
+    return digest.hexdigest()
+
+class TariffSnapshot:
+    """Entrées du tarif (sous-positions puis chapitres) et leur texte prétraité pour l'encodeur"""
+
+    FILE_NAME = "tariff_snapshot.json"
+
+    def __init__(self, fingerprint: str, entries: List[Dict], preprocessed: List[str]):
+        self.fingerprint = fingerprint
+        self.entries = entries
+        self.preprocessed = preprocessed
+
+    @classmethod
+    def build(cls, database: Dict, preprocess: Callable[[str], str],
+              fingerprint: Optional[str] = None) -> 'TariffSnapshot':
+        """Prétraite tout le tarif (seule opération coûteuse, faite une fois par version)"""
+        entries = []
+        preprocessed = []
+
+        for code, data in database.get('subheadings', {}).items():
+            entries.append({
+                'type': 'subheading',
+                'code': code,
+                'description': data['description'],
+                'rate': data.get('rate', 'À déterminer'),
+                'threshold': 0.1
+            })
+            preprocessed.append(preprocess(data['description']))
+
+        for chapter_num, chapter_content in database.get('chapters', {}).items():
+            entries.append({
+                'type': 'chapter',
+                'code': chapter_num,
+                'description': chapter_content[:300] + "...",
+                'rate': 'À déterminer selon sous-position',
+                'threshold': 0.15
+            })
+            preprocessed.append(preprocess(chapter_content))
+
+        return cls(fingerprint or tariff_fingerprint(database), entries, preprocessed)
+
+    def save(self, snapshot_dir: str) -> None:
+        """Écrit l'instantané sur disque"""
+        os.makedirs(snapshot_dir, exist_ok=True)
+        with open(os.path.join(snapshot_dir, self.FILE_NAME), 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': SNAPSHOT_VERSION,
+                'fingerprint': self.fingerprint,
+                'entries': self.entries,
+                'preprocessed': self.preprocessed
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, snapshot_dir: str, fingerprint: str) -> Optional['TariffSnapshot']:
+        """Relit l'instantané s'il correspond à la version courante du tarif, sinon None"""
+        path = os.path.join(snapshot_dir, cls.FILE_NAME)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Instantané du tarif illisible, reconstruction: {e}")
+            return None
+        if data.get('version') != SNAPSHOT_VERSION or data.get('fingerprint') != fingerprint:
+            return None
+        return cls(data['fingerprint'], data['entries'], data['preprocessed'])
+
+    @classmethod
+    def load_or_build(cls, database: Dict, preprocess: Callable[[str], str],
+                      snapshot_dir: Optional[str] = None) -> 'TariffSnapshot':
+        """Retourne l'instantané du tarif, reconstruit uniquement si le contenu a changé"""
+        fingerprint = database.get('fingerprint') or tariff_fingerprint(database)
+        snapshot = cls.load(snapshot_dir, fingerprint) if snapshot_dir else None
+        if snapshot is None:
+            snapshot = cls.build(database, preprocess, fingerprint)
+            if snapshot_dir:
+                snapshot.save(snapshot_dir)
+        return snapshot
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de l'analyse de requête partagée entre les étapes de classification
+"""
+
+import os
+import tempfile
+from analyse_requete import AnalyseRequete, analyser_requete
+from dictionnaire_utils import DictionnaireFrancais, analyser_description_douane
+
+class DictionnaireCompteur(DictionnaireFrancais):
+    """Dictionnaire qui compte les consultations de mots"""
+
+    consultations = 0
+
+    def est_mot_francais(self, mot: str) -> bool:
+        self.consultations += 1
+        return super().est_mot_francais(mot)
+
+def test_analyse_requete():
+    """Vérifie les découpages mémorisés et leur réutilisation par les analyses"""
+    print("🧪 Test de l'analyse de requête")
+    print("=" * 60)
+
+    analyse = AnalyseRequete("Sac à dos en Cuir, cuir véritable")
+    assert analyse.minuscule == "sac à dos en cuir, cuir véritable"
+    assert analyse.nombre_mots == 7
+    assert analyse.mots_nettoyes[4] == "cuir"
+    assert analyse.mots == ["sac", "à", "dos", "en", "cuir", "cuir", "véritable"]
+    assert analyse.positions[4] == (13, 17)
+    assert analyse.mots_plies == ("sac", "a", "dos", "en", "cuir", "cuir", "veritable")
+    assert analyse.ngrammes(2)[0] == ("sac", "a")
+    assert len(analyse.ngrammes(3)) == 5
+    assert analyser_requete(analyse) is analyse
+    assert str(analyse) == analyse.texte
+
+    with tempfile.TemporaryDirectory() as dossier:
+        fichier = os.path.join(dossier, "dictionnaire_francais.txt")
+        with open(fichier, "w", encoding="utf-8") as f:
+            f.write("sac\ndos\ncuir\nvéritable\n")
+        dictionnaire = DictionnaireCompteur(fichier, os.path.join(dossier, "absent.json"))
+
+        resultat = analyser_description_douane("Sac à dos en Cuir, cuir véritable", dictionnaire)
+        print(f"Consultations du dictionnaire: {dictionnaire.consultations}")
+        # Une consultation par mot distinct, au lieu de trois passes sur le texte
+        assert dictionnaire.consultations == 6
+        assert resultat["mots_francais_trouves"] == ["sac", "dos", "cuir", "cuir", "véritable"]
+        assert resultat["ratio_francais"] == 5 / 7
+
+        # Les méthodes acceptent toujours une chaîne
+        assert dictionnaire.extraire_mots_francais("un sac") == ["sac"]
+        assert dictionnaire.calculer_ratio_francais("un sac") == 0.5
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_analyse_requete()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la table des analyses de mots (calcul hors ligne, relecture, mémo des autres mots)
+"""
+
+import os
+import tempfile
+from analyses_mots import AnalyseMot, TableAnalyses, charger_analyses, empreinte_sources
+
+VOCABULAIRE = {'vélo', 'côte', 'coton'}
+
+def test_analyses_mots():
+    """Vérifie que la table est calculée une seule fois par empreinte et que les consultations suffisent"""
+    print("🧪 Test de la table des analyses de mots")
+    print("=" * 60)
+
+    calculs = []
+
+    def analyser(mot):
+        calculs.append(mot)
+        return AnalyseMot(mot, True, similaires=('velo',) if mot == 'vélo' else (),
+                          synonymes=('bicyclette',) if mot == 'vélo' else (), categories=('matériaux',) * (mot == 'coton'))
+
+    with tempfile.TemporaryDirectory() as dossier:
+        fichier = os.path.join(dossier, "mots.analyses.json")
+        empreinte = empreinte_sources(VOCABULAIRE, {'vélo': ['bicyclette']})
+        analyses = charger_analyses(VOCABULAIRE, analyser, fichier, empreinte)
+        assert sorted(calculs) == sorted(VOCABULAIRE) and os.path.exists(fichier)
+
+        # Relecture sans recalcul; une autre empreinte (synonymes modifiés) force le recalcul
+        assert charger_analyses(VOCABULAIRE, analyser, fichier, empreinte) == analyses and len(calculs) == 3
+        charger_analyses(VOCABULAIRE, analyser, fichier, empreinte_sources(VOCABULAIRE, {}))
+        assert len(calculs) == 6
+
+    table = TableAnalyses(analyses, {'velo': 'vélo', 'cote': 'côte', 'coton': 'coton'}, {'maison', 'cote'},
+                          taille_memo=2)
+    velo = table.analyse('vélo')
+    print(f"vélo: {velo}")
+    assert velo.enrichi and velo.synonymes == ('bicyclette',)
+    # Forme sans accent: analyse du mot du vocabulaire; mot du seul lexique; mot inconnu
+    assert table.analyse('velo') is velo
+    assert table.analyse('maison') == AnalyseMot('maison', False)
+    assert table.analyse('xyzzy') is None
+
+    # Le mémo des mots hors table est borné
+    for mot in ['maison', 'velo', 'maison', 'xyzzy']:
+        table.analyse(mot)
+    informations = table.hors_table.cache_info()
+    assert informations.maxsize == 2 and informations.currsize == 2 and informations.hits >= 1
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_analyses_mots()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la cascade de classification (moteur le moins coûteux d'abord, escalade sous les seuils)
+"""
+
+import spacy
+from app_advanced import AdvancedCEDEAOClassifier
+from cascade import ClassificationCascade, Tier, build_cascade, margin_of
+from classification_result import ClassificationResult, Match
+
+class SimpleEngine:
+    def search_product(self, description):
+        if 'ordinateur' in description:
+            return [{'code': '84.71', 'relevance': 0.9}, {'code': '8471.30.10.00', 'relevance': 0.8}]
+        return [{'code': '42', 'relevance': 1.0}, {'code': '34', 'relevance': 1.0}]
+
+class AdvancedEngine:
+    calls = 0
+
+    def classify_product(self, description, detail='full'):
+        self.calls += 1
+        if 'ballon' in description:
+            return ClassificationResult(None, [], 0.0, is_ambiguous=True)
+        match = Match('subheading', '3401.11.10.00', 'Savons', '10%', 0.8)
+        return ClassificationResult(match, [match], 0.8)
+
+class TransformerEngine:
+    def classify_product(self, description, database):
+        return [{'code': '9506.62.00.00', 'final_score': 0.4}]
+
+def test_cascade():
+    """Vérifie l'acceptation par étage, l'escalade et les parts résolues"""
+    print("🧪 Test de la cascade de classification")
+    print("=" * 60)
+
+    # Un code qui précise le premier ne le concurrence pas
+    assert margin_of([('84.71', 0.9), ('8471.30.10.00', 0.8), ('85.17', 0.5)]) == 0.9 - 0.5
+    assert margin_of([('42', 1.0), ('34', 1.0)]) == 0.0 and margin_of([]) == 0.0
+
+    advanced = AdvancedEngine()
+    cascade = build_cascade(SimpleEngine(), advanced, TransformerEngine(), database={})
+    assert [tier.name for tier in cascade.tiers] == ['simple', 'advanced', 'transformer']
+
+    result = cascade.classify("ordinateur portable")
+    print(f"Facile: {result.tier} {result.code} ({result.confidence:.2f}, avance {result.margin:.2f})")
+    assert result.tier == 'simple' and result.code == '84.71' and advanced.calls == 0
+
+    # Égalité au premier étage: escalade vers le classificateur avancé
+    result = cascade.classify("savon de toilette")
+    assert result.tier == 'advanced' and result.code == '3401.11.10.00'
+    assert [(attempt.tier, attempt.accepted) for attempt in result.attempts] == [('simple', False), ('advanced', True)]
+
+    # Description ambiguë pour le classificateur avancé: le dernier étage répond toujours
+    result = cascade.classify("ballon")
+    assert result.tier == 'transformer' and result.code == '9506.62.00.00' and len(result.attempts) == 3
+    assert result.seconds >= 0
+    assert cascade.stats() == {'simple': 1 / 3, 'advanced': 1 / 3, 'transformer': 1 / 3}
+
+    # Seuils configurables: un premier étage exigeant n'accepte plus rien
+    strict = build_cascade(SimpleEngine(), AdvancedEngine(), thresholds={'simple': (0.95, 0.0)})
+    assert strict.classify("ordinateur").tier == 'advanced'
+    assert ClassificationCascade([Tier('seul', lambda d: [], lambda r: [], 1.0, 1.0)]).classify("x").code is None
+
+    print("✅ Test terminé!")
+
+def test_cascade_tarif():
+    """Vérifie les seuils par défaut de l'étage avancé sur le tarif réel"""
+    print("🧪 Test de la cascade sur le tarif")
+    print("=" * 60)
+
+    advanced = AdvancedCEDEAOClassifier(nlp=spacy.blank('fr'))
+    cascade = build_cascade(advanced=advanced, transformer=TransformerEngine(), database={})
+
+    # Produit cité: le classificateur avancé répond
+    result = cascade.classify("Café en grains arabica torréfié")
+    assert result.tier == 'advanced' and result.code == '09.01'
+
+    # Descriptions hors vocabulaire: la meilleure ligne BM25F ne couvre qu'une partie de la requête,
+    # ou ne devance pas ses concurrentes, et la description passe aux embeddings
+    for description in ["couleur noir taille moyenne", "lot de pièces détachées"]:
+        result = cascade.classify(description)
+        advanced_attempt = result.attempts[0]
+        print(f"{description}: {result.tier} (avancé: {advanced_attempt.confidence:.2f}, "
+              f"avance {advanced_attempt.margin:.2f})")
+        assert result.tier == 'transformer' and not advanced_attempt.accepted
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_cascade()
+    test_cascade_tarif()
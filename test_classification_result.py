@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test des résultats compacts du classificateur avancé et de leur sérialisation
+"""
+
+import json
+import numpy as np
+import classification_result
+from classification_result import ClassificationResult, Match, dumps
+
+def test_classification_result():
+    """Vérifie l'accès par clé, l'absence des champs non calculés et la sérialisation"""
+    print("🧪 Test des résultats compacts")
+    print("=" * 60)
+
+    produit = Match(type='product', code='8712.00.00', description='Bicyclettes', rate='20%',
+                    confidence=0.9, section='XVII', rgi_applied=True,
+                    match_details={'keyword_match': True})
+    sous_position = Match(type='subheading', code='8714.91.00', description='Cadres', rate='10%',
+                          confidence=np.float64(0.4))
+    assert not hasattr(produit, '__dict__')
+    assert produit['code'] == '8712.00.00' and produit.get('rgi_applied')
+    assert 'match_details' not in sous_position and sous_position.get('match_details', {}) == {}
+    assert sous_position.get('features') is None
+
+    features = {'materials': ['aluminium'], 'functions': [], 'brands': [], 'dimensions': [],
+                'technical_specs': []}
+    resultat = ClassificationResult(best_match=produit, all_matches=[produit, sous_position],
+                                    confidence=0.9, features=features)
+    assert resultat['best_match']['code'] == '8712.00.00'
+    assert 'features' in resultat and 'explanation' not in resultat
+    try:
+        resultat['suggestions']
+        assert False, "champ non calculé accessible"
+    except KeyError:
+        pass
+
+    # Caractéristiques présentes une seule fois, au niveau de la requête
+    donnees = json.loads(dumps(resultat))
+    print(f"Taille sérialisée: {len(dumps(resultat))} octets")
+    assert donnees['features'] == features
+    assert all('features' not in match for match in donnees['all_matches'])
+    assert donnees['all_matches'][1] == {'type': 'subheading', 'code': '8714.91.00', 'description': 'Cadres',
+                                         'rate': '10%', 'confidence': 0.4, 'rgi_applied': False}
+    assert 'explanation' not in donnees and donnees == resultat.to_dict()
+
+    # Même sortie sans orjson
+    orjson = classification_result.orjson
+    classification_result.orjson = None
+    try:
+        assert json.loads(dumps([resultat])) == [donnees]
+    finally:
+        classification_result.orjson = orjson
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_classification_result()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la correction des fautes de frappe par les trigrammes du vocabulaire du tarif
+"""
+
+import spacy
+from correction import IndexTrigrammes, distance_edition, trigrammes
+from app_advanced import AdvancedCEDEAOClassifier
+
+VOCABULAIRE = ['chaussures', 'chapeaux', 'bicyclette', 'bicyclettes', 'ordinateur', 'ordinateurs', 'cafe', 'sport',
+               'puissance', 'agissant', 'cement', 'centre', 'inter']
+
+class LanguageProcessor:
+    synonyms_database = {}
+
+def test_correction():
+    """Vérifie les termes proposés, le filtre de longueur et la correction dans la classification"""
+    print("🧪 Test de la correction par trigrammes")
+    print("=" * 60)
+
+    assert trigrammes("velo") == {'$ve', 'vel', 'elo', 'lo$'}
+
+    index = IndexTrigrammes(VOCABULAIRE)
+    for mot, attendu in [('chausurres', 'chaussures'), ('ordinatuer', 'ordinateur'), ('bicylette', 'bicyclette')]:
+        proposes = index.corriger(mot)
+        print(f"{mot} -> {proposes}")
+        assert proposes[0][0] == attendu and proposes[0][1] >= index.seuil
+    # Terme du vocabulaire, mot trop court, mot sans terme proche
+    assert index.corriger('chaussures') == () and index.corriger('caf') == () and index.corriger('xyzzy') == ()
+    # Filtre de longueur: "ordinateur" (11 trigrammes) ne peut atteindre le seuil pour "ordi" (5)
+    assert index.corriger('ordi') == ()
+    assert index.corriger.cache_info().hits == 0 and index.corriger('chausurres') and index.corriger.cache_info().hits == 1
+    # Mots proches par leurs trigrammes mais qui ne sont pas des fautes de frappe: dérivé (« puissance »),
+    # deux fautes dont la première lettre (« agissant »), deux fautes dans un mot court (« cement »)
+    assert distance_edition('ordinatuer', 'ordinateur') == 1 and distance_edition('puissant', 'puissance') == 2
+    for mot in ['puissant', 'cent']:
+        print(f"{mot} -> {index.corriger(mot)}")
+        assert index.corriger(mot) == ()
+
+    # Dans le classificateur: mot inconnu du tarif corrigé, ajouté à la requête et rapporté
+    classifier = AdvancedCEDEAOClassifier(data_file=None, nlp=spacy.blank('fr'),
+                                          language_processor=LanguageProcessor(), product_database={})
+    classifier.subheadings = {
+        '6403.19.10.00': {'description': 'Chaussures de sport', 'rate': '20%'},
+        '8712.00.10.00': {'description': 'Bicyclettes', 'rate': '10%'},
+    }
+    corrections = classifier.correct_query("Chausurres de sport")
+    assert corrections == {'chausurres': ['chaussures']}
+    # Marque de la base de produits: jamais corrigée, même à une faute d'un terme du tarif
+    classifier.subheadings['8536.50.00.00'] = {'description': 'Autres interrupteurs, inter', 'rate': '20%'}
+    assert classifier.correct_query("Intel processeur") == {'intel': ['inter']}
+    classifier.product_database = {'ordinateur': {'code': '84.71', 'brands': ['intel']}}
+    classifier.synonym_table = None
+    assert classifier.correct_query("Intel processeur") == {}
+    classifier.product_database, classifier.synonym_table = {}, None
+    matches = classifier.rank_matches("Bicylette", {'semantic_categories': {}, 'similar_words': {}}, exclusions=[])
+    assert matches and matches[0].code == '8712.00.10.00'
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_correction()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du cache des embeddings de requêtes (mémoire et disque)
+"""
+
+import tempfile
+import numpy as np
+from embedding_cache import QueryEmbeddingCache
+
+def test_embedding_cache():
+    """Vérifie l'éviction LRU, la persistance disque et les statistiques"""
+    print("🧪 Test du cache des embeddings de requêtes")
+    print("=" * 60)
+    
+    rng = np.random.default_rng(0)
+    vectors = {f"requete {i}": rng.normal(size=384).astype(np.float32) for i in range(5)}
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = QueryEmbeddingCache(max_entries=3, cache_dir=cache_dir)
+        for key, vector in vectors.items():
+            assert cache.get(key) is None
+            cache.put(key, vector)
+        
+        # Les 2 plus anciennes entrées sont sorties de la mémoire mais restent sur disque
+        print(f"Entrées mémoire: {cache.stats()['memory_entries']}, disque: {cache.stats()['disk_entries']}")
+        assert cache.stats()['memory_entries'] == 3
+        assert np.allclose(cache.get("requete 0"), vectors["requete 0"])
+        assert cache.stats()['disk_hits'] == 1
+        
+        # Un nouveau processus relit le niveau disque
+        restarted = QueryEmbeddingCache(max_entries=3, cache_dir=cache_dir)
+        for key, vector in vectors.items():
+            assert np.allclose(restarted.get(key), vector)
+        
+        stats = restarted.stats()
+        print(f"Après redémarrage: {stats['hits']}/{stats['lookups']} succès ({stats['hit_rate']:.0%})")
+        assert stats['hit_rate'] == 1.0
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Un répertoire par encodeur: les vecteurs ONNX ne sont pas relus par PyTorch
+        onnx = QueryEmbeddingCache(cache_dir=cache_dir, encoder='minilm.onnx-int8')
+        onnx.put("requete 0", vectors["requete 0"])
+        assert QueryEmbeddingCache(cache_dir=cache_dir, encoder='minilm.torch').get("requete 0") is None
+        
+        # Fichier de vecteurs alloué petit puis agrandi à la demande, jusqu'à la capacité maximale
+        assert onnx.disk_vectors.shape[0] == QueryEmbeddingCache.DISK_INITIAL_ROWS
+        keys = [f"produit {i}" for i in range(600)]
+        for i, key in enumerate(keys):
+            onnx.put(key, np.full(384, i, dtype=np.float32))
+        print(f"Niveau disque: {onnx.stats()['disk_entries']} entrées, {onnx.disk_vectors.shape[0]} lignes allouées")
+        assert onnx.disk_vectors.shape[0] == 4 * QueryEmbeddingCache.DISK_INITIAL_ROWS
+        restarted = QueryEmbeddingCache(max_entries=1, cache_dir=cache_dir, encoder='minilm.onnx-int8')
+        assert np.allclose(restarted.get("requete 0"), vectors["requete 0"])
+        assert all(restarted.get(key)[0] == i for i, key in enumerate(keys))
+        
+        bounded = QueryEmbeddingCache(cache_dir=cache_dir, encoder='borne', disk_max_entries=3)
+        for key in keys[:5]:
+            bounded.put(key, vectors["requete 0"])
+        assert bounded.stats()['disk_entries'] == 3 and bounded.disk_vectors.shape[0] == 3
+    
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_embedding_cache()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du stockage quantifié des embeddings (float16 / int8) face au float32
+"""
+
+import os
+import tempfile
+from unittest import mock
+import numpy as np
+from embedding_store import EMBEDDING_CACHE_ENV, EmbeddingStore
+
+def test_embedding_store():
+    """Compare les scores et le top-10 des index quantifiés au chemin float32"""
+    print("🧪 Test du stockage quantifié des embeddings")
+    print("=" * 60)
+    
+    # Embeddings synthétiques regroupés, de la taille du tarif (MiniLM: 384 dimensions)
+    rng = np.random.default_rng(42)
+    centers = rng.normal(size=(200, 384))
+    embeddings = centers[rng.integers(0, 200, size=6000)] + 0.5 * rng.normal(size=(6000, 384))
+    queries = centers[rng.integers(0, 200, size=50)] + 0.5 * rng.normal(size=(50, 384))
+    
+    reference = EmbeddingStore(embeddings, precision='float32')
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for precision in ('float16', 'int8'):
+            store = EmbeddingStore(embeddings, precision=precision, cache_dir=cache_dir, cache_key='tarif')
+            recall = []
+            max_error = 0.0
+        
+            for query in queries:
+                expected = reference.scores(query)
+                approx = store.approximate_scores(query)
+                max_error = max(max_error, float(np.abs(approx - expected).max()))
+        
+                scores = store.scores(query, rerank_k=50)
+                top_expected = set(np.argsort(-expected)[:10])
+                top_found = set(np.argsort(-scores)[:10])
+                recall.append(len(top_expected & top_found) / 10)
+        
+                # Les scores re-classés sont exacts
+                top = np.argsort(-scores)[:10]
+                assert np.allclose(scores[top], expected[top], atol=1e-5)
+        
+            ratio = store.nbytes / reference.nbytes
+            print(f"{precision}: mémoire {ratio:.0%} du float32, erreur max {max_error:.4f}, "
+                  f"rappel top-10 après re-classement {np.mean(recall):.1%}")
+            assert np.mean(recall) >= 0.99
+        
+            # Sans répertoire: copie mappée dans le répertoire par défaut, re-classement toujours fait
+            with tempfile.TemporaryDirectory() as default_dir, \
+                    mock.patch.dict(os.environ, {EMBEDDING_CACHE_ENV: default_dir}):
+                light = EmbeddingStore(embeddings, precision=precision, cache_key='tarif')
+                assert os.listdir(default_dir) == ['embeddings_tarif.float32.npy']
+                assert light.nbytes == store.nbytes < reference.nbytes
+                assert np.array_equal(light.scores(queries[0]), store.scores(queries[0]))
+                del light
+            # Répertoire non inscriptible: copie gardée en mémoire, comptée dans nbytes
+            with mock.patch.object(EmbeddingStore, '_map_full_precision', side_effect=OSError):
+                resident = EmbeddingStore(embeddings, precision=precision)
+            assert resident.nbytes == store.nbytes + reference.nbytes
+            assert np.array_equal(resident.scores(queries[0]), store.scores(queries[0]))
+        
+        # Copie pleine précision nommée par la clé: un autre tarif ne l'écrase pas
+        other = EmbeddingStore(embeddings[:10], precision='int8', cache_dir=cache_dir, cache_key='autre')
+        assert sorted(os.listdir(cache_dir)) == ['embeddings_autre.float32.npy', 'embeddings_tarif.float32.npy']
+        assert other.full_precision.shape == (10, 384) and store.full_precision.shape == (6000, 384)
+        
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_embedding_store()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test des règles d'exclusion des Notes de section et de chapitre
+"""
+
+from exclusions import TableExclusions, construire_exclusions, extraire_clauses, qualificatifs, termes_declencheurs
+from normalisation import mots_normalises
+from tarif_structure import analyser_tarif, charger_tarif
+
+NOTES_CHAPITRE = """1.- Le présent Chapitre ne comprend pas les fruits non comestibles.
+2.- Les fruits et noix réfrigérés sont assimilés aux fruits et noix frais correspondants.
+3.- Le n° 10.05 ne comprend pas le maïs doux (Chapitre 7)."""
+
+NOTES_SECTION = """1.- La présente Section ne comprend pas :
+a) les viandes;
+b) les graisses et huiles animales ou végétales (Chapitre 15);
+c) les préparations de poisson (n° 16.04), à l'exception des poissons fumés."""
+
+EXTRAIT = """
+SECTION II
+PRODUITS DU REGNE VEGETAL
+
+8 Fruits comestibles; écorces d'agrumes ou de melons.
+
+      REGLES GENERALES POUR L'INTERPRETATION DU SYSTEME HARMONISE
+
+                                                                          Chapitre 8
+Notes.
+1.- Le présent Chapitre ne comprend pas les fruits non comestibles.
+__________
+   08.01        Noix de coco, fraîches ou sèches.
+   0801.11.00.00   -- Desséchées                                        kg   20     1
+"""
+
+def test_exclusions():
+    """Vérifie la lecture des clauses, leurs déclencheurs et les chapitres qu'elles écartent"""
+    print("🧪 Test des exclusions des Notes")
+    print("=" * 60)
+
+    clauses = extraire_clauses(NOTES_CHAPITRE, 'chapitre', '08')
+    for clause in clauses:
+        print(f"{clause} -> {clause.termes} {clause.renvois}")
+    assert [(c.portee, c.cible) for c in clauses] == [('chapitre', '08'), ('position', '10.05')]
+    assert clauses[0].termes == ('fruit', 'non', 'comestible')
+    assert clauses[1].termes == ('mai', 'dou') and clauses[1].renvois == ('07',)
+
+    # Énumération: « les viandes » (un seul terme) est trop générale pour déclencher une exclusion
+    section = extraire_clauses(NOTES_SECTION, 'section', 'IV')
+    assert [c.renvois for c in section] == [('15',), ('16.04',)]
+    assert termes_declencheurs("les préparations de poisson (n° 16.04)") == ('preparation', 'poisson')
+
+    table = TableExclusions(clauses + section, {'08': 'II', '16': 'IV', '17': 'IV'})
+    assert table.declenchees(['fruits', 'comestibles']) == []
+    declenchees = table.declenchees(['fruits', 'secs', 'non', 'comestibles'])
+    assert declenchees == [clauses[0]]
+    assert table.portee_exclue(declenchees) == (frozenset({'08'}), frozenset())
+    assert table.portee_exclue(table.declenchees(['preparations', 'poisson'])) == (frozenset({'16', '17'}), frozenset())
+    assert table.portee_exclue(table.declenchees(['mais', 'doux'])) == (frozenset(), frozenset({'10.05'}))
+
+    # Renvois qualifiants (« des n°s », « du Chapitre ») et renvois entre parenthèses
+    assert qualificatifs("les articles en matières textiles des n°s 42.01 ou 42.02") == ('42.01', '42.02')
+    assert qualificatifs("les chaussures et leurs parties, du Chapitre 64") == ('64',)
+    assert qualificatifs("le maïs doux (Chapitre 7)") == ()
+    assert qualificatifs("les préparations, autres que les produits décrits aux n°s 21.03 ou 21.04") == ()
+
+    # Les Notes sont lues avec le tarif, sans perturber les lignes N.T.S.
+    tarif = analyser_tarif(EXTRAIT)
+    assert tarif.notes_chapitres == {'08': "1.- Le présent Chapitre ne comprend pas les fruits non comestibles."}
+    assert [ligne.code for ligne in tarif.lignes] == ['0801.11.00.00']
+
+    print("✅ Test terminé!")
+
+def test_exclusions_tarif():
+    """Vérifie sur les Notes du tarif que les qualificatifs et les libellés des chapitres évitent les faux positifs"""
+    print("🧪 Test des exclusions sur les Notes du tarif")
+    print("=" * 60)
+
+    table = construire_exclusions(charger_tarif())
+
+    def portee(description):
+        mots = mots_normalises(description)
+        return table.portee_exclue(table.declenchees(mots), mots)
+
+    # « des n°s 42.01 ou 42.02 » (sellerie, sacs) ne décrit pas une chemise: la Section XI n'est pas visée
+    assert table.declenchees(mots_normalises("chemise en matière textile")) == []
+    # « du n° 04.05 » (beurre) et « contenant ... de viande, de poisson » ne qualifient pas ces préparations
+    assert table.declenchees(mots_normalises("préparation alimentaire pour nourrissons")) == []
+    # Les termes d'une clause ne protègent pas sa cible: « fruits non comestibles » vise le Chapitre 8
+    # bien que ses lignes parlent de fruits
+    chapitres, positions = portee("fruits non comestibles")
+    assert '08' in chapitres and not positions
+    # Les Notes renvoient les chaussures et leurs parties au Chapitre 64: les chapitres 40 et 44 sont
+    # pénalisés, ceux dont les lignes mentionnent le sport (61, 62) ne le sont pas
+    chapitres, positions = portee("chaussure de sport et partie")
+    print(f"Chapitres pénalisés: {sorted(chapitres)}")
+    assert {'40', '44'} <= chapitres and not chapitres & {'61', '62', '64'} and not positions
+    # Sac à main: le n° 42.02 qualifie la règle, qui vise les chapitres de la Section XI sans sac ni main
+    chapitres, _ = portee("sac à main en matière textile")
+    assert chapitres and chapitres <= {'50', '51', '52', '53', '54', '55', '56', '57', '58', '59', '60',
+                                       '61', '62'}
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_exclusions()
+    test_exclusions_tarif()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test des seuils numériques du tarif, des mesures d'une description et de l'index d'intervalles
+"""
+
+import math
+import random
+from intervalles import (IndexIntervalles, Intervalle, Mesure, extraire_intervalles, extraire_mesures,
+                         verifier_mesures)
+
+def test_intervalles():
+    """Vérifie la lecture des seuils, la conversion des unités et les recherches dans l'index"""
+    print("🧪 Test des intervalles")
+    print("=" * 60)
+
+    assert extraire_intervalles("D'un poids n’excédant pas 185 g") == {
+        'masse': Intervalle('masse', haut=185.0, haut_inclus=True)}
+    gras = extraire_intervalles("d'une teneur en poids de matières grasses excédant 1 % mais n'excédant pas 6 %")
+    assert gras == {'pourcentage': Intervalle('pourcentage', 1.0, 6.0, False, True)}
+    assert not gras['pourcentage'].contient(1.0) and gras['pourcentage'].contient(6.0)
+    # Milliers et unité reprise du seuil suivant; seuils d'un groupe et d'une désignation combinés
+    cylindree = extraire_intervalles("D'une cylindrée excédant 1.000 mais n'excédant pas 1.500 cm³")
+    print(f"Cylindrée: {cylindree}")
+    assert cylindree == {'volume': Intervalle('volume', 1000.0, 1500.0, False, True)}
+    assert extraire_intervalles("D'un poids excédant 2 kg", "d'au plus 5.000 g") == {
+        'masse': Intervalle('masse', 2000.0, 5000.0, False, True)}
+    assert extraire_intervalles("Autres", "moins de 125 d") == {}
+
+    mesures = extraire_mesures("Portable 1.8kg, écran 15 pouces, moteur 1.8L, coton 100%, 250 g/m², 68Wh")
+    print(f"Mesures: {mesures}")
+    assert mesures == [Mesure('masse', 1800.0), Mesure('longueur', 381.0), Mesure('volume', 1800.0),
+                       Mesure('pourcentage', 100.0), Mesure('grammage', 250.0)]
+    assert extraire_mesures("Smartphone 5G, 8GB RAM") == [] and extraire_mesures("sachet de 5 g") == [Mesure('masse', 5.0)]
+    # Faux positifs: « t » isolé ou suivi d'un trait d'union, séparateur de milliers ou de décimales
+    assert extraire_mesures("lot de 100 t-shirts") == []
+    assert extraire_mesures("moteur 2 t") == []
+    assert extraire_mesures("ordinateur portable 1.500 kg") == [] and extraire_mesures("sac de 1,500 kg") == []
+    assert extraire_mesures("benne de 3 tonnes") == [Mesure('masse', 3e6)]
+
+    portable = extraire_intervalles("d'un poids n'excédant pas 10 kg")
+    assert verifier_mesures(portable, mesures) is True
+    assert verifier_mesures(portable, [Mesure('masse', 12000.0)]) is False
+    assert verifier_mesures(portable, [Mesure('masse', 12000.0), Mesure('masse', 900.0)]) is True
+    assert verifier_mesures(portable, [Mesure('volume', 5.0)]) is None
+
+    # L'index donne les mêmes documents qu'un parcours de tous les intervalles
+    generateur = random.Random(3)
+    bornes = [0.0, 1.0, 2.5, 6.0, 10.0]
+    documents = []
+    for _ in range(300):
+        bas, haut = sorted(generateur.sample(bornes + [-math.inf, math.inf], 2))
+        documents.append({'masse': Intervalle('masse', bas, haut, generateur.random() < 0.5, generateur.random() < 0.5)}
+                         if generateur.random() < 0.8 else {})
+    index = IndexIntervalles(documents)
+    for valeur in [-1.0, 0.0, 0.5, 1.0, 2.5, 4.0, 6.0, 10.0, 11.0]:
+        attendu = {doc for doc, intervalles in enumerate(documents)
+                   if 'masse' in intervalles and intervalles['masse'].contient(valeur)}
+        assert index.documents('masse', valeur) == attendu, valeur
+        for doc, intervalles in enumerate(documents):
+            assert index.verifier(doc, [Mesure('masse', valeur)]) == verifier_mesures(intervalles, [Mesure('masse', valeur)])
+    assert index.documents('volume', 1.0) == frozenset()
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_intervalles()
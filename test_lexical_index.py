@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de l'index lexical BM25 et de la sélection top-k par élagage MaxScore
+"""
+
+import random
+from lexical_index import (STOP_CHECK_INTERVAL, FieldedLexicalIndex, LexicalIndex, same_ranking, top_k_exhaustive,
+                           tokenize)
+
+def test_lexical_index():
+    """Vérifie que le top-k élagué est identique au tri exhaustif en évaluant moins de documents"""
+    print("🧪 Test de l'index lexical")
+    print("=" * 60)
+
+    # Radicaux des mots pliés: pluriels et flexions partagent leurs termes
+    assert tokenize("Café torréfié, en grains") == tokenize("cafés torréfiés en grain") == ["caf", "torref", "grain"]
+    assert tokenize("Chaussures") == tokenize("chaussure") and tokenize("animaux") == tokenize("animal")
+
+    generateur = random.Random(7)
+    vocabulaire = [f"mot{i}" for i in range(60)]
+    documents = [" ".join(generateur.choices(vocabulaire[:10] if i % 3 else vocabulaire, k=generateur.randint(2, 12)))
+                 for i in range(2000)]
+    index = LexicalIndex(documents)
+
+    elagues = 0
+    for _ in range(50):
+        requete = " ".join(generateur.sample(vocabulaire, generateur.randint(1, 8)))
+        for k in (1, 5, 20):
+            attendu = top_k_exhaustive(index, requete, k)
+            obtenu = index.top_k(requete, k)
+            # Même ordre; seuls les documents à égalité (additions flottantes dans un autre ordre) permutent
+            assert same_ranking(obtenu, attendu), (requete, k)
+            exhaustifs = index.scores(requete)
+            assert all(abs(exhaustifs[doc] - score) < 1e-9 for doc, score in obtenu)
+            if index.search(requete, k)[1] < len(index.scores(requete)):
+                elagues += 1
+    print(f"Requêtes élaguées: {elagues}/150")
+    assert elagues > 0
+
+    # Interruption: meilleurs documents parmi les premiers candidats évalués
+    interrompu, evalues, interruption = index.search("mot1 mot2 mot3", 5, should_stop=lambda: True)
+    assert interruption and 0 < evalues < STOP_CHECK_INTERVAL and len(interrompu) == 5
+    assert all(doc < 200 for doc, _ in interrompu)
+    complet, _, interruption = index.search("mot1 mot2 mot3", 5, should_stop=lambda: False)
+    assert not interruption and complet == index.top_k("mot1 mot2 mot3", 5)
+    assert index.search("inconnu", 5) == ([], 0, False)
+
+    # Égalités départagées par le rang du document; termes inconnus ignorés
+    index = LexicalIndex(["noix de coco", "noix de coco", "noix de cajou"])
+    assert [doc for doc, _ in index.top_k("Noix de coco", 2)] == [0, 1]
+    assert index.top_k("inconnu", 5) == [] and index.top_k("noix", 0) == []
+    assert same_ranking([(1, 2.0), (0, 2.0), (2, 1.0)], [(0, 2.0), (1, 2.0), (2, 1.0)])
+    assert not same_ranking([(2, 1.0), (0, 2.0)], [(0, 2.0), (2, 1.0)])
+    assert not same_ranking([(0, 2.0), (3, 1.5)], [(0, 2.0), (2, 1.0)])
+    assert [doc for doc, _ in index.top_k(("noix", "cajou"), 1)] == [2]
+    assert [doc for doc, _ in LexicalIndex(["chaussures de sport", "ballons"]).top_k("chaussure", 5)] == [0]
+
+    print("✅ Test terminé!")
+
+def test_fielded_lexical_index():
+    """Vérifie que BM25F retrouve une ligne par son libellé hérité et pondère les champs"""
+    print("🧪 Test de l'index BM25F")
+    print("=" * 60)
+
+    documents = [
+        {'designation': 'Desséchées', 'parents': 'Noix de coco', 'chapitre': 'Fruits comestibles'},
+        {'designation': 'Autres', 'parents': 'Noix de coco', 'chapitre': 'Fruits comestibles'},
+        {'designation': 'De noix de coco ou de coprah', 'parents': 'Tourteaux', 'chapitre': 'Résidus des industries alimentaires'},
+        {'designation': 'Desséchées', 'parents': 'Bananes', 'chapitre': 'Fruits comestibles'},
+    ]
+    index = FieldedLexicalIndex(documents)
+    resultats = index.top_k("noix de coco desséchées", 4)
+    print(f"Classement: {resultats}")
+    assert resultats[0][0] == 0
+    assert [doc for doc, _ in resultats] == [doc for doc, _ in top_k_exhaustive(index, "noix de coco desséchées", 4)]
+    assert 0 < resultats[0][1] <= index.max_score("noix de coco desséchées")
+
+    # Confiance rapportée au meilleur score atteignable: une ligne ne contenant qu'une partie des
+    # termes de la requête reste loin de 1, même en tête du classement
+    def confiance(requete):
+        return index.top_k(requete, 1)[0][1] / index.max_score(requete)
+    print(f"Confiance: complète {confiance('noix de coco desséchées'):.2f}, "
+          f"partielle {confiance('coco desséchées tourteaux bananes'):.2f}")
+    assert confiance('noix de coco desséchées') > 0.9
+    assert confiance('coco desséchées tourteaux bananes') < 0.6
+
+    # Un terme de la désignation pèse plus que le même terme dans le seul titre de chapitre
+    index = FieldedLexicalIndex([{'designation': 'Bananes', 'chapitre': 'Fruits'},
+                                 {'designation': 'Fruits', 'chapitre': 'Autres'}])
+    assert [doc for doc, _ in index.top_k("fruits", 2)] == [1, 0]
+
+    # Un seul champ de poids 1: BM25 classique
+    textes = ["noix de coco", "noix de cajou fraîches", "coco"]
+    simple = FieldedLexicalIndex([{'texte': texte} for texte in textes], fields={'texte': (1.0, 0.75)})
+    attendu = LexicalIndex(textes).scores("noix coco")
+    assert all(abs(score - attendu[doc]) < 1e-9 for doc, score in simple.scores("noix coco").items())
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_lexical_index()
+    test_fielded_lexical_index()
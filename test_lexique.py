@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du lexique compilé (appartenance, préfixes, ajouts, recompilation)
+"""
+
+import os
+import time
+import tempfile
+from lexique import Lexique, charger_lexique, compiler_lexique
+
+def test_lexique():
+    """Vérifie que le lexique compilé se comporte comme l'ancien ensemble de mots"""
+    print("🧪 Test du lexique compilé")
+    print("=" * 60)
+    
+    mots = ["Coton\n", "cotonnade", "côte", "ordinateur", "ordinateurs", "ordre", "vélo", "", "  voiture  "]
+    with tempfile.TemporaryDirectory() as dossier:
+        fichier_lexique = os.path.join(dossier, "mots.lex")
+        assert compiler_lexique(mots, fichier_lexique) == 8
+        lexique = Lexique(fichier_lexique)
+        
+        for mot in ["coton", "côte", "vélo", "voiture", "ordinateurs"]:
+            assert mot in lexique
+        for mot in ["coto", "ordinateurx", "", "Coton"]:
+            assert mot not in lexique
+        
+        print(f"Préfixe 'ordi': {list(lexique.mots_avec_prefixe('ordi'))}")
+        assert list(lexique.mots_avec_prefixe("ordi")) == ["ordinateur", "ordinateurs"]
+        assert list(lexique.mots_avec_prefixe("co")) == ["coton", "cotonnade"]
+        assert list(lexique.mots_avec_prefixe("cô")) == ["côte"]
+        assert list(lexique.mots_avec_prefixe("ord", limite=1)) == ["ordinateur"]
+        
+        lexique.ajouter("ordinal")
+        assert "ordinal" in lexique and len(lexique) == 9
+        assert list(lexique.mots_avec_prefixe("ordin")) == ["ordinateur", "ordinateurs", "ordinal"]
+        assert sorted(lexique) == sorted(["coton", "cotonnade", "côte", "ordinateur", "ordinateurs",
+                                          "ordre", "vélo", "voiture", "ordinal"])
+        
+        # Le lexique est recompilé quand le dictionnaire texte est plus récent
+        fichier_texte = os.path.join(dossier, "mots.txt")
+        with open(fichier_texte, "w", encoding="utf-8") as f:
+            f.write("café\nthé\n")
+        assert "thé" in charger_lexique(fichier_texte)
+        time.sleep(0.01)
+        with open(fichier_texte, "a", encoding="utf-8") as f:
+            f.write("chocolat\n")
+        os.utime(fichier_texte, (time.time() + 1, time.time() + 1))
+        assert "chocolat" in charger_lexique(fichier_texte)
+        
+        assert len(charger_lexique(os.path.join(dossier, "absent.txt"))) == 0
+    
+    # Dictionnaire du projet
+    if os.path.exists("dictionnaire_francais.txt"):
+        lexique = charger_lexique("dictionnaire_francais.txt")
+        with open("dictionnaire_francais.txt", encoding="utf-8") as f:
+            attendus = {ligne.strip().lower() for ligne in f if ligne.strip()}
+        print(f"Dictionnaire: {len(lexique)} mots, fichier compilé {os.path.getsize(lexique.fichier_lexique) / 1024:.0f} Ko")
+        assert len(lexique) == len(attendus)
+        assert all(mot in lexique for mot in attendus)
+    
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_lexique()
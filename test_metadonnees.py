@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test des métadonnées ligne par ligne indexées du dictionnaire intelligent
+"""
+
+import os
+import json
+import tempfile
+from metadonnees import charger_metadonnees, ecrire_metadonnees
+from dictionnaire_intelligent import DictionnaireIntelligent
+from dictionnaire_utils import DictionnaireFrancais
+
+def test_metadonnees():
+    """Vérifie le décodage paresseux et l'équivalence avec le chargement JSON"""
+    print("🧪 Test des métadonnées indexées")
+    print("=" * 60)
+    
+    contextes = {"ballon": ["sport", "jeu"], "cuir": ["matériau"], "vélo": ["transport", "sport"]}
+    familles = {"transport": {"transporter", "transporteur", "transport"}}
+    groupes = {"Sports": {"ballon", "raquette"}}
+    frequences = {"ballon": 5, "cuir": 3, "vélo": 4, "raquette": 1}
+    
+    with tempfile.TemporaryDirectory() as dossier:
+        fichier_texte = os.path.join(dossier, "dictionnaire_francais.txt")
+        with open(fichier_texte, "w", encoding="utf-8") as f:
+            f.write("ballon\ncuir\nvélo\nraquette\ntransport\n")
+        
+        fichier_json = os.path.join(dossier, "json", "dictionnaire_metadata.json")
+        os.makedirs(os.path.dirname(fichier_json))
+        with open(fichier_json, "w", encoding="utf-8") as f:
+            json.dump({"word_contexts": contextes,
+                       "word_families": {k: list(v) for k, v in familles.items()},
+                       "semantic_groups": {k: list(v) for k, v in groupes.items()},
+                       "frequency_scores": frequences}, f, ensure_ascii=False)
+        
+        fichier_indexe = os.path.join(dossier, "indexe", "dictionnaire_metadata.json")
+        os.makedirs(os.path.dirname(fichier_indexe))
+        ecrire_metadonnees(fichier_indexe, contextes, familles, groupes, frequences)
+        
+        metadonnees = charger_metadonnees(fichier_indexe)
+        assert charger_metadonnees(fichier_json) is None
+        assert not metadonnees.decodes
+        assert metadonnees.contextes()["vélo"] == ["transport", "sport"]
+        print(f"Enregistrements décodés après un accès: {len(metadonnees.decodes)}")
+        assert len(metadonnees.decodes) == 1
+        assert "raquette" not in metadonnees.contextes()
+        assert metadonnees.frequences()["raquette"] == 1
+        assert dict(metadonnees.groupes()) == groupes
+        
+        # Les deux formats donnent les mêmes réponses
+        reference = DictionnaireIntelligent(fichier_texte, fichier_json)
+        indexe = DictionnaireIntelligent(fichier_texte, fichier_indexe)
+        for mot in ["ballon", "cuir", "vélo", "raquette", "transporteur", "inconnu"]:
+            assert indexe.get_word_context(mot) == reference.get_word_context(mot)
+            assert indexe.get_word_frequency(mot) == reference.get_word_frequency(mot)
+            assert indexe.get_word_family(mot) == reference.get_word_family(mot)
+            assert indexe.get_semantic_group(mot) == reference.get_semantic_group(mot)
+        assert sorted(indexe.search_by_context("sport")) == sorted(reference.search_by_context("sport"))
+        
+        francais = DictionnaireFrancais(fichier_texte, fichier_indexe)
+        assert francais.obtenir_contexte_mot("Ballon") == ["sport", "jeu"]
+        assert francais.obtenir_groupe_semantique("raquette") == "Sports"
+    
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_metadonnees()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la normalisation commune (accents, apostrophes, ligatures) et des clés pliées
+"""
+
+import os
+import tempfile
+from normalisation import normaliser_texte, mots_normalises, radical, TAILLE_MEMO
+from dictionnaire_utils import DictionnaireFrancais
+
+def test_normalisation():
+    """Vérifie le pliage des textes et la reconnaissance des mots sans accents"""
+    print("🧪 Test de la normalisation")
+    print("=" * 60)
+    
+    cas = {
+        "Vélo": "velo",
+        "Œufs d’oiseaux": "oeufs d'oiseaux",
+        "CAFÉ torréfié": "cafe torrefie",
+        "ex‘æquo": "ex'aequo",
+        "ﬁbres": "fibres"
+    }
+    for texte, attendu in cas.items():
+        print(f"'{texte}' → '{normaliser_texte(texte)}'")
+        assert normaliser_texte(texte) == attendu
+    
+    assert mots_normalises("L’huile d'olive, vierge") == ("l", "huile", "d", "olive", "vierge")
+    assert normaliser_texte.cache_info().maxsize == TAILLE_MEMO
+    
+    # Radicaux partagés par l'index et les requêtes, mémorisés dans une table bornée
+    for formes in [("chaussures", "chaussure"), ("animaux", "animal"), ("torrefies", "torrefie")]:
+        assert len({radical(forme) for forme in formes}) == 1, formes
+    assert radical.cache_info().maxsize == TAILLE_MEMO
+    
+    with tempfile.TemporaryDirectory() as dossier:
+        fichier = os.path.join(dossier, "dictionnaire_francais.txt")
+        with open(fichier, "w", encoding="utf-8") as f:
+            f.write("vélo\nœuvre\ncafé\n")
+        dictionnaire = DictionnaireFrancais(fichier, os.path.join(dossier, "absent.json"))
+        for mot in ["vélo", "velo", "VELO", "oeuvre", "cafe"]:
+            assert dictionnaire.est_mot_francais(mot), mot
+        assert not dictionnaire.est_mot_francais("vel")
+        assert dictionnaire.extraire_mots_francais("Un velo et un cafe") == ["velo", "cafe"]
+    
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_normalisation()
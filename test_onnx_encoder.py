@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de parité entre l'encodeur ONNX Runtime (int8) et l'encodeur PyTorch
+"""
+
+import time
+import numpy as np
+import pytest
+
+def test_onnx_encoder_parity():
+    """Compare les embeddings ONNX et PyTorch (cosinus ≥ 0.99) et leurs latences"""
+    print("🧪 Test de parité ONNX / PyTorch de l'encodeur MiniLM")
+    print("=" * 60)
+    
+    # Test sauté (et non réussi) si un des deux backends n'est pas installé
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("torch")
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+    from onnx_encoder import OnnxSentenceEncoder, DEFAULT_MODEL
+    
+    # Modèle exporté dans CEDEAO_ONNX_DIR (sinon le cache de l'utilisateur)
+    torch_encoder = sentence_transformers.SentenceTransformer(DEFAULT_MODEL)
+    onnx_encoder = OnnxSentenceEncoder(DEFAULT_MODEL)
+    
+    sentences = [
+        "ordinateur portable processeur intel 16gb ram",
+        "Chevaux, ânes, mulets et bardots, vivants.",
+        "t-shirt coton manches courtes",
+        "Noix de coco desséchées",
+        "Machines automatiques de traitement de l'information, portatives, d'un poids n'excédant pas 10 kg",
+        "téléphone"
+    ]
+    
+    start = time.perf_counter()
+    reference = torch_encoder.encode(sentences)
+    torch_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    embeddings = onnx_encoder.encode(sentences)
+    onnx_time = time.perf_counter() - start
+    
+    cosines = np.sum(reference * embeddings, axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(embeddings, axis=1))
+    
+    print(f"Cosinus minimal: {cosines.min():.4f} (moyen: {cosines.mean():.4f})")
+    print(f"Latence PyTorch: {torch_time * 1000:.1f} ms | ONNX int8: {onnx_time * 1000:.1f} ms")
+    assert cosines.min() >= 0.99
+    
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_onnx_encoder_parity()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la fusion par rangs réciproques et de la recherche hybride (lexicale + sémantique)
+"""
+
+import zlib
+import tempfile
+import threading
+import numpy as np
+from rank_fusion import RRF_K, reciprocal_rank_fusion
+from embedding_store import EmbeddingStore
+from ai_classifier import AdvancedCEDEAOClassifier
+from app import CEDEAOClassifier
+from staged_pipeline import Budget
+
+SUBHEADINGS = {
+    '6403.19.10.00': {'description': 'Chaussures de sport en cuir', 'rate': '20%'},
+    '8712.00.10.00': {'description': 'Bicyclettes de course', 'rate': '10%'},
+    '6109.10.00.00': {'description': 'T-shirts en coton', 'rate': '20%'},
+    '0901.11.00.00': {'description': 'Café non torréfié', 'rate': '5%'},
+}
+
+class BagOfWordsEncoder:
+    """Encodeur déterministe: sac de mots haché sur 64 dimensions, qui compte les textes encodés"""
+
+    identity = 'sac-de-mots'
+    encoded_texts = 0
+
+    def encode(self, texts, batch_size=32):
+        self.encoded_texts += len(texts)
+        vectors = np.zeros((len(texts), 64), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode('utf-8')) % 64] += 1.0
+        return vectors
+
+def make_classifier():
+    """Recherche hybride sans modèle téléchargé ni fichier du tarif, au classement lexical fixe"""
+    advanced = AdvancedCEDEAOClassifier(query_cache_size=8, encoder=BagOfWordsEncoder(),
+                                        stop_words=[], tokenizer=str.split)
+    classifier = CEDEAOClassifier(data_file=None, advanced_classifier=advanced, load_models=False)
+    classifier.subheadings.update(SUBHEADINGS)
+    # Classement lexical fixe: la bicyclette devant les chaussures, puis une ligne absente de l'index
+    lexical = [('8712.00.10.00', 'Bicyclettes de course', 1.0), ('6403.19.10.00', 'Chaussures de sport en cuir', 0.8),
+               ('6403.99.00.00', 'Autres chaussures de sport', 0.5)]
+    classifier.lexical_top_k = lambda description, k, budget=None: [
+        {'type': 'subheading', 'code': code, 'description': text, 'rate': '20%', 'relevance': relevance}
+        for code, text, relevance in lexical][:k]
+    return classifier
+
+def test_rank_fusion():
+    """Vérifie la fusion RRF, le top-k des embeddings et la recherche hybride bornée par k"""
+    print("🧪 Test de la fusion par rangs réciproques")
+    print("=" * 60)
+
+    fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['b', 'd', 'b']])
+    print(f"Fusion: {fused}")
+    assert [key for key, _ in fused] == ['b', 'a', 'd', 'c']
+    assert abs(fused[0][1] - (1 / (RRF_K + 2) + 1 / (RRF_K + 1))) < 1e-12
+    # Égalité: ordre de première apparition
+    assert [key for key, _ in reciprocal_rank_fusion([['a', 'b'], ['b', 'a']], limit=1)] == ['a']
+    assert reciprocal_rank_fusion([]) == []
+
+    rng = np.random.default_rng(3)
+    embeddings, query = rng.normal(size=(300, 16)), rng.normal(size=16)
+    expected = np.argsort(-EmbeddingStore(embeddings).scores(query))[:5]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = EmbeddingStore(embeddings, precision='int8', cache_dir=cache_dir)
+        assert [doc for doc, _ in store.top_k(query, 5)] == list(expected)
+
+    classifier = make_classifier()
+    advanced = classifier.advanced_classifier
+    # Tarif encodé une fois; la requête et les seules lignes absentes de l'index le sont ensuite
+    advanced.get_tariff_index(classifier.get_database())
+    encoded = advanced.model.encoded_texts
+    rescored = []
+    rescore = advanced.rescore_candidates
+    advanced.rescore_candidates = lambda description, candidates, **options: (
+        rescored.append(len(candidates)) or rescore(description, candidates, **options))
+
+    results = classifier.search_product("Chaussures de sport en cuir noir", hybrid=True)
+    print(f"Hybride: {[(r['code'], round(r['relevance'], 3)) for r in results]}")
+    # Présentes dans les deux classements, les chaussures passent devant la bicyclette (lexicale seule)
+    assert results[0]['code'] == '6403.19.10.00'
+    assert '8712.00.10.00' in [r['code'] for r in results]
+    assert all('similarity' in r and 0 <= r['relevance'] <= 1 for r in results)
+    # Seule la liste fusionnée (au plus k candidats) passe les règles RGI
+    assert rescored == [len(results)] and len(results) <= 3 + len(SUBHEADINGS)
+    # Similarité des lignes lexicales indexées lue dans l'index: seules la requête et la ligne inconnue sont encodées
+    print(f"Textes encodés par la requête: {advanced.model.encoded_texts - encoded}")
+    assert advanced.model.encoded_texts - encoded == 2
+    bicycle = next(r for r in results if r['code'] == '8712.00.10.00')
+    query = advanced.encode_query(advanced.preprocess_text("Chaussures de sport en cuir noir"))
+    stored = advanced.model.encode([advanced.preprocess_text(SUBHEADINGS['8712.00.10.00']['description'])])[0]
+    assert abs(bicycle['similarity'] - float(EmbeddingStore(stored[None, :]).scores(query)[0])) < 1e-6
+    assert len(classifier.hybrid_search("Chaussures de sport", k=1)) == 1
+
+    # Recherche lexicale dans le thread de la requête, sémantique dans le pool propre au classificateur
+    threads = {}
+    lexical_top_k, semantic_top_k = classifier.lexical_top_k, advanced.semantic_top_k
+    classifier.lexical_top_k = lambda *args: (threads.setdefault('lexical', threading.current_thread().name)
+                                              and lexical_top_k(*args))
+    advanced.semantic_top_k = lambda *args: (threads.setdefault('semantic', threading.current_thread().name)
+                                             and semantic_top_k(*args))
+    classifier.hybrid_search("Chaussures de sport")
+    classifier.lexical_top_k, advanced.semantic_top_k = lexical_top_k, semantic_top_k
+    assert threads['lexical'] == threading.current_thread().name
+    assert threads['semantic'].startswith('recherche-semantique')
+    assert make_classifier().retrieval_pool is not classifier.retrieval_pool
+
+    # Budget épuisé: ni la requête ni la ligne inconnue ne sont encodées, pas de règles RGI; le
+    # classement lexical seul reste, et la recherche avancée se replie sur la méthode de base
+    encoded = advanced.model.encoded_texts
+    budget = Budget(0)
+    results = classifier.search_product("Bicyclettes de course rouges", hybrid=True, budget=budget)
+    print(f"Budget épuisé: {[r['code'] for r in results]}, étapes sautées {budget.skipped}")
+    assert advanced.model.encoded_texts == encoded
+    assert [r['code'] for r in results] == ['8712.00.10.00', '6403.19.10.00', '6403.99.00.00']
+    assert {'encode_query', 'rgi_rules'} <= set(budget.skipped)
+    results = classifier.search_product("Bicyclettes de course rouges", budget=0)
+    assert advanced.model.encoded_texts == encoded and results[0]['code'] == '8712.00.10.00'
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_rank_fusion()
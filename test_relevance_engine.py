@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du moteur de pertinence: mêmes valeurs que l'ancien calcul quadratique
+"""
+
+import time
+from app_simple import SimpleCEDEAOClassifier
+from relevance_engine import FOLDED_KEYWORDS
+from normalisation import normaliser_texte
+
+IMPORTANT_WORDS, MATERIALS, FUNCTIONS = FOLDED_KEYWORDS
+
+def reference_relevance(query: str, text: str) -> float:
+    """Ancienne implémentation de SimpleCEDEAOClassifier.calculate_relevance (textes et mots-clés normalisés)"""
+    query_words = set(query.lower().split())
+    text_words = set(text.lower().split())
+    if not query_words:
+        return 0.0
+    base_relevance = len(query_words.intersection(text_words)) / len(query_words)
+    if query.lower() in text.lower():
+        base_relevance += 0.3
+    for word in IMPORTANT_WORDS:
+        if word in query.lower() and word in text.lower():
+            base_relevance += 0.2
+    for query_word in query_words:
+        for text_word in text_words:
+            if query_word in text_word or text_word in query_word:
+                base_relevance += 0.1
+    for material in MATERIALS:
+        if material in query.lower() and material in text.lower():
+            base_relevance += 0.15
+    for function in FUNCTIONS:
+        if function in query.lower() and function in text.lower():
+            base_relevance += 0.15
+    if base_relevance > 0:
+        base_relevance = max(base_relevance, 0.3)
+    return min(base_relevance, 1.0)
+
+def test_relevance_engine():
+    """Compare le moteur à l'ancien calcul sur les requêtes de test_simple.py"""
+    print("🧪 Test du moteur de pertinence")
+    print("=" * 60)
+    
+    classifier = SimpleCEDEAOClassifier()
+    engine = classifier.relevance_engine
+    texts = [data['description'] for data in classifier.product_database.values()]
+    texts += [data['description'] for data in classifier.subheadings.values()]
+    texts += list(classifier.chapters.values())
+    
+    queries = ["ordinateur portable", "voiture automobile", "médicament", "café", "t-shirt coton",
+               "Animaux vivants de l'espèce bovine", "machine à laver en métal", "a",
+               "velo cafe metal", "Œufs d’oiseaux"]
+    
+    reference_time = engine_time = 0.0
+    for query in queries:
+        query_lower = query.lower()
+        
+        start = time.perf_counter()
+        expected = [reference_relevance(normaliser_texte(query), normaliser_texte(text)) for text in texts]
+        reference_time += time.perf_counter() - start
+        
+        start = time.perf_counter()
+        prepared = engine.prepare_query(query_lower)
+        found = [engine.relevance(prepared, engine.profile(text)) for text in texts]
+        engine_time += time.perf_counter() - start
+        
+        mismatches = [(t, e, f) for t, e, f in zip(texts, expected, found) if e != f]
+        print(f"'{query}': {len(texts)} textes, {len(mismatches)} écart(s)")
+        assert not mismatches, mismatches[:3]
+    
+    # Accents et ligatures n'empêchent plus la correspondance
+    assert engine.calculate_relevance("velo", "Vélo de route") == engine.calculate_relevance("vélo", "Vélo de route")
+    assert classifier.search_product("cafe")[0]['code'] == classifier.search_product("café")[0]['code']
+    
+    # Paire isolée: même pertinence que l'ancien calcul, sans faire grandir l'index
+    profiles, vocabulary = len(engine.profiles), len(engine.vocabulary)
+    text = "Bicyclettes électriques pliantes, cadre carbone"
+    assert engine.calculate_relevance("velo carbone", text) == reference_relevance("velo carbone", normaliser_texte(text))
+    assert (len(engine.profiles), len(engine.vocabulary)) == (profiles, vocabulary)
+    
+    # Textes candidats par l'index: ceux qu'un parcours des sous-chaînes retiendrait
+    for query in queries:
+        words = normaliser_texte(query).split()
+        expected = {t for t in texts if any(word in engine.profile(t).folded for word in words)}
+        assert engine.texts_containing(words) == expected, query
+    
+    print(f"Ancien calcul: {reference_time * 1000:.1f} ms | moteur: {engine_time * 1000:.1f} ms")
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_relevance_engine()
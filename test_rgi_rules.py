@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de l'étape RGI vectorisée du classificateur sémantique
+"""
+
+import numpy as np
+from ai_classifier import AdvancedCEDEAOClassifier
+
+class CountingEncoder:
+    """Encodeur factice qui compte les textes encodés"""
+
+    def __init__(self):
+        self.encoded_texts = 0
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        self.encoded_texts += len(sentences)
+        return np.ones((len(sentences), 64), dtype=np.float32)
+
+def test_rgi_rules():
+    """Vérifie les scores RGI et que la similarité déjà calculée est réutilisée"""
+    print("🧪 Test de l'étape RGI vectorisée")
+    print("=" * 60)
+    
+    encoder = CountingEncoder()
+    # Sans modèle téléchargé: encodeur factice, pipeline spaCy vide, tokenisation par espaces
+    classifier = AdvancedCEDEAOClassifier(encoder=encoder, stop_words=[], tokenizer=str.split)
+    description = "T-shirt en coton et laine, coton peigné, emballage carton"
+    candidates = [
+        {'type': 'chapter', 'code': '61', 'description': 'Vêtements en bonneterie de coton et laine...', 'similarity': 0.55},
+        {'type': 'subheading', 'code': '6109.10', 'description': 'T-shirts en bonneterie de coton', 'similarity': 0.62},
+        {'type': 'subheading', 'code': '6109.90', 'description': "T-shirts d'autres matières textiles, laine", 'similarity': 0.48},
+        {'type': 'subheading', 'code': '9506.62', 'description': 'Ballons gonflables en cuir', 'similarity': 0.12}
+    ]
+    features = classifier.extract_features(description)
+    
+    results = classifier.apply_rgi_rules(description, candidates, features)
+    print(f"Textes encodés pendant l'étape RGI: {encoder.encoded_texts}")
+    assert encoder.encoded_texts == 0
+    
+    for result in results:
+        # RGI 3 (coton prépondérant) + RGI 4 (similarité) + RGI 5 (emballage) + RGI 6 (sous-position)
+        expected = (0.3 if 'coton' in result['description'].lower() else 0.0) \
+            + 0.4 * result['similarity'] + 0.2 + (0.2 if result['type'] == 'subheading' else 0.0)
+        print(f"{result['code']}: similarité {result['similarity']:.2f}, RGI {result['rgi_score']:.3f}")
+        assert abs(result['rgi_score'] - expected) < 1e-9
+    
+    assert [r['code'] for r in results] == ['6109.10', '61', '6109.90', '9506.62']
+    assert classifier.apply_rgi_rules(description, []) == []
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_rgi_rules()
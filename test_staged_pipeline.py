@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test du pipeline de classification par étapes évaluées à la demande
+"""
+
+import spacy
+from app_advanced import AdvancedCEDEAOClassifier
+from staged_pipeline import Budget, StagedPipeline, DETAIL_CODE, DETAIL_ANALYSIS
+
+class CountingLanguageProcessor:
+    """Analyse linguistique minimale qui compte ses appels"""
+
+    calls = 0
+
+    def analyze_text(self, text):
+        self.calls += 1
+        return {'words': [], 'similar_words': {}, 'synonyms': {}, 'semantic_categories': {},
+                'french_words': [], 'unknown_words': []}
+
+PRODUCTS = {
+    'vélo': {
+        'code': '8712.00.00', 'description': 'Bicyclettes et autres cycles', 'rate': '20%',
+        'section': 'XVII', 'synonyms': ['bicyclette'], 'brands': [], 'materials': ['aluminium'],
+        'functions': ['transport']
+    },
+    'café': {
+        'code': '0901.11.00', 'description': 'Café non torréfié', 'rate': '5%', 'section': 'II',
+        'synonyms': [], 'brands': [], 'materials': [], 'functions': ['boisson']
+    }
+}
+
+def build_classifier(calls):
+    """Classificateur sans tarif ni modèle spaCy, dont l'extraction des caractéristiques est comptée"""
+    classifier = AdvancedCEDEAOClassifier(data_file=None, nlp=spacy.blank('fr'),
+                                          language_processor=CountingLanguageProcessor(),
+                                          product_database=PRODUCTS)
+
+    def extract_features(text):
+        calls.append('features')
+        return {'materials': [], 'functions': [], 'brands': [], 'dimensions': [], 'technical_specs': []}
+    classifier.extract_features = extract_features
+    analyze_context = classifier.analyze_context
+
+    def counted_analyze_context(*args):
+        calls.append('context')
+        return analyze_context(*args)
+    classifier.analyze_context = counted_analyze_context
+    return classifier
+
+def test_staged_pipeline():
+    """Vérifie que seules les étapes nécessaires au niveau de détail demandé sont calculées"""
+    print("🧪 Test du pipeline par étapes")
+    print("=" * 60)
+
+    stages = StagedPipeline({'a': lambda s: 1, 'b': lambda s: s['a'] + 1, 'c': lambda s: s['c']})
+    assert stages['b'] == 2
+    assert stages.evaluated == ['a', 'b']
+    try:
+        stages['c']
+        assert False, "dépendance circulaire non détectée"
+    except ValueError:
+        pass
+
+    # Description ambiguë: ni analyse linguistique ni spaCy
+    calls = []
+    classifier = build_classifier(calls)
+    result = classifier.classify_product("truc", detail=DETAIL_CODE)
+    assert result['is_ambiguous'] and 'features' not in result
+    assert classifier.language_processor.calls == 0 and calls == []
+
+    # Niveau 'code': correspondances sans spaCy, ni explication, ni suggestions
+    result = classifier.classify_product("Vélo en aluminium pour le transport", detail=DETAIL_CODE)
+    print(f"Code: {result['best_match']['code']} ({result['confidence']:.1%})")
+    assert result['best_match']['code'] == '8712.00.00'
+    assert calls == ['context', 'context'] and 'explanation' not in result and 'suggestions' not in result
+
+    calls.clear()
+    result = classifier.classify_product("Vélo en aluminium pour le transport", detail=DETAIL_ANALYSIS)
+    assert calls == ['context', 'context', 'features'] and 'features' in result and 'explanation' not in result
+
+    # Niveau 'full' (par défaut): résultat complet, spaCy appelé une seule fois
+    calls.clear()
+    result = classifier.classify_product("Vélo en aluminium pour le transport")
+    assert calls.count('features') == 1
+    assert result['explanation'] and result['suggestions']
+    assert 'Analyse Linguistique' in result['explanation']
+    assert result['confidence'] == result['best_match']['confidence']
+
+    assert 'skipped_stages' not in result
+
+    # Budget épuisé: étapes facultatives remplacées par leur repli, correspondance toujours trouvée
+    now = [0.0]
+    budget = Budget(1.0, clock=lambda: now[0])
+    assert budget.remaining() == 1.0 and not budget.expired()
+    now[0] = 1.5
+    assert budget.expired() and Budget().remaining() == float('inf')
+    stages = StagedPipeline({'a': lambda s: 1}, budget=budget, fallbacks={'a': lambda: 0})
+    assert stages['a'] == 0 and budget.skipped == ['a']
+
+    # Dans la boucle des produits, seul le vélo (cité) est encore évalué, sans analyse contextuelle
+    calls.clear()
+    processor_calls = classifier.language_processor.calls
+    similarities = []
+    classifier.calculate_semantic_similarity = lambda *args: similarities.append(args) or 0.0
+    result = classifier.classify_product("Vélo en aluminium pour le transport", budget=0)
+    print(f"Budget épuisé: {result['best_match']['code']}, étapes sautées {result['skipped_stages']}")
+    assert result['best_match']['code'] == '8712.00.00' and len(result['all_matches']) == 1
+    assert calls == [] and similarities == [] and classifier.language_processor.calls == processor_calls
+    assert {'language_analysis', 'features', 'product_scan', 'context_analysis', 'semantic_similarity',
+            'rgi_rules', 'explanation', 'suggestions'} <= set(result['skipped_stages'])
+    assert result['explanation'] and result['suggestions'] == []
+
+    try:
+        classifier.classify_product("Vélo", detail='tout')
+        assert False, "niveau de détail inconnu accepté"
+    except ValueError:
+        pass
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_staged_pipeline()
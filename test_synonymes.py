@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test des synonymes et relations produit compilés (consultation directe, développement à l'indexation)
+"""
+
+from synonymes import TableSynonymes, cle
+
+GROUPES = {
+    'vélo': ['bicyclette', 'vtt', 'vélo tout terrain'],
+    'téléphone': ['mobile', 'smartphone', 'portable'],
+    'portable': ['laptop', 'notebook'],
+}
+
+PRODUITS = {
+    'vélo': {'code': '87.12', 'synonyms': ['bicyclette', 'bike'], 'brands': ['giant', 'trek'],
+             'materials': ['aluminium']},
+    'chaussures': {'code': '6403.19.10', 'synonyms': ['basket', 'air max'], 'brands': ['nike']},
+}
+
+def test_synonymes():
+    """Vérifie les synonymes directs et inverses, les têtes de groupes et les relations aux produits"""
+    print("🧪 Test des synonymes compilés")
+    print("=" * 60)
+
+    table = TableSynonymes(GROUPES, PRODUITS)
+    assert cle("Vélos de route") == ('velo', 'de', 'route')
+
+    # Tête, membre, membre de deux groupes
+    assert set(table.synonymes_de('Vélo')) == {'bicyclette', 'vtt', 'vélo tout terrain'}
+    assert set(table.synonymes_de('vtt')) == {'vélo', 'bicyclette', 'vélo tout terrain'}
+    assert set(table.synonymes_de('portable')) == {'téléphone', 'mobile', 'smartphone', 'laptop', 'notebook'}
+    assert table.synonymes_de('inconnu') == []
+
+    # Têtes: pluriels et termes de plusieurs mots
+    assert table.canoniques_de(['bicyclettes', 'rouges']) == ['velo']
+    assert table.canoniques_de(['un', 'velo', 'tout', 'terrain']) == ['velo']
+    assert table.canoniques_de(['ordinateur', 'portable']) == ['telephone', 'portable']
+
+    # Relations aux produits: mot-clé au pluriel, marque, terme de deux mots, matière; pas de sous-chaîne
+    relations = table.relations(['chaussures', 'nike', 'air', 'max', 'et', 'velo', 'en', 'aluminium'])
+    print(f"Relations: {relations}")
+    assert relations == {'chaussures': {'keyword': ['chaussures'], 'brand': ['nike'], 'synonym': ['air max']},
+                         'vélo': {'keyword': ['vélo'], 'material': ['aluminium']}}
+    assert table.relations(['motocyclette']) == {}
+    assert table.produits_citant(['Air Max', 'trek', 'moto']) == {'chaussures', 'vélo'}
+
+    # Développement d'une ligne: têtes de ses termes puis termes des produits de sa position
+    assert table.developpement("Bicyclettes et autres cycles", '87.12').split() == [
+        'velo', 'vélo', 'bicyclette', 'bike', 'giant', 'trek']
+    assert table.termes_position['64.03'] == ('chaussures', 'basket', 'air max', 'nike')
+    assert table.developpement("Autres", '01.01') == ''
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_synonymes()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de la lecture structurée du tarif (table des matières, positions, groupes, lignes N.T.S.)
+"""
+
+from tarif_structure import NOMBRE_CHAPITRES, NOMBRE_SECTIONS, analyser_tarif, charger_tarif
+
+EXTRAIT = """
+SECTION II
+PRODUITS DU REGNE VEGETAL
+
+7 Légumes, plantes, racines et tubercules alimentaires.
+8 Fruits comestibles; écorces d'agrumes ou de melons.
+
+10 F
+      REGLES GENERALES POUR L'INTERPRETATION DU SYSTEME HARMONISE
+
+   08.01        Noix de coco, noix du Brésil et noix de cajou, fraîches
+                ou sèches, même sans leurs coques ou décortiquées.
+                - Noix de coco :
+   0801.11.00.00   -- Desséchées                                        kg   20     1
+   0801.12.00.00   -- En coques internes (endocarpe)                    kg   20     1
+12 F
+                                                                          Section II
+                                                                          Chapitre 8
+  N° de
+           N.T.S.          Désignation des marchandises                 U.S. D.D. R.S.
+  position
+   0801.19.00.00   -- Autres                                            kg   20     1
+                - Noix du Brésil :
+   0801.21.00.00   -- En coques                                         kg   10     1
+   08.02     0802.00.00.00 Autres fruits à coques, frais ou secs, même
+                           sans leurs coques ou décortiqués.             kg   20     l
+   08.03        Bananes, y compris les plantains, fraîches ou sèches.
+              0803.10.00.0 - Plantains                                      kg   20     1
+13 F
+N° de                                                                U.    D.    R.S
+position                                                             S.    D.    .
+              0
+"""
+
+def test_tarif_structure():
+    """Vérifie les libellés hérités, les suites de ligne et l'élimination des en-têtes de page"""
+    print("🧪 Test de la structure du tarif")
+    print("=" * 60)
+
+    tarif = analyser_tarif(EXTRAIT)
+    assert tarif.sections == {'II': 'PRODUITS DU REGNE VEGETAL'}
+    assert tarif.chapitres == {'07': 'Légumes, plantes, racines et tubercules alimentaires.',
+                               '08': "Fruits comestibles; écorces d'agrumes ou de melons."}
+    assert [ligne.code for ligne in tarif.lignes] == [
+        '0801.11.00.00', '0801.12.00.00', '0801.19.00.00', '0801.21.00.00', '0802.00.00.00', '0803.10.00.00']
+
+    dessechees = tarif.lignes[0]
+    print(f"{dessechees.code}: {dessechees.designation} ← {dessechees.parents}")
+    assert dessechees.designation == 'Desséchées' and dessechees.niveau == 2
+    assert dessechees.position == '08.01' and dessechees.groupes == ('Noix de coco',)
+    assert dessechees.libelle_position.startswith('Noix de coco, noix du Brésil')
+    assert dessechees.libelle_position.endswith('décortiquées.')
+    assert (dessechees.unite, dessechees.droit, dessechees.redevance) == ('kg', 20, 1)
+    assert (dessechees.chapitre, dessechees.section) == ('08', 'II')
+
+    # Le groupe survit au changement de page; un nouveau groupe du même niveau le remplace
+    assert tarif.lignes[2].groupes == ('Noix de coco',)
+    assert tarif.lignes[3].groupes == ('Noix du Brésil',) and tarif.lignes[3].droit == 10
+
+    # Position non subdivisée sur la même ligne que son code, désignation sur deux lignes
+    autres = tarif.lignes[4]
+    assert autres.position == '08.02' and autres.parents == '' and autres.redevance == 1
+    assert autres.designation == 'Autres fruits à coques, frais ou secs, même sans leurs coques ou décortiqués.'
+
+    # Dernier chiffre du code rejeté après un changement de page
+    plantains = tarif.lignes[5]
+    assert plantains.designation == 'Plantains' and plantains.position == '08.03'
+    assert tarif.positions['08.02'] == autres.designation and tarif.positions['08.03'].startswith('Bananes')
+
+    # Extrait: une seule section, chapitres 1 à 6 et 9 à 97 absents
+    anomalies = tarif.anomalies()
+    print(f"Anomalies: {[anomalie[:60] for anomalie in anomalies]}")
+    assert anomalies[0] == f"1 sections au lieu de {NOMBRE_SECTIONS}"
+    assert anomalies[1].startswith('chapitres manquants: 01, 02, 03, 04, 05, 06, 09,')
+
+    champs = tarif.champs(dessechees)
+    assert champs['chapitre'].startswith('Fruits comestibles') and champs['section'] == 'PRODUITS DU REGNE VEGETAL'
+
+    print("✅ Test terminé!")
+
+def test_tarif_complet():
+    """Vérifie que le fichier du tarif est lu sans écart à la structure du Système harmonisé"""
+    print("🧪 Test de la structure du tarif complet")
+    print("=" * 60)
+
+    tarif = charger_tarif()
+    print(f"{len(tarif.sections)} sections, {len(tarif.chapitres)} chapitres, {len(tarif.lignes)} lignes N.T.S.")
+    assert tarif.anomalies() == []
+    assert len(tarif.sections) == NOMBRE_SECTIONS
+    assert all(f"{numero:02d}" in tarif.chapitres for numero in range(1, NOMBRE_CHAPITRES + 1))
+
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_tarif_structure()
+    test_tarif_complet()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test de l'instantané prétraité du tarif (empreinte, persistance, reconstruction)
+"""
+
+import tempfile
+from unittest import mock
+import ai_classifier
+from tariff_snapshot import TariffSnapshot, tariff_fingerprint
+
+def test_tariff_snapshot():
+    """Vérifie que le tarif n'est prétraité qu'une fois par version de son contenu"""
+    print("🧪 Test de l'instantané du tarif")
+    print("=" * 60)
+    
+    database = {
+        'subheadings': {
+            '0901.21.00.00': {'description': 'Café torréfié, non décaféiné', 'rate': '20%'},
+            '8471.30.00.00': {'description': 'Machines portatives de traitement de données', 'rate': '5%'}
+        },
+        'chapters': {'09': 'Café, thé, maté et épices'}
+    }
+    calls = []
+    def preprocess(text):
+        calls.append(text)
+        return text.lower()
+    
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        snapshot = TariffSnapshot.load_or_build(database, preprocess, snapshot_dir)
+        print(f"Entrées: {len(snapshot.entries)}, textes prétraités: {len(calls)}")
+        assert len(calls) == 3
+        assert snapshot.preprocessed[0] == 'café torréfié, non décaféiné'
+        assert [e['type'] for e in snapshot.entries] == ['subheading', 'subheading', 'chapter']
+        
+        # Même contenu (même dans un autre dictionnaire): relu depuis le disque
+        copy = {'subheadings': dict(database['subheadings']), 'chapters': dict(database['chapters'])}
+        reloaded = TariffSnapshot.load_or_build(copy, preprocess, snapshot_dir)
+        assert len(calls) == 3
+        assert reloaded.preprocessed == snapshot.preprocessed
+        
+        # Modification en place d'un taux: nouvelle empreinte, reconstruction
+        database['subheadings']['0901.21.00.00'] = {'description': 'Café torréfié, non décaféiné', 'rate': '10%'}
+        assert tariff_fingerprint(database) != snapshot.fingerprint
+        rebuilt = TariffSnapshot.load_or_build(database, preprocess, snapshot_dir)
+        print(f"Après modification du tarif: {len(calls)} textes prétraités au total")
+        assert len(calls) == 6
+        assert rebuilt.entries[0]['rate'] == '10%'
+    
+    # Base sans 'fingerprint': hachée une fois par objet base, pas à chaque requête
+    classifier = ai_classifier.AdvancedCEDEAOClassifier(encoder=object(), stop_words=[],
+                                                        tokenizer=str.split)
+    with mock.patch.object(ai_classifier, 'tariff_fingerprint', wraps=tariff_fingerprint) as hashed:
+        for _ in range(3):
+            snapshot = classifier.get_tariff_snapshot(database)
+        assert hashed.call_count == 1 and snapshot.fingerprint == tariff_fingerprint(database)
+        classifier.get_tariff_snapshot(copy)
+        assert hashed.call_count == 2
+        classifier.get_tariff_snapshot({**database, 'fingerprint': 'v2'})
+        assert hashed.call_count == 2
+    
+    print("✅ Test terminé!")
+
+if __name__ == "__main__":
+    test_tariff_snapshot()